@@ -48,7 +48,7 @@ printf '%s\n' \
   '    },' \
   '    {' \
   '      "Effect": "Allow",' \
-  '      "Action": ["s3:PutObject", "s3:PutObjectRetention", "s3:GetObjectRetention"],' \
+  '      "Action": ["s3:PutObject", "s3:PutObjectRetention", "s3:GetObject", "s3:GetObjectVersion", "s3:GetObjectRetention"],' \
   "      \"Resource\": [\"arn:aws:s3:::$PROOF_ARCHIVE_BUCKET/proofs/*\"]" \
   '    }' \
   '  ]' \
@@ -7,3 +7,4 @@ class AuthenticationConfig(AppConfig):
 
     def ready(self):
         from apps.authentication import checks  # noqa: F401
+        from apps.authentication import signals  # noqa: F401
@@ -75,4 +75,9 @@ def secureapprove_proof_configuration_check(app_configs, **kwargs):
             'Production SecureApprove Proof issuance requires the WORM archive.',
             id='secureapprove.E004',
         ))
+    if getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_MODE', 'single') not in {'single', 'bundle'}:
+        errors.append(Error(
+            'SECUREAPPROVE_PROOF_ARCHIVE_MODE must be "single" or "bundle".',
+            id='secureapprove.E005',
+        ))
     return errors
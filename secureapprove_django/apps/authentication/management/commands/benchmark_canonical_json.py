@@ -0,0 +1,58 @@
+import timeit
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.authentication.proof_service import canonical_json_bytes, transaction_sha256
+
+
+def sample_snapshot(metadata_keys: int) -> dict:
+    """Approval snapshot shaped like the one bound to WebAuthn challenges."""
+    created_at = timezone.now()
+    return {
+        'schema': 'sap-proof-v1',
+        'event_type': 'approval_request',
+        'request': {
+            'id': str(uuid.uuid4()),
+            'tenant_id': str(uuid.uuid4()),
+            'requester_id': str(uuid.uuid4()),
+            'approver_id': str(uuid.uuid4()),
+            'title': 'Pago a proveedor — factura 2024-0042',
+            'description': 'Transferencia internacional con retención impositiva. ' * 4,
+            'category': 'payment',
+            'priority': 'high',
+            'amount': format(Decimal('6500000.00'), 'f'),
+            'metadata': {f'field_{index:03d}': f'value {index}' for index in range(metadata_keys)},
+            'created_at': created_at,
+            'expires_at': created_at + timedelta(days=7),
+        },
+        'decision': 'approve',
+        'comment': 'Aprobado según política de compras.',
+        'rejection_reason': '',
+    }
+
+
+class Command(BaseCommand):
+    help = 'Measure canonical JSON encoding and transaction digest cost per approval snapshot.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--metadata-keys', type=int, default=16)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        if iterations < 1 or options['repeat'] < 1:
+            raise CommandError('--iterations and --repeat must be positive.')
+        snapshot = sample_snapshot(options['metadata_keys'])
+        size = len(canonical_json_bytes(snapshot))
+        self.stdout.write(f'Snapshot: {size} canonical bytes, best of {options["repeat"]} x {iterations} runs')
+        for label, function in (
+            ('canonical_json_bytes', canonical_json_bytes),
+            ('transaction_sha256', transaction_sha256),
+        ):
+            best = min(timeit.repeat(lambda: function(snapshot), number=iterations, repeat=options['repeat']))
+            self.stdout.write(f'{label}: {best / iterations * 1e6:.2f} µs/snapshot')
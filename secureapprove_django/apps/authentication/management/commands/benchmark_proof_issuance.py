@@ -0,0 +1,301 @@
+import functools
+import json
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from apps.authentication import metrics, proof_service
+from apps.authentication.models import (
+    ApprovalAudit,
+    ProofLedgerCheckpoint,
+    ProofLedgerHead,
+    SecurityProof,
+    User,
+)
+from apps.authentication.proof_service import (
+    ProofUnavailable,
+    _local_private_key,
+    canonical_json_value,
+    invalidate_signing_key_cache,
+    issue_security_proof,
+    transaction_sha256,
+    verify_proof_ledger,
+)
+from apps.requests.models import ApprovalRequest
+from apps.requests.webauthn_views import _approval_proof_snapshot
+from apps.tenants.models import Tenant
+
+LOCK_METRIC = 'secureapprove_proof_ledger_lock_seconds'
+
+
+def synthetic_evidence(approver_id, sequence: int) -> dict:
+    """WebAuthn assertion evidence shaped like ``assertion_private_evidence``."""
+    suffix = f'{approver_id}-{sequence}'
+    return {
+        'credential_id': f'loadtest-credential-{approver_id}',
+        'clientDataJSON': f'loadtest-client-{suffix}',
+        'authenticatorData': f'loadtest-auth-{suffix}',
+        'signature': f'loadtest-signature-{suffix}',
+        'credential_public_key': f'loadtest-public-key-{approver_id}',
+        'origin': 'https://secureapprove.com',
+        'rp_id_hash': 'ab' * 32,
+        'flags': {'UP': True, 'UV': True, 'BE': False, 'BS': False},
+    }
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of ``values`` (0.0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _with_latency(function, seconds: float):
+    @functools.wraps(function)
+    def delayed(*args, **kwargs):
+        time.sleep(seconds)
+        return function(*args, **kwargs)
+    return delayed
+
+
+def _summary_ms(values: list) -> dict:
+    return {
+        'p50': round(percentile(values, 0.50) * 1000, 3),
+        'p95': round(percentile(values, 0.95) * 1000, 3),
+        'p99': round(percentile(values, 0.99) * 1000, 3),
+        'max': round(max(values, default=0.0) * 1000, 3),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive concurrent approval proof issuance for one synthetic tenant and report '
+        'throughput, latency percentiles and ledger lock wait.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--approvers', type=int, default=50, help='Concurrent approvers in one tenant.')
+        parser.add_argument('--rounds', type=int, default=4, help='Approvals issued by each approver.')
+        parser.add_argument(
+            '--signer-latency-ms', type=float, default=0.0,
+            help='Delay added to every signature to stand in for an AWS KMS or Vault round trip.',
+        )
+        parser.add_argument(
+            '--data-key-latency-ms', type=float, default=0.0,
+            help='Delay added to every evidence encryption to stand in for an uncached data-key request.',
+        )
+        parser.add_argument('--max-p95-ms', type=float, help='Fail when p95 issuance latency exceeds this.')
+        parser.add_argument('--min-throughput', type=float, help='Fail when proofs per second fall below this.')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON.')
+        parser.add_argument('--keep-data', action='store_true', help='Keep the synthetic tenant and its proofs.')
+
+    def handle(self, *args, **options):
+        if options['approvers'] < 1 or options['rounds'] < 1:
+            raise CommandError('--approvers and --rounds must be positive.')
+        try:
+            _local_private_key()
+        except ProofUnavailable as exc:
+            raise CommandError(
+                'The benchmark uses the local signer; run it with DEBUG=True against a disposable database.'
+            ) from exc
+
+        with ExitStack() as stack:
+            stack.enter_context(override_settings(
+                SECUREAPPROVE_PROOF_ENABLED=True,
+                SECUREAPPROVE_PROOF_SIGNER='local',
+                SECUREAPPROVE_PROOF_ENCRYPTION_BACKEND='local',
+                SECUREAPPROVE_PROOF_ARCHIVE_ENABLED=False,
+            ))
+            invalidate_signing_key_cache()
+            stack.callback(invalidate_signing_key_cache)
+            if options['signer_latency_ms'] > 0:
+                stack.enter_context(patch.object(
+                    proof_service, '_sign_es256',
+                    _with_latency(proof_service._sign_es256, options['signer_latency_ms'] / 1000),
+                ))
+            if options['data_key_latency_ms'] > 0:
+                stack.enter_context(patch.object(
+                    proof_service, '_encrypt_evidence',
+                    _with_latency(proof_service._encrypt_evidence, options['data_key_latency_ms'] / 1000),
+                ))
+            lock_waits = []
+            observe = metrics.observe
+
+            def recording_observe(name, value, *args, **kwargs):
+                if name == LOCK_METRIC:
+                    lock_waits.append(value)
+                return observe(name, value, *args, **kwargs)
+
+            stack.enter_context(patch.object(metrics, 'observe', recording_observe))
+
+            tenant, approvers, request_ids = self._setup(options['approvers'], options['rounds'])
+            if not options['keep_data']:
+                stack.callback(self._cleanup, tenant)
+            report = self._run(tenant, approvers, request_ids)
+            report['lock_wait_ms'] = _summary_ms(lock_waits)
+            report['signer_latency_ms'] = options['signer_latency_ms']
+            report['data_key_latency_ms'] = options['data_key_latency_ms']
+            report['ledger'] = verify_proof_ledger(tenant.pk, full=True, workers=1)['status']
+
+        self._write_report(report, options['json'])
+        failures = []
+        if report['errors']:
+            failures.append(f'{len(report["errors"])} issuance(s) failed')
+        if report['ledger'] != 'ok':
+            failures.append(f'ledger verification returned {report["ledger"]}')
+        if options['max_p95_ms'] is not None and report['latency_ms']['p95'] > options['max_p95_ms']:
+            failures.append(f'p95 {report["latency_ms"]["p95"]} ms exceeds {options["max_p95_ms"]} ms')
+        if options['min_throughput'] is not None and report['throughput_per_second'] < options['min_throughput']:
+            failures.append(
+                f'throughput {report["throughput_per_second"]}/s is below {options["min_throughput"]}/s'
+            )
+        if failures:
+            raise CommandError('Proof issuance benchmark failed: ' + '; '.join(failures) + '.')
+
+    def _setup(self, approver_count: int, rounds: int):
+        suffix = uuid.uuid4().hex[:8]
+        tenant = Tenant.objects.create(key=f'loadtest-{suffix}', name=f'Proof load test {suffix}')
+        requester = User(
+            username=f'loadtest-requester-{suffix}', email=f'requester-{suffix}@loadtest.invalid',
+            tenant=tenant, role='requester', name='Load test requester',
+        )
+        approvers = [
+            User(
+                username=f'loadtest-approver-{suffix}-{index}', email=f'approver-{suffix}-{index}@loadtest.invalid',
+                tenant=tenant, role='approver', name=f'Load test approver {index}',
+            )
+            for index in range(approver_count)
+        ]
+        users = [requester, *approvers]
+        for user in users:
+            user.set_unusable_password()
+        User.objects.bulk_create(users)
+        requester, *approvers = User.objects.filter(tenant=tenant).order_by('username')
+        # bulk_create skips post_save, so no approver notification fan-out is
+        # queued for the synthetic requests.
+        approval_requests = ApprovalRequest.objects.bulk_create([
+            ApprovalRequest(
+                tenant=tenant,
+                requester=requester,
+                title=f'Load test approval {index}',
+                description='Synthetic approval issued by benchmark_proof_issuance.',
+                category='expense',
+                priority='high',
+                amount=Decimal('1250.50'),
+                metadata={'batch': suffix, 'index': index},
+            )
+            for index in range(approver_count * rounds)
+        ])
+        request_ids = [approval_request.pk for approval_request in approval_requests]
+        return tenant, approvers, [request_ids[index::approver_count] for index in range(approver_count)]
+
+    def _approve(self, approver, request_id, sequence: int):
+        # Mirrors the transaction in approval_webauthn_verify with the WebAuthn
+        # verification replaced by synthetic evidence bound to the snapshot.
+        with transaction.atomic():
+            approval_request = (
+                ApprovalRequest.objects.select_related('tenant', 'requester')
+                .select_for_update()
+                .get(pk=request_id)
+            )
+            snapshot = _approval_proof_snapshot(approval_request, approver, 'approve')
+            ApprovalRequest.objects.filter(pk=request_id).update(
+                status='approved', approver=approver, approved_at=timezone.now()
+            )
+            audit = ApprovalAudit.objects.create(
+                approval_request=approval_request,
+                user=approver,
+                credential_id=f'loadtest-credential-{approver.pk}',
+                challenge_id=f'loadtest-challenge-{approver.pk}-{sequence}',
+                action='approve',
+                status='success',
+                context_data=canonical_json_value(snapshot),
+            )
+            issue_security_proof(
+                tenant=approval_request.tenant,
+                subject_user=approval_request.requester,
+                actor_user=approver,
+                event_type='approval_request',
+                decision='approve',
+                transaction_snapshot=snapshot,
+                verification_result={
+                    'transaction_sha256': transaction_sha256(snapshot),
+                    'proof_evidence': synthetic_evidence(approver.pk, sequence),
+                },
+                approval_audit=audit,
+            )
+
+    def _run(self, tenant, approvers, request_ids) -> dict:
+        latencies = []
+        errors = []
+        start = threading.Barrier(len(approvers))
+
+        def approver_loop(approver, assigned):
+            try:
+                start.wait()
+                for sequence, request_id in enumerate(assigned):
+                    started = time.perf_counter()
+                    try:
+                        self._approve(approver, request_id, sequence)
+                    except Exception as exc:
+                        errors.append(f'{type(exc).__name__}: {exc}')
+                    else:
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(approvers), thread_name_prefix='proof-loadtest') as executor:
+            list(executor.map(approver_loop, approvers, request_ids))
+        elapsed = time.perf_counter() - started
+        return {
+            'tenant': tenant.key,
+            'database': connection.vendor,
+            'approvers': len(approvers),
+            'proofs': len(latencies),
+            'errors': errors,
+            'elapsed_seconds': round(elapsed, 3),
+            'throughput_per_second': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            'latency_ms': _summary_ms(latencies),
+        }
+
+    def _cleanup(self, tenant):
+        SecurityProof.objects.filter(tenant=tenant).delete()
+        ProofLedgerCheckpoint.objects.filter(tenant=tenant).delete()
+        ProofLedgerHead.objects.filter(tenant=tenant).delete()
+        ApprovalRequest.objects.filter(tenant=tenant).delete()
+        User.objects.filter(tenant=tenant).delete()
+        tenant.delete()
+
+    def _write_report(self, report: dict, as_json: bool):
+        if as_json:
+            self.stdout.write(json.dumps(report, sort_keys=True))
+            return
+        latency = report['latency_ms']
+        lock_wait = report['lock_wait_ms']
+        self.stdout.write(
+            f'{report["proofs"]} proofs by {report["approvers"]} approvers in {report["elapsed_seconds"]} s '
+            f'({report["throughput_per_second"]}/s) on {report["database"]}, '
+            f'signer latency {report["signer_latency_ms"]} ms'
+        )
+        self.stdout.write(
+            f'issuance ms: p50 {latency["p50"]} p95 {latency["p95"]} p99 {latency["p99"]} max {latency["max"]}'
+        )
+        self.stdout.write(
+            f'ledger lock wait ms: p50 {lock_wait["p50"]} p95 {lock_wait["p95"]} '
+            f'p99 {lock_wait["p99"]} max {lock_wait["max"]}'
+        )
+        self.stdout.write(f'ledger verification: {report["ledger"]}, errors: {len(report["errors"])}')
+        for error in report['errors'][:5]:
+            self.stdout.write(f'  {error}')
@@ -14,7 +14,10 @@ from apps.authentication.proof_service import (
     _encode_jws,
     _encrypt_evidence,
     _s3_client,
+    archived_proof_jws,
+    build_proof_archive_bundle,
     decrypt_evidence,
+    proof_archive_bundle_manifest,
     sync_active_signing_key,
     verify_compact_jws,
 )
@@ -92,7 +95,42 @@ class Command(BaseCommand):
             ).get('Retention', {})
             if retention.get('Mode') != 'COMPLIANCE' or not retention.get('RetainUntilDate'):
                 raise CommandError('Archived proof is not protected by COMPLIANCE retention.')
+            if getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_MODE', 'single') == 'bundle':
+                self._smoke_bundle(s3, bucket, proof_id, jws, issued_at)
 
         self.stdout.write(self.style.SUCCESS(
             f'SecureApprove Proof infrastructure smoke test passed (kid={signing_key.kid}).'
         ))
+
+    def _smoke_bundle(self, s3, bucket, proof_id, jws, issued_at):
+        members = [
+            SimpleNamespace(id=uuid.uuid4(), jws=jws, ledger_entry_sha256='4' * 64),
+            SimpleNamespace(id=proof_id, jws=jws, ledger_entry_sha256='3' * 64),
+        ]
+        body, spans, metadata = build_proof_archive_bundle('smoke-test', members)
+        object_key = f'proofs/smoke-tests/{proof_id}.jws.gz'
+        response = s3.put_object(
+            Bucket=bucket,
+            Key=object_key,
+            Body=body,
+            ContentType='application/gzip',
+            ContentMD5=base64.b64encode(hashlib.md5(body, usedforsecurity=False).digest()).decode('ascii'),
+            ObjectLockMode='COMPLIANCE',
+            ObjectLockRetainUntilDate=issued_at + timedelta(
+                days=getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_RETENTION_DAYS', 3650)
+            ),
+            Metadata={**metadata, 'purpose': 'infrastructure-smoke-test'},
+        )
+        offset, length = spans[1]
+        archived = SimpleNamespace(
+            archive_status='archived',
+            archive_object_key=object_key,
+            archive_version_id=response.get('VersionId', ''),
+            archive_bundle_offset=offset,
+            archive_bundle_length=length,
+        )
+        if archived_proof_jws(archived) != jws:
+            raise CommandError('Bundled proof byte-range read did not return the archived JWS.')
+        manifest = proof_archive_bundle_manifest(object_key, archived.archive_version_id)
+        if [entry['proof_id'] for entry in manifest.get('proofs', [])] != [str(item.id) for item in members]:
+            raise CommandError('Proof bundle manifest does not index the archived proofs.')
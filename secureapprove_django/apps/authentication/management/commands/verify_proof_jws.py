@@ -0,0 +1,55 @@
+import itertools
+import json
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.authentication.proof_service import (
+    jws_values_from_json,
+    jws_values_from_ndjson,
+    verification_results_for_jws_batch,
+)
+
+
+class Command(BaseCommand):
+    help = 'Verify SecureApprove Proof compact JWS values in bulk and print NDJSON results.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source',
+            nargs='?',
+            default='-',
+            help='JSON array or NDJSON file of compact JWS values; "-" reads standard input.',
+        )
+        parser.add_argument('--workers', type=int, default=None, help='Signature verification processes.')
+        parser.add_argument('--strict', action='store_true', help='Exit with an error if any proof is not valid.')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        try:
+            handle = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f'Cannot read {source}: {exc}') from exc
+
+        counts = Counter()
+        try:
+            lines = iter(handle)
+            first = next((line for line in lines if line.strip()), '')
+            if first.lstrip().startswith('['):
+                values = jws_values_from_json(json.loads(first + ''.join(lines)))
+            else:
+                values = jws_values_from_ndjson(itertools.chain([first], lines))
+            for result in verification_results_for_jws_batch(values, workers=options['workers']):
+                counts[result['status']] += 1
+                self.stdout.write(json.dumps(result, separators=(',', ':')))
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+        summary = ', '.join(f'{status}={count}' for status, count in sorted(counts.items()))
+        self.stderr.write(f'Verified {sum(counts.values())} proof(s): {summary or "none"}')
+        if options['strict'] and counts.keys() - {'valid', 'evidence_expired'}:
+            raise CommandError('At least one proof is not valid.')
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.authentication.models import ProofLedgerHead
+from apps.authentication.proof_service import verify_proof_ledger
+
+
+class Command(BaseCommand):
+    help = 'Re-verify SecureApprove Proof hash chains and signatures against each tenant ledger head.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', action='append', default=[], help='Tenant ID to verify; repeatable.')
+        parser.add_argument('--full', action='store_true', help='Ignore checkpoints and verify from the first entry.')
+        parser.add_argument('--workers', type=int, default=None, help='Signature verification processes.')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Entries verified per checkpoint.')
+
+    def handle(self, *args, **options):
+        tenant_ids = options['tenant'] or list(
+            ProofLedgerHead.objects.filter(entry_count__gt=0).values_list('tenant_id', flat=True)
+        )
+        broken = 0
+        for tenant_id in tenant_ids:
+            result = verify_proof_ledger(
+                tenant_id,
+                full=options['full'],
+                workers=options['workers'],
+                chunk_size=options['chunk_size'],
+            )
+            if result['status'] == 'ok':
+                self.stdout.write(self.style.SUCCESS(
+                    f"Tenant {tenant_id}: {result['entry_count']} entries intact "
+                    f"({result['verified_entries']} newly verified)."
+                ))
+                continue
+            broken += 1
+            failure = result['first_break']
+            self.stderr.write(self.style.ERROR(
+                f"Tenant {tenant_id}: ledger broken at entry {failure['entry_number']} "
+                f"(proof {failure['proof_id'] or 'n/a'}): {failure['reason']}"
+            ))
+        if broken:
+            raise CommandError(f'{broken} proof ledger(s) failed verification.')
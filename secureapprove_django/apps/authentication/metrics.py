@@ -0,0 +1,216 @@
+"""Process-local counters and histograms aggregated across workers.
+
+Hot paths only touch an in-memory dictionary. A daemon thread in every
+process (daphne, gunicorn, Celery prefork children) periodically adds the
+accumulated deltas to one shared Redis hash, which ``render_prometheus``
+exposes in the Prometheus text format. Series are stored under their final
+exposition name, so aggregation across processes is a plain HINCRBYFLOAT.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import math
+import os
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SERIES_KEY = 'secureapprove_metrics:v1:series'
+TYPES_KEY = 'secureapprove_metrics:v1:types'
+_LE_LABEL = re.compile(r'le="([^"]*)",?')
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _series(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    body = ','.join(f'{key}="{_escape_label(labels[key])}"' for key in sorted(labels))
+    return f'{name}{{{body}}}'
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if math.isinf(bound) else repr(float(bound))
+
+
+def _redis_connection():
+    try:
+        from django_redis import get_redis_connection
+
+        return get_redis_connection('default')
+    except Exception:
+        return None
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[str, float] = {}
+        self._types: dict[str, str] = {}
+        self._flusher: threading.Thread | None = None
+        self._fallback_lock = threading.Lock()
+
+    def _after_fork(self) -> None:
+        # A forked child inherits the parent's unflushed deltas, a dead flusher
+        # thread and possibly a held lock; reset all three so nothing is
+        # reported twice and the child starts its own flusher.
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._flusher = None
+
+    def _check_process(self) -> None:
+        if self._flusher is None and getattr(settings, 'SECUREAPPROVE_METRICS_FLUSH_SECONDS', 10) > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        series = _series(name, labels)
+        with self._lock:
+            self._check_process()
+            self._types.setdefault(name, 'counter')
+            self._pending[series] = self._pending.get(series, 0) + amount
+
+    def observe(self, name: str, value: float, buckets: tuple = DEFAULT_BUCKETS, **labels) -> None:
+        with self._lock:
+            self._check_process()
+            self._types.setdefault(name, 'histogram')
+            pending = self._pending
+            for bound in (*buckets, math.inf):
+                # Every bound is written, even with zero, so scrapes always see
+                # the full bucket layout.
+                series = _series(f'{name}_bucket', {**labels, 'le': _format_bound(bound)})
+                pending[series] = pending.get(series, 0) + (1 if value <= bound else 0)
+            for suffix, amount in (('_sum', value), ('_count', 1)):
+                series = _series(f'{name}{suffix}', labels)
+                pending[series] = pending.get(series, 0) + amount
+
+    def time(self, name: str, **labels):
+        return _Timer(self, name, labels)
+
+    def _flush_loop(self) -> None:
+        interval = max(0.1, float(getattr(settings, 'SECUREAPPROVE_METRICS_FLUSH_SECONDS', 10)))
+        while True:
+            time.sleep(interval)
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            types = dict(self._types)
+        try:
+            self._write(pending, types)
+        except Exception:
+            logger.debug('Metrics flush failed; keeping deltas for the next attempt.', exc_info=True)
+            with self._lock:
+                for series, amount in pending.items():
+                    self._pending[series] = self._pending.get(series, 0) + amount
+
+    def _write(self, pending: dict, types: dict) -> None:
+        connection = _redis_connection()
+        if connection is not None:
+            pipeline = connection.pipeline(transaction=False)
+            for series, amount in pending.items():
+                pipeline.hincrbyfloat(SERIES_KEY, series, amount)
+            pipeline.hset(TYPES_KEY, mapping=types)
+            pipeline.execute()
+            return
+        # Non-Redis caches (local development, tests) are single-host, so a
+        # process lock around read-modify-write is enough.
+        with self._fallback_lock:
+            series = cache.get(SERIES_KEY) or {}
+            for name, amount in pending.items():
+                series[name] = series.get(name, 0) + amount
+            cache.set(SERIES_KEY, series, timeout=None)
+            cache.set(TYPES_KEY, {**(cache.get(TYPES_KEY) or {}), **types}, timeout=None)
+
+    def snapshot(self) -> tuple[dict, dict]:
+        """Return the aggregated ``(series, types)`` across all processes."""
+        connection = _redis_connection()
+        if connection is not None:
+            series = {
+                key.decode(): float(value)
+                for key, value in connection.hgetall(SERIES_KEY).items()
+            }
+            types = {key.decode(): value.decode() for key, value in connection.hgetall(TYPES_KEY).items()}
+            return series, types
+        return dict(cache.get(SERIES_KEY) or {}), dict(cache.get(TYPES_KEY) or {})
+
+    def reset(self) -> None:
+        """Discard local and shared values; used by tests."""
+        with self._lock:
+            self._pending = {}
+        connection = _redis_connection()
+        if connection is not None:
+            connection.delete(SERIES_KEY, TYPES_KEY)
+        else:
+            cache.delete_many([SERIES_KEY, TYPES_KEY])
+
+
+class _Timer:
+    def __init__(self, registry: MetricsRegistry, name: str, labels: dict):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        labels = {**self.labels, 'outcome': 'error' if exc_type else 'ok'}
+        self.registry.observe(self.name, time.perf_counter() - self.started, **labels)
+        return False
+
+
+registry = MetricsRegistry()
+inc = registry.inc
+observe = registry.observe
+timer = registry.time
+atexit.register(registry.flush)
+os.register_at_fork(after_in_child=registry._after_fork)
+
+
+def _family(series: str, types: dict) -> str:
+    name = series.split('{', 1)[0]
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and types.get(name[:-len(suffix)]) == 'histogram':
+            return name[:-len(suffix)]
+    return name
+
+
+def _sort_key(series: str) -> tuple:
+    # Histogram buckets must be listed in increasing ``le`` order.
+    match = _LE_LABEL.search(series)
+    if not match:
+        return series, -math.inf
+    return _LE_LABEL.sub('', series), float(match.group(1))
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus() -> str:
+    """Flush this process and render every aggregated series as exposition text."""
+    registry.flush()
+    series, types = registry.snapshot()
+    families: dict[str, list[str]] = {}
+    for name in sorted(series, key=_sort_key):
+        families.setdefault(_family(name, types), []).append(name)
+    lines = []
+    for family in sorted(families):
+        lines.append(f'# TYPE {family} {types.get(family, "untyped")}')
+        lines.extend(f'{name} {_format_value(series[name])}' for name in families[family])
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,30 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from apps.authentication.metrics import render_prometheus
+
+
+def _metrics_access_allowed(request) -> bool:
+    token = getattr(settings, 'SECUREAPPROVE_METRICS_TOKEN', '')
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        if hmac.compare_digest(supplied.encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+            return True
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_authenticated and user.is_superuser)
+
+
+def prometheus_metrics(request):
+    """Prometheus text exposition of metrics aggregated across all workers."""
+    if not getattr(settings, 'ENABLE_METRICS_ENDPOINT', True):
+        raise Http404
+    if not _metrics_access_allowed(request):
+        response = HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+        response['WWW-Authenticate'] = 'Bearer realm="metrics"'
+        return response
+    response = HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    response['Cache-Control'] = 'no-store, max-age=0'
+    response['X-Content-Type-Options'] = 'nosniff'
+    return response
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0006_tenant_proof_retention_years'),
+        ('authentication', '0010_secureapprove_proof'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProofLedgerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_count', models.PositiveBigIntegerField(default=0)),
+                ('last_entry_sha256', models.CharField(blank=True, default='', max_length=64)),
+                ('last_proof_id', models.UUIDField(blank=True, null=True)),
+                ('last_issued_at', models.DateTimeField(blank=True, null=True)),
+                ('signature', models.CharField(max_length=64)),
+                ('verified_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('tenant', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='proof_ledger_checkpoint', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Proof Ledger Checkpoint',
+                'verbose_name_plural': 'Proof Ledger Checkpoints',
+            },
+        ),
+    ]
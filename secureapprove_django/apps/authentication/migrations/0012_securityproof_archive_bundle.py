@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0011_proof_ledger_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='securityproof',
+            name='archive_bundle_length',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='securityproof',
+            name='archive_bundle_offset',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:59
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without blocking proof issuance on large tables.
+    atomic = False
+
+    dependencies = [
+        ('authentication', '0012_securityproof_archive_bundle'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='securityproof',
+            index=models.Index(condition=models.Q(('evidence_purged_at__isnull', True)), fields=['evidence_expires_at'], name='proof_evidence_unpurged_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='securityproof',
+            index=models.Index(condition=models.Q(('archive_status__in', ['pending', 'failed', 'delayed'])), fields=['created_at'], name='proof_archive_waiting_idx'),
+        ),
+    ]
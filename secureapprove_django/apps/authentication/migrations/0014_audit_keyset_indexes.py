@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:09
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Audit tables are append-only and large; build without blocking inserts.
+    atomic = False
+
+    dependencies = [
+        ('authentication', '0013_proof_maintenance_partial_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='approvalaudit',
+            index=models.Index(fields=['performed_at', 'id'], name='approval_audit_keyset_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='termsacceptanceaudit',
+            index=models.Index(fields=['tenant', 'performed_at', 'id'], name='terms_audit_keyset_idx'),
+        ),
+    ]
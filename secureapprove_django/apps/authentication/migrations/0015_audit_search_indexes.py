@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:11
+
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+
+def trigram_index(name, table, column):
+    # Django renders icontains as UPPER(column) LIKE UPPER(%s) on PostgreSQL,
+    # so the trigram index has to cover the same expression.
+    return migrations.RunSQL(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" USING gin (UPPER("{column}") gin_trgm_ops)',
+        f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"',
+    )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('authentication', '0014_audit_keyset_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        trigram_index('user_email_trgm_idx', 'authentication_user', 'email'),
+        trigram_index('terms_audit_doc_type_trgm_idx', 'authentication_termsacceptanceaudit', 'document_type'),
+        trigram_index('terms_audit_doc_version_trgm_idx', 'authentication_termsacceptanceaudit', 'document_version'),
+        trigram_index('terms_audit_doc_hash_trgm_idx', 'authentication_termsacceptanceaudit', 'document_hash'),
+        AddIndexConcurrently(
+            model_name='approvalaudit',
+            index=models.Index(fields=['ip_address'], name='approval_audit_ip_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='termsacceptanceaudit',
+            index=models.Index(fields=['tenant', 'ip_address'], name='terms_audit_ip_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='termsacceptanceaudit',
+            index=models.Index(fields=['document_hash'], name='terms_audit_document_hash_idx'),
+        ),
+    ]
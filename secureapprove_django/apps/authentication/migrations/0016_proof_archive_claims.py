@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:51
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Rebuild the waiting-proofs index without blocking proof issuance.
+    atomic = False
+
+    dependencies = [
+        ('authentication', '0015_audit_search_indexes'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='securityproof',
+            name='proof_archive_waiting_idx',
+        ),
+        migrations.AddField(
+            model_name='securityproof',
+            name='archive_claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='securityproof',
+            name='archive_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('archiving', 'Archiving'), ('archived', 'Archived'), ('delayed', 'Delayed'), ('failed', 'Failed'), ('disabled', 'Disabled')], default='pending', max_length=16),
+        ),
+        AddIndexConcurrently(
+            model_name='securityproof',
+            index=models.Index(condition=models.Q(('archive_status__in', ['pending', 'archiving', 'failed', 'delayed'])), fields=['created_at'], name='proof_archive_waiting_idx'),
+        ),
+    ]
@@ -303,6 +303,8 @@ class ApprovalAudit(models.Model):
             models.Index(fields=['user', 'performed_at']),
             models.Index(fields=['status']),
             models.Index(fields=['credential_id']),
+            models.Index(fields=['performed_at', 'id'], name='approval_audit_keyset_idx'),
+            models.Index(fields=['ip_address'], name='approval_audit_ip_idx'),
         ]
     
     def __str__(self):
@@ -499,6 +501,9 @@ class TermsAcceptanceAudit(models.Model):
             models.Index(fields=['tenant', 'performed_at']),
             models.Index(fields=['user', 'performed_at']),
             models.Index(fields=['status']),
+            models.Index(fields=['tenant', 'performed_at', 'id'], name='terms_audit_keyset_idx'),
+            models.Index(fields=['tenant', 'ip_address'], name='terms_audit_ip_idx'),
+            models.Index(fields=['document_hash'], name='terms_audit_document_hash_idx'),
         ]
 
     def __str__(self):
@@ -553,6 +558,29 @@ class ProofLedgerHead(models.Model):
         return f"{self.tenant_id}: {self.last_entry_sha256 or 'empty'}"
 
 
+class ProofLedgerCheckpoint(models.Model):
+    """Signed position up to which a tenant's proof chain was fully re-verified."""
+
+    tenant = models.OneToOneField(
+        'tenants.Tenant',
+        on_delete=models.PROTECT,
+        related_name='proof_ledger_checkpoint',
+    )
+    entry_count = models.PositiveBigIntegerField(default=0)
+    last_entry_sha256 = models.CharField(max_length=64, blank=True, default='')
+    last_proof_id = models.UUIDField(null=True, blank=True)
+    last_issued_at = models.DateTimeField(null=True, blank=True)
+    signature = models.CharField(max_length=64)
+    verified_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = _('Proof Ledger Checkpoint')
+        verbose_name_plural = _('Proof Ledger Checkpoints')
+
+    def __str__(self):
+        return f"{self.tenant_id}: {self.entry_count} verified"
+
+
 class SecurityProof(models.Model):
     """Signed, privacy-preserving evidence for one WebAuthn-authorized decision."""
 
@@ -564,6 +592,7 @@ class SecurityProof(models.Model):
     DECISION_CHOICES = [('approve', _('Approve')), ('reject', _('Reject'))]
     ARCHIVE_CHOICES = [
         ('pending', _('Pending')),
+        ('archiving', _('Archiving')),
         ('archived', _('Archived')),
         ('delayed', _('Delayed')),
         ('failed', _('Failed')),
@@ -631,7 +660,12 @@ class SecurityProof(models.Model):
     archive_status = models.CharField(max_length=16, choices=ARCHIVE_CHOICES, default='pending')
     archive_object_key = models.CharField(max_length=512, blank=True)
     archive_version_id = models.CharField(max_length=255, blank=True)
+    # Set when the JWS is stored as one gzip member of a per-tenant bundle.
+    archive_bundle_offset = models.PositiveBigIntegerField(null=True, blank=True)
+    archive_bundle_length = models.PositiveIntegerField(null=True, blank=True)
     archived_at = models.DateTimeField(null=True, blank=True)
+    # Set when a bundle run claims the proof; stale claims are released.
+    archive_claimed_at = models.DateTimeField(null=True, blank=True)
     archive_error = models.TextField(blank=True)
 
     issued_at = models.DateTimeField(default=timezone.now, db_index=True)
@@ -645,6 +679,18 @@ class SecurityProof(models.Model):
             models.Index(fields=['tenant', 'issued_at'], name='authentica_tenant__b0990a_idx'),
             models.Index(fields=['tenant', 'archive_status'], name='authentica_tenant__7764f3_idx'),
             models.Index(fields=['event_type', 'decision'], name='authentica_event_t_7f54b2_idx'),
+            # Partial indexes keep the maintenance scans proportional to the
+            # rows still waiting instead of the whole proof history.
+            models.Index(
+                fields=['evidence_expires_at'],
+                name='proof_evidence_unpurged_idx',
+                condition=models.Q(evidence_purged_at__isnull=True),
+            ),
+            models.Index(
+                fields=['created_at'],
+                name='proof_archive_waiting_idx',
+                condition=models.Q(archive_status__in=['pending', 'archiving', 'failed', 'delayed']),
+            ),
         ]
 
     @property
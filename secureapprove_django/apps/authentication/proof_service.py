@@ -7,19 +7,26 @@ The complete transaction and WebAuthn assertion are encrypted separately.
 from __future__ import annotations
 
 import base64
+import functools
+import gzip
 import hashlib
 import hmac
 import json
 import logging
 import math
+import multiprocessing
 import os
+import random
 import re
 import ssl
 import sys
-import urllib.error
+import threading
+import time
 import urllib.parse
-import urllib.request
 import uuid
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, datetime, timezone as datetime_timezone
 from decimal import Decimal
 from typing import Any
@@ -36,6 +43,9 @@ from django.core.cache import cache
 from django.db import transaction
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from apps.authentication import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +54,12 @@ CHALLENGE_PREFIX = b'SecureApprove-Proof-v1'
 ISSUER = 'https://secureapprove.com'
 P256_ORDER = int('FFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551', 16)
 VAULT_RESPONSE_LIMIT = 1024 * 1024
+VAULT_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
 VAULT_PATH_SEGMENT = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$')
+# Marks an encrypted data key wrapped under the tenant-scoped context and
+# shared by several proofs (see _DataKeyCache).
+TENANT_DATA_KEY_PREFIX = b'sap-tenant-dk-v1:'
+ARCHIVE_BUNDLE_SCHEMA = 'sap-proof-bundle-v1'
 
 
 class ProofUnavailable(RuntimeError):
@@ -75,10 +90,11 @@ def _iso8601(value: datetime) -> str:
     return value.astimezone(datetime_timezone.utc).isoformat(timespec='microseconds').replace('+00:00', 'Z')
 
 
-def _normalize(value: Any) -> Any:
-    """Normalize supported values before RFC 8785-style deterministic JSON encoding."""
-    if value is None or isinstance(value, (str, bool, int)):
-        return value
+_json_string = json.encoder.encode_basestring
+
+
+def _canonical_scalar(value: Any) -> str:
+    """Return the string form of a non-JSON scalar accepted by the canonical encoder."""
     if isinstance(value, float):
         if not math.isfinite(value):
             raise ValueError('Non-finite numbers cannot be canonicalized.')
@@ -93,26 +109,53 @@ def _normalize(value: Any) -> Any:
         return value.isoformat()
     if isinstance(value, bytes):
         return _b64url(value)
-    if isinstance(value, dict):
-        normalized = {}
-        for key, item in value.items():
+    raise ValueError(f'Unsupported canonical JSON type: {type(value).__name__}')
+
+
+def _encode_canonical(value: Any, parts: list) -> None:
+    """Append the RFC 8785-style JSON text of ``value`` to ``parts`` in one pass.
+
+    Output is byte-identical to ``json.dumps(..., ensure_ascii=False,
+    sort_keys=True, separators=(',', ':'))`` over the normalized value, where
+    floats, decimals, UUIDs, dates, and bytes become JSON strings.
+    """
+    if isinstance(value, str):
+        parts.append(_json_string(value))
+    elif value is None:
+        parts.append('null')
+    elif value is True:
+        parts.append('true')
+    elif value is False:
+        parts.append('false')
+    elif isinstance(value, int):
+        parts.append(int.__repr__(value))
+    elif isinstance(value, dict):
+        for key in value:
             if not isinstance(key, str):
                 raise ValueError('Canonical JSON object keys must be strings.')
-            normalized[key] = _normalize(item)
-        return normalized
-    if isinstance(value, (list, tuple)):
-        return [_normalize(item) for item in value]
-    raise ValueError(f'Unsupported canonical JSON type: {type(value).__name__}')
+        separator = '{'
+        for key in sorted(value):
+            parts.append(separator)
+            parts.append(_json_string(key))
+            parts.append(':')
+            _encode_canonical(value[key], parts)
+            separator = ','
+        parts.append('}' if separator == ',' else '{}')
+    elif isinstance(value, (list, tuple)):
+        separator = '['
+        for item in value:
+            parts.append(separator)
+            _encode_canonical(item, parts)
+            separator = ','
+        parts.append(']' if separator == ',' else '[]')
+    else:
+        parts.append(_json_string(_canonical_scalar(value)))
 
 
 def canonical_json_bytes(value: Any) -> bytes:
-    return json.dumps(
-        _normalize(value),
-        ensure_ascii=False,
-        sort_keys=True,
-        separators=(',', ':'),
-        allow_nan=False,
-    ).encode('utf-8')
+    parts: list = []
+    _encode_canonical(value, parts)
+    return ''.join(parts).encode('utf-8')
 
 
 def canonical_json_value(value: Any) -> Any:
@@ -236,59 +279,288 @@ def _s3_client():
     return boto3.client('s3', **kwargs)
 
 
+def build_proof_archive_bundle(tenant_id, proofs) -> tuple[bytes, list[tuple[int, int]], dict]:
+    """Return ``(body, spans, metadata)`` for one Object Lock bundle object.
+
+    Each JWS is its own gzip member followed by a gzip member holding the JSON
+    manifest. Concatenated members are still one valid gzip stream, and each
+    ``(offset, length)`` span can be fetched alone with a byte-range GET.
+    """
+    body = bytearray()
+    spans = []
+    entries = []
+    for proof in proofs:
+        jws = proof.jws.encode('utf-8')
+        member = gzip.compress(jws, mtime=0)
+        spans.append((len(body), len(member)))
+        entries.append({
+            'proof_id': str(proof.id),
+            'offset': len(body),
+            'length': len(member),
+            'jws_sha256': sha256_hex(jws),
+            'ledger_entry_sha256': proof.ledger_entry_sha256,
+        })
+        body += member
+    manifest = gzip.compress(canonical_json_bytes({
+        'schema': ARCHIVE_BUNDLE_SCHEMA,
+        'tenant_id': str(tenant_id),
+        'proofs': entries,
+    }), mtime=0)
+    metadata = {
+        'schema': ARCHIVE_BUNDLE_SCHEMA,
+        'proof-count': str(len(entries)),
+        'manifest-offset': str(len(body)),
+        'manifest-length': str(len(manifest)),
+    }
+    body += manifest
+    return bytes(body), spans, metadata
+
+
+def _archive_read(
+    object_key: str, version_id: str = '', offset: int | None = None, length: int | None = None
+) -> bytes:
+    bucket = getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_BUCKET', '')
+    if not bucket:
+        raise ProofUnavailable('Archive bucket is not configured.')
+    kwargs = {'Bucket': bucket, 'Key': object_key}
+    if version_id:
+        kwargs['VersionId'] = version_id
+    if offset is not None:
+        kwargs['Range'] = f'bytes={offset}-{offset + length - 1}'
+    try:
+        return _s3_client().get_object(**kwargs)['Body'].read()
+    except ProofUnavailable:
+        raise
+    except Exception as exc:
+        raise ProofUnavailable('The proof archive could not be read.') from exc
+
+
+def archived_proof_jws(proof) -> str:
+    """Read one proof's JWS back from the archive, fetching only its bundle member."""
+    if proof.archive_status != 'archived' or not proof.archive_object_key:
+        raise ProofUnavailable('Proof has not been archived.')
+    if proof.archive_bundle_offset is None:
+        return _archive_read(proof.archive_object_key, proof.archive_version_id).decode('utf-8')
+    member = _archive_read(
+        proof.archive_object_key,
+        proof.archive_version_id,
+        proof.archive_bundle_offset,
+        proof.archive_bundle_length,
+    )
+    try:
+        return gzip.decompress(member).decode('utf-8')
+    except (OSError, EOFError, UnicodeDecodeError) as exc:
+        raise ProofUnavailable('Archived proof bundle member is corrupt.') from exc
+
+
+def proof_archive_bundle_manifest(object_key: str, version_id: str = '') -> dict:
+    bucket = getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_BUCKET', '')
+    kwargs = {'Bucket': bucket, 'Key': object_key}
+    if version_id:
+        kwargs['VersionId'] = version_id
+    try:
+        metadata = _s3_client().head_object(**kwargs).get('Metadata', {})
+        offset = int(metadata['manifest-offset'])
+        length = int(metadata['manifest-length'])
+    except Exception as exc:
+        raise ProofUnavailable('Archive object is not a proof bundle.') from exc
+    return json.loads(gzip.decompress(_archive_read(object_key, version_id, offset, length)))
+
+
 def _vault_path_segment(value: str, setting_name: str) -> str:
     if not value or not VAULT_PATH_SEGMENT.fullmatch(value):
         raise ProofUnavailable(f'{setting_name} contains an invalid Vault path segment.')
     return value
 
 
-def _vault_request(method: str, path: str, payload: dict | None = None) -> dict:
-    """Call Vault directly or through the dedicated Vault Proxy.
+class _VaultRetryableError(Exception):
+    """A transport failure or 5xx answer that may succeed on another attempt."""
 
-    Production uses Vault Proxy with ``use_auto_auth_token = "force"``. Django
-    therefore never receives the AppRole secret or a Vault token.
+
+class _VaultClient:
+    """Keep-alive Vault client shared by every Proof operation in one process.
+
+    The TLS context and connection pool live as long as the worker, the token
+    file is re-read only when its mtime changes, and a circuit breaker fails
+    fast after repeated transport failures instead of waiting on every timeout.
     """
-    base_url = getattr(settings, 'SECUREAPPROVE_VAULT_ADDR', '').rstrip('/')
-    if not base_url.startswith(('http://', 'https://')):
-        raise ProofUnavailable('SECUREAPPROVE_VAULT_ADDR must be an HTTP(S) URL.')
-    url = f"{base_url}/v1/{path.lstrip('/')}"
-    body = canonical_json_bytes(payload) if payload is not None else None
-    headers = {
-        'Accept': 'application/json',
-        'Content-Type': 'application/json',
-        'X-Vault-Request': 'true',
-    }
-    token_file = getattr(settings, 'SECUREAPPROVE_VAULT_TOKEN_FILE', '')
-    if token_file:
+
+    def __init__(self, config: tuple):
+        try:
+            import urllib3
+        except ImportError as exc:
+            raise ProofUnavailable('The Vault HTTP client is unavailable.') from exc
+        (
+            _pid,
+            self.base_url,
+            ca_bundle,
+            self.token_file,
+            timeout,
+            pool_size,
+            self.max_retries,
+            self.retry_backoff,
+            self.breaker_threshold,
+            self.breaker_reset,
+        ) = config
+        self.config = config
+        self._http_error = urllib3.exceptions.HTTPError
+        self._lock = threading.Lock()
+        self._token = None
+        self._token_mtime = None
+        self._failures = 0
+        self._open_until = 0.0
+        pool_kwargs = {
+            'maxsize': pool_size,
+            'retries': False,
+            'timeout': urllib3.Timeout(connect=timeout, read=timeout),
+        }
+        if self.base_url.startswith('https://'):
+            pool_kwargs['ssl_context'] = ssl.create_default_context(cafile=ca_bundle or None)
+        self._pool = urllib3.PoolManager(**pool_kwargs)
+
+    def _read_token(self) -> str | None:
+        if not self.token_file:
+            return None
         try:
-            with open(token_file, 'r', encoding='utf-8') as token_handle:
+            mtime = os.stat(self.token_file).st_mtime_ns
+        except OSError as exc:
+            raise ProofUnavailable('The Vault token file is unavailable.') from exc
+        with self._lock:
+            if self._token is not None and self._token_mtime == mtime:
+                return self._token
+        try:
+            with open(self.token_file, 'r', encoding='utf-8') as token_handle:
                 token = token_handle.read(4097).strip()
         except OSError as exc:
             raise ProofUnavailable('The Vault token file is unavailable.') from exc
         if not token or len(token) > 4096:
             raise ProofUnavailable('The Vault token file is invalid.')
-        headers['X-Vault-Token'] = token
-
-    request = urllib.request.Request(url, data=body, headers=headers, method=method)
-    context = None
-    if url.startswith('https://'):
-        ca_bundle = getattr(settings, 'SECUREAPPROVE_VAULT_CA_BUNDLE', '') or None
-        context = ssl.create_default_context(cafile=ca_bundle)
-    timeout = getattr(settings, 'SECUREAPPROVE_VAULT_TIMEOUT_SECONDS', 5)
-    try:
-        with urllib.request.urlopen(request, timeout=timeout, context=context) as response:
+        with self._lock:
+            self._token = token
+            self._token_mtime = mtime
+        return token
+
+    def _check_circuit(self) -> None:
+        with self._lock:
+            circuit_open = time.monotonic() < self._open_until
+        if circuit_open:
+            _metric('vault_circuit_open')
+            raise ProofUnavailable('Vault Transit is unavailable.')
+
+    def _record_result(self, success: bool) -> None:
+        with self._lock:
+            if success:
+                self._failures = 0
+                self._open_until = 0.0
+                return
+            self._failures += 1
+            if self._failures >= self.breaker_threshold:
+                self._open_until = time.monotonic() + self.breaker_reset
+
+    def _send(self, method: str, url: str, body: bytes | None, headers: dict) -> bytes:
+        try:
+            response = self._pool.request(
+                method,
+                url,
+                body=body,
+                headers=headers,
+                preload_content=False,
+                redirect=False,
+            )
+        except self._http_error as exc:
+            raise _VaultRetryableError(str(exc)) from exc
+        reusable = False
+        try:
+            if response.status in VAULT_RETRY_STATUSES:
+                raise _VaultRetryableError(f'Vault answered HTTP {response.status}.')
+            if response.status >= 300:
+                raise ProofUnavailable('Vault Transit is unavailable.')
             raw = response.read(VAULT_RESPONSE_LIMIT + 1)
-    except (urllib.error.HTTPError, urllib.error.URLError, TimeoutError, OSError) as exc:
-        raise ProofUnavailable('Vault Transit is unavailable.') from exc
-    if len(raw) > VAULT_RESPONSE_LIMIT:
-        raise ProofUnavailable('Vault returned an oversized response.')
-    try:
-        result = json.loads(raw.decode('utf-8'))
-    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
-        raise ProofUnavailable('Vault returned an invalid response.') from exc
-    if not isinstance(result, dict) or not isinstance(result.get('data'), dict):
-        raise ProofUnavailable('Vault returned an incomplete response.')
-    return result['data']
+            if len(raw) <= VAULT_RESPONSE_LIMIT:
+                response.drain_conn()
+                reusable = True
+        except self._http_error as exc:
+            raise _VaultRetryableError(str(exc)) from exc
+        finally:
+            # Error and oversized bodies are not drained; closing them keeps a
+            # half-read connection from being handed to the next request.
+            if not reusable:
+                response.close()
+            response.release_conn()
+        return raw
+
+    def request(self, method: str, path: str, payload: dict | None = None) -> dict:
+        self._check_circuit()
+        url = f"{self.base_url}/v1/{path.lstrip('/')}"
+        body = canonical_json_bytes(payload) if payload is not None else None
+        headers = {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+            'X-Vault-Request': 'true',
+        }
+        token = self._read_token()
+        if token:
+            headers['X-Vault-Token'] = token
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                raw = self._send(method, url, body, headers)
+                break
+            except _VaultRetryableError as exc:
+                if attempt >= self.max_retries:
+                    self._record_result(False)
+                    raise ProofUnavailable('Vault Transit is unavailable.') from exc
+                time.sleep(random.uniform(0, self.retry_backoff * (2 ** attempt)))
+        self._record_result(True)
+
+        if len(raw) > VAULT_RESPONSE_LIMIT:
+            raise ProofUnavailable('Vault returned an oversized response.')
+        try:
+            result = json.loads(raw.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise ProofUnavailable('Vault returned an invalid response.') from exc
+        if not isinstance(result, dict) or not isinstance(result.get('data'), dict):
+            raise ProofUnavailable('Vault returned an incomplete response.')
+        return result['data']
+
+
+_vault_client_instance = None
+_vault_client_lock = threading.Lock()
+
+
+def _vault_client() -> _VaultClient:
+    global _vault_client_instance
+
+    base_url = getattr(settings, 'SECUREAPPROVE_VAULT_ADDR', '').rstrip('/')
+    if not base_url.startswith(('http://', 'https://')):
+        raise ProofUnavailable('SECUREAPPROVE_VAULT_ADDR must be an HTTP(S) URL.')
+    # The PID is part of the configuration so a forked worker never reuses
+    # sockets inherited from its parent.
+    config = (
+        os.getpid(),
+        base_url,
+        getattr(settings, 'SECUREAPPROVE_VAULT_CA_BUNDLE', ''),
+        getattr(settings, 'SECUREAPPROVE_VAULT_TOKEN_FILE', ''),
+        getattr(settings, 'SECUREAPPROVE_VAULT_TIMEOUT_SECONDS', 5),
+        getattr(settings, 'SECUREAPPROVE_VAULT_POOL_SIZE', 10),
+        getattr(settings, 'SECUREAPPROVE_VAULT_MAX_RETRIES', 2),
+        getattr(settings, 'SECUREAPPROVE_VAULT_RETRY_BACKOFF_SECONDS', 0.2),
+        getattr(settings, 'SECUREAPPROVE_VAULT_CIRCUIT_BREAKER_THRESHOLD', 5),
+        getattr(settings, 'SECUREAPPROVE_VAULT_CIRCUIT_BREAKER_RESET_SECONDS', 30),
+    )
+    with _vault_client_lock:
+        if _vault_client_instance is None or _vault_client_instance.config != config:
+            _vault_client_instance = _VaultClient(config)
+        return _vault_client_instance
+
+
+def _vault_request(method: str, path: str, payload: dict | None = None) -> dict:
+    """Call Vault directly or through the dedicated Vault Proxy.
+
+    Production uses Vault Proxy with ``use_auto_auth_token = "force"``. Django
+    therefore never receives the AppRole secret or a Vault token.
+    """
+    return _vault_client().request(method, path, payload)
 
 
 def _vault_signing_key_metadata():
@@ -336,6 +608,78 @@ def _vault_context(proof_id, tenant_id) -> str:
     return base64.b64encode(_encryption_aad(proof_id, tenant_id)).decode('ascii')
 
 
+_signing_key_cache: dict[tuple, tuple[float, str, Any]] = {}
+_signing_key_cache_lock = threading.Lock()
+
+
+def _signing_key_cache_get(cache_key: tuple, version: str):
+    """Return a cached key row stored under the current key status version.
+
+    Entries are process-local but tagged with the shared
+    ``signing_key_status_version()``, so a status change saved by any worker
+    invalidates them everywhere on the next lookup. Without a version (shared
+    cache unavailable) nothing is served from the cache.
+    """
+    if not version:
+        return None
+    with _signing_key_cache_lock:
+        entry = _signing_key_cache.get(cache_key)
+    if entry is None or entry[0] <= time.monotonic() or entry[1] != version:
+        return None
+    return entry[2]
+
+
+def _signing_key_cache_set(cache_key: tuple, version: str, value) -> None:
+    ttl = getattr(settings, 'SECUREAPPROVE_PROOF_KEY_CACHE_SECONDS', 60)
+    if ttl <= 0 or not version:
+        return
+    with _signing_key_cache_lock:
+        _signing_key_cache[cache_key] = (time.monotonic() + ttl, version, value)
+
+
+def invalidate_signing_key_cache() -> None:
+    """Drop this process's cached signing keys so the next lookup reloads them.
+
+    Other workers drop theirs when the status version is bumped (see
+    ``bump_signing_key_status_version``).
+    """
+    with _signing_key_cache_lock:
+        _signing_key_cache.clear()
+        _jwks_document_cache.clear()
+    _ec_public_key.cache_clear()
+
+
+def _active_key_cache_key() -> tuple:
+    return (
+        'active',
+        getattr(settings, 'SECUREAPPROVE_PROOF_SIGNER', 'aws_kms'),
+        getattr(settings, 'SECUREAPPROVE_PROOF_SIGNING_KID', ''),
+        getattr(settings, 'SECUREAPPROVE_PROOF_SIGNING_KEY_ARN', ''),
+        getattr(settings, 'SECUREAPPROVE_VAULT_SIGNING_KEY', ''),
+    )
+
+
+def _cache_signing_key(key, version: str | None, active: bool = False) -> None:
+    """Cache a key row once the surrounding transaction has committed.
+
+    A key created or reactivated inside a transaction that later rolls back
+    must never be served from the cache, so population is deferred.
+    ``version`` must be read before the row was loaded: if a status change
+    lands in between, the entry is stored under a stale version and never
+    served. Rows this transaction just wrote pass ``None`` and are tagged with
+    the version bumped by their own commit.
+    """
+    active_cache_key = _active_key_cache_key() if active else None
+
+    def store():
+        current = signing_key_status_version() if version is None else version
+        _signing_key_cache_set(('kid', key.kid), current, key)
+        if active_cache_key:
+            _signing_key_cache_set(active_cache_key, current, key)
+
+    transaction.on_commit(store)
+
+
 def _activate_signing_key(kid: str, key_arn: str, jwk: dict):
     from apps.authentication.models import ProofSigningKey
 
@@ -370,6 +714,8 @@ def _activate_signing_key(kid: str, key_arn: str, jwk: dict):
     ProofSigningKey.objects.filter(status='active').exclude(pk=key.pk).update(
         status='retired', deactivated_at=timezone.now()
     )
+    invalidate_signing_key_cache()
+    transaction.on_commit(invalidate_signing_key_cache)
     return key
 
 
@@ -404,12 +750,23 @@ def sync_active_signing_key():
     else:
         raise ProofUnavailable('Unsupported SecureApprove Proof signing backend.')
 
-    return _activate_signing_key(kid, key_arn, jwk)
+    key = _activate_signing_key(kid, key_arn, jwk)
+    _cache_signing_key(key, None, active=True)
+    return key
 
 
 def _active_signing_key():
+    """Return the active signing key, reusing a recent lookup when possible.
+
+    In ``vault_transit`` mode a cache hit also skips the key-metadata request,
+    so a Vault-side rotation is picked up within the cache TTL.
+    """
     from apps.authentication.models import ProofSigningKey
 
+    version = signing_key_status_version()
+    cached = _signing_key_cache_get(_active_key_cache_key(), version)
+    if cached is not None:
+        return cached
     key = ProofSigningKey.objects.filter(status='active').order_by('-activated_at').first()
     expected_kid = getattr(settings, 'SECUREAPPROVE_PROOF_SIGNING_KID', '')
     signer = getattr(settings, 'SECUREAPPROVE_PROOF_SIGNER', 'aws_kms')
@@ -425,14 +782,39 @@ def _active_signing_key():
             and key.key_arn == key_arn
             and canonical_json_bytes(key.public_jwk) == canonical_json_bytes(jwk)
         ):
+            _cache_signing_key(key, version, active=True)
             return key
-        return _activate_signing_key(vault_kid, key_arn, jwk)
+        key = _activate_signing_key(vault_kid, key_arn, jwk)
+        _cache_signing_key(key, None, active=True)
+        return key
     if key:
         if not expected_kid or key.kid == expected_kid:
+            _cache_signing_key(key, version, active=True)
             return key
     return sync_active_signing_key()
 
 
+@functools.lru_cache(maxsize=64)
+def _ec_public_key(x: str, y: str):
+    return ec.EllipticCurvePublicNumbers(
+        int.from_bytes(_b64url_decode(x), 'big'),
+        int.from_bytes(_b64url_decode(y), 'big'),
+        ec.SECP256R1(),
+    ).public_key()
+
+
+def _signing_key_for_kid(kid: str):
+    from apps.authentication.models import ProofSigningKey
+
+    version = signing_key_status_version()
+    key = _signing_key_cache_get(('kid', kid), version)
+    if key is None:
+        key = ProofSigningKey.objects.filter(kid=kid).first()
+        if key:
+            _cache_signing_key(key, version)
+    return key
+
+
 def _sign_es256(signing_key, signing_input: bytes) -> bytes:
     signer = getattr(settings, 'SECUREAPPROVE_PROOF_SIGNER', 'aws_kms')
     if signer == 'local':
@@ -492,15 +874,103 @@ def _encryption_aad(proof_id, tenant_id) -> bytes:
     return canonical_json_bytes({'proof_id': str(proof_id), 'schema': SCHEMA, 'tenant_id': str(tenant_id)})
 
 
-def _encrypt_evidence(proof_id, tenant_id, evidence: dict) -> tuple[bytes, bytes, bytes]:
-    backend = getattr(settings, 'SECUREAPPROVE_PROOF_ENCRYPTION_BACKEND', 'aws_kms')
-    aad = _encryption_aad(proof_id, tenant_id)
-    if backend == 'local':
-        if not settings.DEBUG and 'test' not in sys.argv and not any('pytest' in arg for arg in sys.argv):
-            raise ProofUnavailable('Local Proof encryption is not allowed in production.')
-        data_key = hashlib.sha256((settings.SECRET_KEY + ':secureapprove-proof-evidence-v1').encode()).digest()
-        encrypted_data_key = b'local-v1'
-    elif backend == 'vault_transit':
+class _DataKeyCache:
+    """Bounded, in-memory reuse of evidence data keys, per tenant.
+
+    Modeled on a caching cryptographic-materials manager: one data key wraps
+    at most ``max_messages`` proofs and lives at most ``seconds``. Unwrapped
+    keys are kept only in this process, are dropped after fork, and never
+    exceed ``max_entries`` per direction. Every proof still uses its own
+    nonce and its own AAD.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._encryption = OrderedDict()
+        self._decryption = OrderedDict()
+
+    @staticmethod
+    def seconds() -> int:
+        return getattr(settings, 'SECUREAPPROVE_PROOF_DATA_KEY_CACHE_SECONDS', 0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.seconds() > 0
+
+    def _reset_after_fork(self) -> None:
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._encryption.clear()
+            self._decryption.clear()
+
+    def _store(self, entries: OrderedDict, cache_key: tuple, value: list) -> None:
+        entries[cache_key] = value
+        entries.move_to_end(cache_key)
+        max_entries = getattr(settings, 'SECUREAPPROVE_PROOF_DATA_KEY_CACHE_MAX_ENTRIES', 256)
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
+
+    def checkout(self, cache_key: tuple) -> tuple[bytes, bytes] | None:
+        """Return a cached (data_key, encrypted_data_key) and consume one use."""
+        with self._lock:
+            self._reset_after_fork()
+            entry = self._encryption.get(cache_key)
+            if entry is None:
+                return None
+            expires_at, remaining, data_key, encrypted_data_key = entry
+            if expires_at <= time.monotonic() or remaining <= 0:
+                del self._encryption[cache_key]
+                return None
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._encryption[cache_key]
+            return data_key, encrypted_data_key
+
+    def add(self, cache_key: tuple, data_key: bytes, encrypted_data_key: bytes) -> None:
+        """Cache a freshly generated key after it has been used once."""
+        remaining = getattr(settings, 'SECUREAPPROVE_PROOF_DATA_KEY_CACHE_MAX_MESSAGES', 1000) - 1
+        with self._lock:
+            self._reset_after_fork()
+            if remaining > 0:
+                self._store(
+                    self._encryption,
+                    cache_key,
+                    [time.monotonic() + self.seconds(), remaining, data_key, encrypted_data_key],
+                )
+
+    def unwrapped(self, cache_key: tuple) -> bytes | None:
+        with self._lock:
+            self._reset_after_fork()
+            entry = self._decryption.get(cache_key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._decryption[cache_key]
+                return None
+            return entry[1]
+
+    def remember_unwrapped(self, cache_key: tuple, data_key: bytes) -> None:
+        with self._lock:
+            self._reset_after_fork()
+            self._store(self._decryption, cache_key, [time.monotonic() + self.seconds(), data_key])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._encryption.clear()
+            self._decryption.clear()
+
+
+_data_key_cache = _DataKeyCache()
+
+
+def _tenant_data_key_context(tenant_id) -> dict:
+    return {'schema': SCHEMA, 'scope': 'tenant', 'tenant_id': str(tenant_id)}
+
+
+def _evidence_key_material(backend: str) -> tuple:
+    """Return the backend-specific key location used to wrap evidence data keys."""
+    if backend == 'vault_transit':
         mount = _vault_path_segment(
             getattr(settings, 'SECUREAPPROVE_VAULT_TRANSIT_MOUNT', 'transit'),
             'SECUREAPPROVE_VAULT_TRANSIT_MOUNT',
@@ -509,11 +979,32 @@ def _encrypt_evidence(proof_id, tenant_id, evidence: dict) -> tuple[bytes, bytes
             getattr(settings, 'SECUREAPPROVE_VAULT_ENCRYPTION_KEY', ''),
             'SECUREAPPROVE_VAULT_ENCRYPTION_KEY',
         )
+        return mount, key_name
+    return (getattr(settings, 'SECUREAPPROVE_PROOF_ENCRYPTION_KEY_ARN', ''),)
+
+
+def _unwrap_cache_key(backend: str, proof_id, tenant_id, encrypted_data_key: bytes) -> tuple:
+    # Tenant-scoped keys are bound to the tenant, per-proof keys to the proof,
+    # exactly like the context the key service would enforce on decrypt.
+    if encrypted_data_key.startswith(TENANT_DATA_KEY_PREFIX):
+        scope = ('tenant', str(tenant_id))
+    else:
+        scope = ('proof', str(proof_id))
+    return (backend, *_evidence_key_material(backend), *scope, sha256_hex(encrypted_data_key))
+
+
+def _generate_data_key(backend: str, proof_id, tenant_id, tenant_scoped: bool) -> tuple[bytes, bytes]:
+    if backend == 'vault_transit':
+        mount, key_name = _evidence_key_material(backend)
+        if tenant_scoped:
+            context = base64.b64encode(canonical_json_bytes(_tenant_data_key_context(tenant_id))).decode('ascii')
+        else:
+            context = _vault_context(proof_id, tenant_id)
         try:
             response = _vault_request(
                 'POST',
                 f'{mount}/datakey/plaintext/{urllib.parse.quote(key_name)}',
-                {'bits': 256, 'context': _vault_context(proof_id, tenant_id)},
+                {'bits': 256, 'context': context},
             )
             data_key = base64.b64decode(response['plaintext'], validate=True)
             encrypted_data_key = response['ciphertext'].encode('ascii')
@@ -524,21 +1015,83 @@ def _encrypt_evidence(proof_id, tenant_id, evidence: dict) -> tuple[bytes, bytes
             if isinstance(exc, ProofUnavailable):
                 raise
             raise ProofUnavailable('Vault Transit could not create an evidence key.') from exc
-    elif backend == 'aws_kms':
-        key_arn = getattr(settings, 'SECUREAPPROVE_PROOF_ENCRYPTION_KEY_ARN', '')
+    else:
+        (key_arn,) = _evidence_key_material(backend)
         if not key_arn:
             raise ProofUnavailable('Proof encryption key ARN is required.')
+        if tenant_scoped:
+            encryption_context = _tenant_data_key_context(tenant_id)
+        else:
+            encryption_context = {'proof_id': str(proof_id), 'schema': SCHEMA}
         try:
             response = _kms_client().generate_data_key(
                 KeyId=key_arn,
                 KeySpec='AES_256',
-                EncryptionContext={'proof_id': str(proof_id), 'schema': SCHEMA},
+                EncryptionContext=encryption_context,
             )
             data_key = response['Plaintext']
             encrypted_data_key = response['CiphertextBlob']
         except Exception as exc:
             _metric('kms_encryption_failures')
             raise ProofUnavailable('AWS KMS could not create an evidence key.') from exc
+    if tenant_scoped:
+        encrypted_data_key = TENANT_DATA_KEY_PREFIX + encrypted_data_key
+    return data_key, encrypted_data_key
+
+
+def _unwrap_data_key(backend: str, proof_id, tenant_id, encrypted_data_key: bytes) -> bytes:
+    tenant_scoped = encrypted_data_key.startswith(TENANT_DATA_KEY_PREFIX)
+    wrapped = encrypted_data_key[len(TENANT_DATA_KEY_PREFIX):] if tenant_scoped else encrypted_data_key
+    if backend == 'vault_transit':
+        mount, key_name = _evidence_key_material(backend)
+        if tenant_scoped:
+            context = base64.b64encode(canonical_json_bytes(_tenant_data_key_context(tenant_id))).decode('ascii')
+        else:
+            context = _vault_context(proof_id, tenant_id)
+        response = _vault_request(
+            'POST',
+            f'{mount}/decrypt/{urllib.parse.quote(key_name)}',
+            {'ciphertext': wrapped.decode('ascii'), 'context': context},
+        )
+        data_key = base64.b64decode(response['plaintext'], validate=True)
+        if len(data_key) != 32:
+            raise ValueError('Unexpected Vault data key.')
+        return data_key
+    if tenant_scoped:
+        encryption_context = _tenant_data_key_context(tenant_id)
+    else:
+        encryption_context = {'proof_id': str(proof_id), 'schema': SCHEMA}
+    response = _kms_client().decrypt(
+        CiphertextBlob=wrapped,
+        KeyId=_evidence_key_material(backend)[0],
+        EncryptionContext=encryption_context,
+    )
+    return response['Plaintext']
+
+
+def _encrypt_evidence(proof_id, tenant_id, evidence: dict) -> tuple[bytes, bytes, bytes]:
+    backend = getattr(settings, 'SECUREAPPROVE_PROOF_ENCRYPTION_BACKEND', 'aws_kms')
+    aad = _encryption_aad(proof_id, tenant_id)
+    if backend == 'local':
+        if not settings.DEBUG and 'test' not in sys.argv and not any('pytest' in arg for arg in sys.argv):
+            raise ProofUnavailable('Local Proof encryption is not allowed in production.')
+        data_key = hashlib.sha256((settings.SECRET_KEY + ':secureapprove-proof-evidence-v1').encode()).digest()
+        encrypted_data_key = b'local-v1'
+    elif backend in {'vault_transit', 'aws_kms'}:
+        if _data_key_cache.enabled:
+            cache_key = (backend, *_evidence_key_material(backend), str(tenant_id))
+            cached = _data_key_cache.checkout(cache_key)
+            if cached:
+                data_key, encrypted_data_key = cached
+                _metric('data_key_cache_hits')
+            else:
+                data_key, encrypted_data_key = _generate_data_key(backend, proof_id, tenant_id, True)
+                _data_key_cache.add(cache_key, data_key, encrypted_data_key)
+                _data_key_cache.remember_unwrapped(
+                    _unwrap_cache_key(backend, proof_id, tenant_id, encrypted_data_key), data_key
+                )
+        else:
+            data_key, encrypted_data_key = _generate_data_key(backend, proof_id, tenant_id, False)
     else:
         raise ProofUnavailable('Unsupported SecureApprove Proof encryption backend.')
     nonce = os.urandom(12)
@@ -552,37 +1105,15 @@ def decrypt_evidence(proof) -> dict:
     backend = getattr(settings, 'SECUREAPPROVE_PROOF_ENCRYPTION_BACKEND', 'aws_kms')
     if backend == 'local':
         data_key = hashlib.sha256((settings.SECRET_KEY + ':secureapprove-proof-evidence-v1').encode()).digest()
-    elif backend == 'vault_transit':
-        mount = _vault_path_segment(
-            getattr(settings, 'SECUREAPPROVE_VAULT_TRANSIT_MOUNT', 'transit'),
-            'SECUREAPPROVE_VAULT_TRANSIT_MOUNT',
-        )
-        key_name = _vault_path_segment(
-            getattr(settings, 'SECUREAPPROVE_VAULT_ENCRYPTION_KEY', ''),
-            'SECUREAPPROVE_VAULT_ENCRYPTION_KEY',
-        )
-        try:
-            response = _vault_request(
-                'POST',
-                f'{mount}/decrypt/{urllib.parse.quote(key_name)}',
-                {
-                    'ciphertext': bytes(proof.encrypted_data_key).decode('ascii'),
-                    'context': _vault_context(proof.id, proof.tenant_id),
-                },
-            )
-            data_key = base64.b64decode(response['plaintext'], validate=True)
-            if len(data_key) != 32:
-                raise ValueError('Unexpected Vault data key.')
-        except Exception as exc:
-            raise InvalidProof('Private evidence could not be decrypted.') from exc
-    elif backend == 'aws_kms':
+    elif backend in {'vault_transit', 'aws_kms'}:
+        encrypted_data_key = bytes(proof.encrypted_data_key)
         try:
-            response = _kms_client().decrypt(
-                CiphertextBlob=bytes(proof.encrypted_data_key),
-                KeyId=getattr(settings, 'SECUREAPPROVE_PROOF_ENCRYPTION_KEY_ARN', ''),
-                EncryptionContext={'proof_id': str(proof.id), 'schema': SCHEMA},
-            )
-            data_key = response['Plaintext']
+            cache_key = _unwrap_cache_key(backend, proof.id, proof.tenant_id, encrypted_data_key)
+            data_key = _data_key_cache.unwrapped(cache_key) if _data_key_cache.enabled else None
+            if data_key is None:
+                data_key = _unwrap_data_key(backend, proof.id, proof.tenant_id, encrypted_data_key)
+                if _data_key_cache.enabled:
+                    _data_key_cache.remember_unwrapped(cache_key, data_key)
         except Exception as exc:
             raise InvalidProof('Private evidence could not be decrypted.') from exc
     else:
@@ -704,13 +1235,8 @@ def _retention_date(issued_at: datetime, years: int) -> datetime:
         return issued_at.replace(month=2, day=28, year=issued_at.year + years)
 
 
-def _metric(name: str):
-    try:
-        cache.incr(f'secureapprove_proof_metric:{name}')
-    except ValueError:
-        cache.set(f'secureapprove_proof_metric:{name}', 1, timeout=None)
-    except Exception:
-        logger.debug('Proof metric unavailable: %s', name, exc_info=True)
+def _metric(name: str, amount: int = 1):
+    metrics.inc('secureapprove_proof_events_total', amount, event=name)
 
 
 def issue_security_proof(
@@ -732,6 +1258,7 @@ def issue_security_proof(
         return None
     if transaction.get_connection().in_atomic_block is False:
         raise RuntimeError('SecurityProof issuance requires transaction.atomic().')
+    started = time.perf_counter()
 
     digest = transaction_sha256(transaction_snapshot)
     bound_digest = verification_result.get('transaction_sha256')
@@ -745,7 +1272,9 @@ def issue_security_proof(
     assertion_digest = assertion_sha256(webauthn_evidence)
 
     head, _ = ProofLedgerHead.objects.get_or_create(tenant=tenant)
+    lock_started = time.perf_counter()
     head = ProofLedgerHead.objects.select_for_update().get(pk=head.pk)
+    metrics.observe('secureapprove_proof_ledger_lock_seconds', time.perf_counter() - lock_started)
     signing_key = _active_signing_key()
     proof_id = uuid.uuid4()
     issued_at = timezone.now()
@@ -808,8 +1337,13 @@ def issue_security_proof(
     head.entry_count += 1
     head.save(update_fields=['last_entry_sha256', 'entry_count', 'updated_at'])
     _metric('issued')
+    metrics.observe(
+        'secureapprove_proof_issue_seconds',
+        time.perf_counter() - started,
+        signer=getattr(settings, 'SECUREAPPROVE_PROOF_SIGNER', 'aws_kms'),
+    )
 
-    if archive_status == 'pending':
+    if archive_status == 'pending' and getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_MODE', 'single') != 'bundle':
         def enqueue_archive():
             from apps.authentication.tasks import archive_security_proof
             archive_security_proof.delay(str(proof.id))
@@ -817,9 +1351,7 @@ def issue_security_proof(
     return proof
 
 
-def verify_compact_jws(jws: str) -> dict:
-    from apps.authentication.models import ProofSigningKey
-
+def _parse_compact_jws(jws: str) -> tuple[list[str], dict, dict, bytes]:
     if not isinstance(jws, str) or len(jws.encode('utf-8')) > 16384:
         raise InvalidProof('Proof exceeds the 16 KB limit.')
     parts = jws.split('.')
@@ -840,34 +1372,43 @@ def verify_compact_jws(jws: str) -> dict:
         raise InvalidProof('Proof header is invalid.')
     if payload.get('iss') != ISSUER or payload.get('schema') != SCHEMA:
         raise InvalidProof('Proof issuer or schema is invalid.')
-    key = ProofSigningKey.objects.filter(kid=header['kid']).first()
-    if not key:
-        raise InvalidProof('Unknown signing key.')
-    if len(signature) != 64:
-        raise InvalidProof('ES256 signature has an invalid length.')
-    jwk = key.public_jwk
+    return parts, header, payload, signature
+
+
+def _es256_signature_is_valid(x: str, y: str, signing_input: bytes, signature: bytes) -> bool:
+    """Check one raw 64-byte ES256 signature; picklable for process-pool workers."""
     try:
-        public_numbers = ec.EllipticCurvePublicNumbers(
-            int.from_bytes(_b64url_decode(jwk['x']), 'big'),
-            int.from_bytes(_b64url_decode(jwk['y']), 'big'),
-            ec.SECP256R1(),
-        )
         der_signature = encode_dss_signature(
             int.from_bytes(signature[:32], 'big'),
             int.from_bytes(signature[32:], 'big'),
         )
-        public_numbers.public_key().verify(
-            der_signature,
-            f'{parts[0]}.{parts[1]}'.encode('ascii'),
-            ec.ECDSA(hashes.SHA256()),
-        )
-    except Exception as exc:
-        raise InvalidProof('Proof signature is invalid.') from exc
+        _ec_public_key(x, y).verify(der_signature, signing_input, ec.ECDSA(hashes.SHA256()))
+    except Exception:
+        return False
+    return True
+
+
+def verify_compact_jws(jws: str) -> dict:
+    parts, header, payload, signature = _parse_compact_jws(jws)
+    key = _signing_key_for_kid(header['kid'])
+    if not key:
+        raise InvalidProof('Unknown signing key.')
+    if len(signature) != 64:
+        raise InvalidProof('ES256 signature has an invalid length.')
+    jwk = key.public_jwk
+    if not _es256_signature_is_valid(
+        jwk.get('x'), jwk.get('y'), f'{parts[0]}.{parts[1]}'.encode('ascii'), signature
+    ):
+        raise InvalidProof('Proof signature is invalid.')
     return {'header': header, 'payload': payload, 'key': key}
 
 
-def verification_result_for_proof(proof) -> dict:
-    """Return the minimal, PII-free public verification result for a stored proof."""
+def verification_result_for_proof(proof, signing_key=None) -> dict:
+    """Return the minimal, PII-free public verification result for a stored proof.
+
+    ``signing_key`` is a key row loaded fresh from the database; when it is
+    the proof's signing key its status is reported instead of the cached one.
+    """
     try:
         verified = verify_compact_jws(proof.jws)
     except InvalidProof as exc:
@@ -879,6 +1420,12 @@ def verification_result_for_proof(proof) -> dict:
             'proof_id': str(proof.id),
             'detail': str(exc),
         }
+    if signing_key is not None and signing_key.kid == verified['key'].kid:
+        verified['key'] = signing_key
+    return _stored_proof_result(proof, verified)
+
+
+def _stored_proof_result(proof, verified: dict) -> dict:
     payload = verified['payload']
     matches_record = (
         payload == proof.public_payload
@@ -917,23 +1464,518 @@ def verification_result_for_proof(proof) -> dict:
     }
 
 
+KEY_STATUS_VERSION_CACHE_KEY = 'secureapprove_proof_key_status_version'
+
+
+def signing_key_status_version() -> str:
+    """Return a shared token that changes whenever any signing key changes status.
+
+    A random token rather than a counter is used so an evicted version can
+    never be recreated with a value that older cached results still carry.
+    """
+    try:
+        version = cache.get(KEY_STATUS_VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(KEY_STATUS_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(KEY_STATUS_VERSION_CACHE_KEY)
+    except Exception:
+        logger.debug('Proof key status version unavailable.', exc_info=True)
+        return ''
+    return version or ''
+
+
+def bump_signing_key_status_version() -> None:
+    try:
+        cache.set(KEY_STATUS_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+    except Exception:
+        logger.warning('Proof key status version could not be rotated.', exc_info=True)
+
+
+JWKS_CACHE_KEY = 'secureapprove_proof_jwks'
+_jwks_document_cache: dict = {}
+
+
+def proof_jwks_document() -> tuple[bytes, str]:
+    """Return the serialized public JWKS and its strong ETag.
+
+    The document is cached in-process and in the shared cache under the
+    current key status version, so it is rebuilt from the database only after
+    a key is activated, rotated, or compromised.
+    """
+    from apps.authentication.models import ProofSigningKey
+
+    version = signing_key_status_version()
+    with _signing_key_cache_lock:
+        local = _jwks_document_cache.get('current')
+    if version and local and local[0] == version:
+        return local[1], local[2]
+
+    shared_key = f'{JWKS_CACHE_KEY}:{version}'
+    document = None
+    if version:
+        try:
+            document = cache.get(shared_key)
+        except Exception:
+            logger.debug('Cached proof JWKS unavailable.', exc_info=True)
+    if document is None:
+        keys = []
+        for key in ProofSigningKey.objects.order_by('-activated_at', 'kid'):
+            jwk = dict(key.public_jwk)
+            jwk['secureapprove_status'] = key.status
+            keys.append(jwk)
+        body = canonical_json_bytes({'keys': keys})
+        document = (body, f'"{sha256_hex(body)}"')
+        if version:
+            try:
+                cache.set(shared_key, document, timeout=86400)
+            except Exception:
+                logger.debug('Proof JWKS could not be cached.', exc_info=True)
+    if version:
+        with _signing_key_cache_lock:
+            _jwks_document_cache['current'] = (version, *document)
+    return document
+
+
+def _verification_cache_key(proof_id, version: str) -> str:
+    return f'secureapprove_proof_verification:{proof_id}:{version}'
+
+
+def forget_verification_result(proof_id) -> None:
+    """Drop a cached result after the stored proof changes, e.g. once archived."""
+    version = signing_key_status_version()
+    if not version:
+        return
+    try:
+        cache.delete(_verification_cache_key(proof_id, version))
+    except Exception:
+        logger.debug('Proof verification cache unavailable.', exc_info=True)
+
+
+def cached_verification_result_for_proof_id(proof_id) -> dict | None:
+    """Serve the public verification result for a stored proof, usually from cache.
+
+    Proofs are immutable once issued, so repeated opens of the same verify
+    link reuse the result until it expires or any signing key changes
+    status. Returns ``None`` for unknown proofs, which are never cached.
+    """
+    from apps.authentication.models import SecurityProof
+
+    timeout = getattr(settings, 'SECUREAPPROVE_PROOF_VERIFICATION_CACHE_SECONDS', 300)
+    version = signing_key_status_version() if timeout > 0 else ''
+    cache_key = _verification_cache_key(proof_id, version)
+    if version:
+        try:
+            result = cache.get(cache_key)
+        except Exception:
+            logger.debug('Proof verification cache unavailable.', exc_info=True)
+            result = None
+        if result is not None:
+            _metric('verification_cache_hits')
+            return result
+
+    proof = SecurityProof.objects.select_related('signing_key').filter(pk=proof_id).first()
+    if not proof:
+        return None
+    # The key row comes from the query above, issued after the version was
+    # read, so a cached result never carries an older key status than its
+    # version; this process's key cache may lag another worker's change.
+    result = verification_result_for_proof(proof, signing_key=proof.signing_key)
+    if version:
+        try:
+            cache.set(cache_key, result, timeout=timeout)
+        except Exception:
+            logger.debug('Proof verification cache unavailable.', exc_info=True)
+    return result
+
+
+def _invalid_jws_result(exc: InvalidProof) -> dict:
+    _metric('verification_invalid')
+    return {'valid': False, 'signature_valid': False, 'status': 'altered', 'detail': str(exc)}
+
+
+def _verified_proof_id(verified: dict) -> uuid.UUID | None:
+    try:
+        return uuid.UUID(str(verified['payload'].get('jti')))
+    except (TypeError, ValueError):
+        return None
+
+
+def _registered_jws_result(jws: str, verified: dict, proof_id, proof) -> dict:
+    if proof_id is None:
+        return {'valid': False, 'signature_valid': True, 'status': 'unknown'}
+    if not proof or proof.jws != jws:
+        return {'valid': False, 'signature_valid': True, 'status': 'unknown', 'proof_id': str(proof_id)}
+    # The submitted JWS is byte-identical to the stored one and its signature
+    # was just checked, so the stored proof does not need a second ECDSA verify.
+    return _stored_proof_result(proof, verified)
+
+
 def verification_result_for_jws(jws: str) -> dict:
     from apps.authentication.models import SecurityProof
 
     try:
         verified = verify_compact_jws(jws)
     except InvalidProof as exc:
-        _metric('verification_invalid')
-        return {'valid': False, 'signature_valid': False, 'status': 'altered', 'detail': str(exc)}
-    proof_id = verified['payload'].get('jti')
+        return _invalid_jws_result(exc)
+    proof_id = _verified_proof_id(verified)
+    proof = None
+    if proof_id is not None:
+        proof = SecurityProof.objects.select_related('signing_key').filter(pk=proof_id).first()
+    return _registered_jws_result(jws, verified, proof_id, proof)
+
+
+def jws_values_from_json(value) -> list:
+    """Accept ``[jws, ...]`` or ``{"jws": [jws, ...]}`` from a batch request."""
+    if isinstance(value, dict):
+        value = value.get('jws')
+    if not isinstance(value, list):
+        raise ValueError('Expected a JSON array of compact JWS values.')
+    return value
+
+
+def jws_values_from_ndjson(lines: Iterable) -> Iterator:
+    """Yield one JWS per NDJSON line: a JSON string, ``{"jws": ...}`` or bare text."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] in '"{':
+            try:
+                value = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError('Invalid NDJSON line.') from exc
+            yield value.get('jws') if isinstance(value, dict) else value
+        else:
+            yield line
+
+
+_verification_pool = None
+_verification_pool_config = None
+_verification_pool_lock = threading.Lock()
+
+
+def _verification_executor(workers: int) -> ProcessPoolExecutor:
+    global _verification_pool, _verification_pool_config
+
+    # Spawned workers never inherit open database or Redis sockets, and the
+    # PID check keeps a forked web worker from reusing its parent's pool.
+    config = (os.getpid(), workers)
+    with _verification_pool_lock:
+        if _verification_pool is None or _verification_pool_config != config:
+            _verification_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            _verification_pool_config = config
+        return _verification_pool
+
+
+def _check_es256_signatures(checks: list[tuple], workers: int | None) -> list[bool]:
+    if workers is None:
+        workers = getattr(settings, 'SECUREAPPROVE_PROOF_VERIFY_WORKERS', 0) or os.cpu_count() or 1
+    parallel_min = getattr(settings, 'SECUREAPPROVE_PROOF_VERIFY_PARALLEL_MIN', 200)
+    if workers <= 1 or len(checks) < max(parallel_min, 2):
+        return [_es256_signature_is_valid(*check) for check in checks]
+    chunksize = max(1, len(checks) // (workers * 4))
+    return list(_verification_executor(workers).map(
+        _es256_signature_is_valid, *zip(*checks), chunksize=chunksize
+    ))
+
+
+def _verify_jws_chunk(jws_values: list, workers: int | None) -> list[dict]:
+    from apps.authentication.models import ProofSigningKey, SecurityProof
+
+    outcomes: list = []
+    for jws in jws_values:
+        try:
+            outcomes.append(_parse_compact_jws(jws.strip() if isinstance(jws, str) else jws))
+        except InvalidProof as exc:
+            outcomes.append(exc)
+
+    kids = {outcome[1]['kid'] for outcome in outcomes if isinstance(outcome, tuple)}
+    keys = {key.kid: key for key in ProofSigningKey.objects.filter(kid__in=kids)} if kids else {}
+
+    pending = []
+    checks = []
+    for index, outcome in enumerate(outcomes):
+        if not isinstance(outcome, tuple):
+            continue
+        parts, header, payload, signature = outcome
+        key = keys.get(header['kid'])
+        if not key:
+            outcomes[index] = InvalidProof('Unknown signing key.')
+        elif len(signature) != 64:
+            outcomes[index] = InvalidProof('ES256 signature has an invalid length.')
+        else:
+            pending.append(index)
+            checks.append((
+                key.public_jwk.get('x'),
+                key.public_jwk.get('y'),
+                f'{parts[0]}.{parts[1]}'.encode('ascii'),
+                signature,
+            ))
+    for index, valid in zip(pending, _check_es256_signatures(checks, workers)):
+        _parts, header, payload, _signature = outcomes[index]
+        if valid:
+            outcomes[index] = {'header': header, 'payload': payload, 'key': keys[header['kid']]}
+        else:
+            outcomes[index] = InvalidProof('Proof signature is invalid.')
+
+    proof_ids = {
+        _verified_proof_id(outcome) for outcome in outcomes if isinstance(outcome, dict)
+    } - {None}
+    proofs = {
+        proof.pk: proof
+        for proof in SecurityProof.objects.select_related('signing_key').filter(pk__in=proof_ids)
+    } if proof_ids else {}
+
+    results = []
+    for jws, outcome in zip(jws_values, outcomes):
+        if isinstance(outcome, InvalidProof):
+            results.append(_invalid_jws_result(outcome))
+            continue
+        proof_id = _verified_proof_id(outcome)
+        results.append(_registered_jws_result(jws.strip(), outcome, proof_id, proofs.get(proof_id)))
+    return results
+
+
+def verification_results_for_jws_batch(
+    jws_values: Iterable, *, workers: int | None = None, chunk_size: int = 500
+) -> Iterator[dict]:
+    """Verify many compact JWS values and yield results in input order.
+
+    Each chunk resolves signing keys and stored proofs with one query each and
+    fans ECDSA checks out to a process pool once the chunk is large enough.
+    Results have the same shape as ``verification_result_for_jws``.
+    """
+    chunk = []
+    for jws in jws_values:
+        chunk.append(jws)
+        if len(chunk) >= chunk_size:
+            yield from _verify_jws_chunk(chunk, workers)
+            chunk = []
+    if chunk:
+        yield from _verify_jws_chunk(chunk, workers)
+
+
+LEDGER_CHECKPOINT_SALT = 'secureapprove.proof.ledger-checkpoint.v1'
+LEDGER_VERIFY_FIELDS = (
+    'id',
+    'signing_key_id',
+    'transaction_sha256',
+    'webauthn_assertion_sha256',
+    'previous_ledger_sha256',
+    'ledger_entry_sha256',
+    'public_payload',
+    'jws',
+    'issued_at',
+)
+
+
+def _ledger_checkpoint_signature(
+    tenant_id, entry_count: int, last_entry_sha256: str, last_proof_id, last_issued_at
+) -> str:
+    message = canonical_json_bytes({
+        'tenant_id': str(tenant_id),
+        'entry_count': entry_count,
+        'last_entry_sha256': last_entry_sha256,
+        'last_proof_id': str(last_proof_id) if last_proof_id else '',
+        'last_issued_at': last_issued_at,
+    })
+    return salted_hmac(LEDGER_CHECKPOINT_SALT, message, algorithm='sha256').hexdigest()
+
+
+def _ledger_checkpoint_is_valid(checkpoint) -> bool:
+    expected = _ledger_checkpoint_signature(
+        checkpoint.tenant_id,
+        checkpoint.entry_count,
+        checkpoint.last_entry_sha256,
+        checkpoint.last_proof_id,
+        checkpoint.last_issued_at,
+    )
+    return hmac.compare_digest(expected, checkpoint.signature)
+
+
+def _save_ledger_checkpoint(tenant_id, entry_count: int, last_entry_sha256: str, last_proof_id, last_issued_at):
+    from apps.authentication.models import ProofLedgerCheckpoint
+
+    ProofLedgerCheckpoint.objects.update_or_create(
+        tenant_id=tenant_id,
+        defaults={
+            'entry_count': entry_count,
+            'last_entry_sha256': last_entry_sha256,
+            'last_proof_id': last_proof_id,
+            'last_issued_at': last_issued_at,
+            'signature': _ledger_checkpoint_signature(
+                tenant_id, entry_count, last_entry_sha256, last_proof_id, last_issued_at
+            ),
+            'verified_at': timezone.now(),
+        },
+    )
+
+
+def _ledger_entry_problem(row: dict, tenant_id, previous_hash: str, keys: dict):
+    """Return ``(reason, signature_check)``; exactly one of them is ``None``."""
+    if row['previous_ledger_sha256'] != previous_hash:
+        return 'Previous ledger hash does not match the preceding entry.', None
+    expected_hash = transaction_sha256({
+        'proof_id': str(row['id']),
+        'tenant_id': str(tenant_id),
+        'transaction_sha256': row['transaction_sha256'],
+        'webauthn_assertion_sha256': row['webauthn_assertion_sha256'],
+        'previous_ledger_sha256': row['previous_ledger_sha256'],
+        'issued_at': row['issued_at'],
+    })
+    if not hmac.compare_digest(expected_hash, row['ledger_entry_sha256']):
+        return 'Ledger entry hash does not match the recorded fields.', None
     try:
-        parsed_id = uuid.UUID(str(proof_id))
-    except (TypeError, ValueError):
-        return {'valid': False, 'signature_valid': True, 'status': 'unknown'}
-    proof = SecurityProof.objects.select_related('signing_key').filter(pk=parsed_id).first()
-    if not proof or proof.jws != jws:
-        return {'valid': False, 'signature_valid': True, 'status': 'unknown', 'proof_id': str(parsed_id)}
-    return verification_result_for_proof(proof)
+        parts, header, payload, signature = _parse_compact_jws(row['jws'])
+    except InvalidProof as exc:
+        return str(exc), None
+    key = keys.get(row['signing_key_id'])
+    if not key or header['kid'] != key.kid:
+        return 'Proof header does not name the recorded signing key.', None
+    if len(signature) != 64:
+        return 'ES256 signature has an invalid length.', None
+    if payload != row['public_payload'] or payload.get('jti') != str(row['id']) or any(
+        payload.get(field) != row[field]
+        for field in ('transaction_sha256', 'previous_ledger_sha256', 'ledger_entry_sha256')
+    ):
+        return 'The signed payload does not match the registered proof.', None
+    jwk = key.public_jwk
+    return None, (jwk.get('x'), jwk.get('y'), f'{parts[0]}.{parts[1]}'.encode('ascii'), signature)
+
+
+def verify_proof_ledger(
+    tenant_id, *, full: bool = False, workers: int | None = None, chunk_size: int | None = None
+) -> dict:
+    """Re-verify one tenant's proof hash chain against its ProofLedgerHead.
+
+    Entries are streamed in issuance order with a server-side cursor. Hash
+    links are checked sequentially while ECDSA checks for each chunk run in
+    the verification process pool. Every fully verified chunk advances a
+    signed ``ProofLedgerCheckpoint`` so later runs only read new entries;
+    ``full=True`` ignores the checkpoint and walks the chain from genesis.
+    """
+    from apps.authentication.models import (
+        ProofLedgerCheckpoint,
+        ProofLedgerHead,
+        ProofSigningKey,
+        SecurityProof,
+    )
+
+    chunk_size = chunk_size or getattr(settings, 'SECUREAPPROVE_PROOF_LEDGER_VERIFY_CHUNK_SIZE', 2000)
+    head = ProofLedgerHead.objects.filter(tenant_id=tenant_id).first()
+    head_count = head.entry_count if head else 0
+    head_hash = head.last_entry_sha256 if head else ''
+
+    checkpoint = None if full else ProofLedgerCheckpoint.objects.filter(tenant_id=tenant_id).first()
+    if checkpoint and not _ledger_checkpoint_is_valid(checkpoint):
+        logger.critical('SecureApprove Proof ledger checkpoint signature is invalid: tenant=%s', tenant_id)
+        _metric('ledger_checkpoint_invalid')
+        checkpoint = None
+    position = checkpoint.entry_count if checkpoint else 0
+    previous_hash = checkpoint.last_entry_sha256 if checkpoint else ''
+    result = {
+        'tenant_id': str(tenant_id),
+        'status': 'ok',
+        'resumed_from': position,
+        'verified_entries': 0,
+        'entry_count': position,
+        'last_entry_sha256': previous_hash,
+        'first_break': None,
+    }
+
+    def broken(entry_number: int, proof_id, reason: str) -> dict:
+        _metric('ledger_broken')
+        logger.critical(
+            'SecureApprove Proof ledger broken: tenant=%s entry=%s proof=%s reason=%s',
+            tenant_id, entry_number, proof_id, reason,
+        )
+        result['status'] = 'broken'
+        result['first_break'] = {
+            'entry_number': entry_number,
+            'proof_id': str(proof_id) if proof_id else None,
+            'reason': reason,
+        }
+        return result
+
+    if position > head_count:
+        return broken(head_count + 1, None, 'Ledger head is behind the verified checkpoint.')
+
+    queryset = SecurityProof.objects.filter(tenant_id=tenant_id)
+    if checkpoint and checkpoint.last_issued_at:
+        queryset = queryset.filter(issued_at__gte=checkpoint.last_issued_at)
+    rows = queryset.order_by('issued_at', 'created_at', 'id').values(*LEDGER_VERIFY_FIELDS).iterator(
+        chunk_size=chunk_size
+    )
+    if checkpoint and checkpoint.last_proof_id:
+        # Entries sharing the checkpoint timestamp were verified up to and
+        # including the checkpointed proof; skip them without re-checking.
+        for row in rows:
+            if row['id'] == checkpoint.last_proof_id:
+                break
+            if row['issued_at'] != checkpoint.last_issued_at:
+                return broken(position, checkpoint.last_proof_id, 'Checkpointed proof is missing from the ledger.')
+        else:
+            return broken(position, checkpoint.last_proof_id, 'Checkpointed proof is missing from the ledger.')
+
+    keys = {key.pk: key for key in ProofSigningKey.objects.all()}
+    chunk: list[dict] = []
+    checks: list[tuple] = []
+    last_row = None
+
+    def flush() -> dict | None:
+        nonlocal position, previous_hash, last_row
+        failure = None
+        advanced = False
+        for row, valid in zip(chunk, _check_es256_signatures(checks, workers)):
+            if not valid:
+                failure = row
+                break
+            position += 1
+            previous_hash = row['ledger_entry_sha256']
+            last_row = row
+            advanced = True
+            result['verified_entries'] += 1
+        if advanced:
+            _save_ledger_checkpoint(tenant_id, position, previous_hash, last_row['id'], last_row['issued_at'])
+        result['entry_count'] = position
+        result['last_entry_sha256'] = previous_hash
+        chunk.clear()
+        checks.clear()
+        if failure is not None:
+            return broken(position + 1, failure['id'], 'Proof signature is invalid.')
+        return None
+
+    pending_hash = previous_hash
+    for row in rows:
+        if position + len(chunk) >= head_count:
+            break
+        reason, check = _ledger_entry_problem(row, tenant_id, pending_hash, keys)
+        if reason:
+            failure = flush()
+            if failure:
+                return failure
+            return broken(position + 1, row['id'], reason)
+        chunk.append(row)
+        checks.append(check)
+        pending_hash = row['ledger_entry_sha256']
+        if len(chunk) >= chunk_size:
+            failure = flush()
+            if failure:
+                return failure
+    failure = flush()
+    if failure:
+        return failure
+
+    if position < head_count:
+        return broken(position + 1, None, 'Ledger entries are missing before the ledger head.')
+    if previous_hash != head_hash:
+        return broken(position, last_row['id'] if last_row else None, 'Ledger head does not match the last entry.')
+    return result
 
 
 def proof_api_payload(proof, request=None) -> dict:
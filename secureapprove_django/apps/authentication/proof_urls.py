@@ -2,6 +2,7 @@ from django.urls import path
 
 from apps.authentication.proof_views import (
     ProofEvidenceView,
+    ProofVerifyBatchView,
     ProofVerifyByIdView,
     ProofVerifyJWSView,
 )
@@ -10,6 +11,7 @@ app_name = 'proofs'
 
 urlpatterns = [
     path('verify/', ProofVerifyJWSView.as_view(), name='verify_jws'),
+    path('verify/batch/', ProofVerifyBatchView.as_view(), name='verify_batch'),
     path('<uuid:proof_id>/verify/', ProofVerifyByIdView.as_view(), name='verify_id'),
     path('<uuid:proof_id>/evidence/', ProofEvidenceView.as_view(), name='evidence'),
 ]
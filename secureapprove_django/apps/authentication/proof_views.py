@@ -1,17 +1,25 @@
-from django.http import JsonResponse
+import json
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 
-from apps.authentication.models import ProofSigningKey, SecurityProof
+from apps.authentication.models import SecurityProof
 from apps.authentication.proof_service import (
     InvalidProof,
+    cached_verification_result_for_proof_id,
     decrypt_evidence,
+    jws_values_from_json,
+    jws_values_from_ndjson,
+    proof_jwks_document,
     verify_private_evidence_integrity,
     verification_result_for_jws,
-    verification_result_for_proof,
+    verification_results_for_jws_batch,
 )
 
 
@@ -26,12 +34,13 @@ class ProofAPIView(APIView):
 
 
 def proof_jwks(request):
-    keys = []
-    for key in ProofSigningKey.objects.order_by('-activated_at'):
-        jwk = dict(key.public_jwk)
-        jwk['secureapprove_status'] = key.status
-        keys.append(jwk)
-    response = JsonResponse({'keys': keys})
+    body, etag = proof_jwks_document()
+    client_etags = {value.removeprefix('W/') for value in parse_etags(request.headers.get('If-None-Match', ''))}
+    if etag in client_etags or '*' in client_etags:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
     response['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=3600'
     response['X-Content-Type-Options'] = 'nosniff'
     return response
@@ -42,10 +51,10 @@ class ProofVerifyByIdView(ProofAPIView):
     throttle_scope = 'proof_verify'
 
     def get(self, request, proof_id):
-        proof = SecurityProof.objects.select_related('signing_key').filter(pk=proof_id).first()
-        if not proof:
+        result = cached_verification_result_for_proof_id(proof_id)
+        if result is None:
             return Response({'valid': False, 'status': 'unknown'}, status=404)
-        return Response(verification_result_for_proof(proof))
+        return Response(result)
 
 
 class ProofVerifyJWSView(ProofAPIView):
@@ -68,6 +77,47 @@ class ProofVerifyJWSView(ProofAPIView):
         return Response(verification_result_for_jws(jws.strip()))
 
 
+class ProofVerifyBatchView(ProofAPIView):
+    """Verify many compact JWS values in one authenticated request.
+
+    Accepts a JSON array (optionally wrapped as ``{"jws": [...]}``) or NDJSON
+    and streams one NDJSON verification result per input, in input order.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'proof_verify_batch'
+
+    def post(self, request):
+        max_bytes = getattr(settings, 'SECUREAPPROVE_PROOF_VERIFY_BATCH_MAX_BYTES', 16 * 1024 * 1024)
+        content_length = request.META.get('CONTENT_LENGTH')
+        if content_length:
+            try:
+                if int(content_length) > max_bytes:
+                    return Response({'detail': 'Request is too large.'}, status=413)
+            except (TypeError, ValueError):
+                return Response({'detail': 'Invalid request size.'}, status=400)
+        stream = request.stream
+        body = stream.read(max_bytes + 1) if stream is not None else b''
+        if len(body) > max_bytes:
+            return Response({'detail': 'Request is too large.'}, status=413)
+        try:
+            if body.lstrip()[:1] in {b'[', b'{'} and 'ndjson' not in (request.content_type or ''):
+                values = jws_values_from_json(json.loads(body.decode('utf-8')))
+            else:
+                values = list(jws_values_from_ndjson(body.splitlines()))
+        except (UnicodeDecodeError, ValueError) as exc:
+            return Response({'detail': str(exc) or 'Invalid batch body.'}, status=400)
+        if not values:
+            return Response({'detail': 'At least one compact JWS is required.'}, status=400)
+        if len(values) > getattr(settings, 'SECUREAPPROVE_PROOF_VERIFY_BATCH_LIMIT', 10000):
+            return Response({'detail': 'Too many proofs in one batch.'}, status=413)
+        results = verification_results_for_jws_batch(values)
+        return StreamingHttpResponse(
+            (json.dumps(result, separators=(',', ':')) + '\n' for result in results),
+            content_type='application/x-ndjson',
+        )
+
+
 class ProofEvidenceView(ProofAPIView):
     permission_classes = [IsAuthenticated]
     throttle_scope = 'proof_evidence'
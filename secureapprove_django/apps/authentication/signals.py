@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.authentication.models import ProofSigningKey
+from apps.authentication.proof_service import (
+    bump_signing_key_status_version,
+    invalidate_signing_key_cache,
+)
+
+
+@receiver(post_save, sender=ProofSigningKey)
+@receiver(post_delete, sender=ProofSigningKey)
+def invalidate_cached_signing_keys(sender, instance, **kwargs):
+    """Stop serving a cached key or verification result after any status change."""
+    invalidate_signing_key_cache()
+    bump_signing_key_status_version()
+    transaction.on_commit(invalidate_signing_key_cache)
+    transaction.on_commit(bump_signing_key_status_version)
@@ -1,20 +1,45 @@
 import base64
 import hashlib
 import logging
+import time
+import uuid
 from datetime import timedelta
 
 from celery import shared_task
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
+ARCHIVE_RETRY_STATUSES = ['pending', 'failed', 'delayed']
+# A bundle claim older than this belongs to a worker that died mid-upload.
+ARCHIVE_CLAIM_TIMEOUT = timedelta(minutes=15)
+
+
+def _put_object_lock(bucket, object_key, body, content_type, metadata):
+    from apps.authentication.proof_service import _s3_client
+
+    retain_until = timezone.now() + timedelta(
+        days=getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_RETENTION_DAYS', 3650)
+    )
+    return _s3_client().put_object(
+        Bucket=bucket,
+        Key=object_key,
+        Body=body,
+        ContentType=content_type,
+        ContentMD5=base64.b64encode(hashlib.md5(body, usedforsecurity=False).digest()).decode('ascii'),
+        ObjectLockMode='COMPLIANCE',
+        ObjectLockRetainUntilDate=retain_until,
+        Metadata=metadata,
+    )
+
 
 @shared_task(bind=True, max_retries=12)
 def archive_security_proof(self, proof_id):
     """Archive a public JWS in the Object Lock Compliance bucket."""
     from apps.authentication.models import SecurityProof
-    from apps.authentication.proof_service import _s3_client
+    from apps.authentication.proof_service import forget_verification_result
 
     proof = SecurityProof.objects.filter(pk=proof_id).first()
     if not proof or proof.archive_status in {'archived', 'disabled'}:
@@ -31,23 +56,13 @@ def archive_security_proof(self, proof_id):
         )
 
     object_key = f"proofs/{proof.issued_at:%Y/%m/%d}/{proof.id}.jws"
-    body = proof.jws.encode('utf-8')
-    retain_until = timezone.now() + timedelta(
-        days=getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_RETENTION_DAYS', 3650)
-    )
     try:
-        response = _s3_client().put_object(
-            Bucket=bucket,
-            Key=object_key,
-            Body=body,
-            ContentType='application/jose',
-            ContentMD5=base64.b64encode(hashlib.md5(body, usedforsecurity=False).digest()).decode('ascii'),
-            ObjectLockMode='COMPLIANCE',
-            ObjectLockRetainUntilDate=retain_until,
-            Metadata={
-                'schema': proof.schema,
-                'ledger-entry-sha256': proof.ledger_entry_sha256,
-            },
+        response = _put_object_lock(
+            bucket,
+            object_key,
+            proof.jws.encode('utf-8'),
+            'application/jose',
+            {'schema': proof.schema, 'ledger-entry-sha256': proof.ledger_entry_sha256},
         )
     except Exception as exc:
         status = 'delayed' if timezone.now() - proof.created_at >= timedelta(minutes=5) else 'failed'
@@ -65,6 +80,133 @@ def archive_security_proof(self, proof_id):
         archived_at=timezone.now(),
         archive_error='',
     )
+    forget_verification_result(proof.pk)
+
+
+def _archive_tenant_bundle(tenant_id, bucket, limit):
+    """Archive up to ``limit`` waiting proofs of one tenant as a single bundle.
+
+    The proofs are claimed in a short transaction and the upload runs with
+    no transaction open, so no row lock is held across the S3 PUT. The
+    result is only written to rows that still carry this run's claim.
+    """
+    from apps.authentication.models import SecurityProof
+    from apps.authentication.proof_service import build_proof_archive_bundle, forget_verification_result
+
+    claimed_at = timezone.now()
+    with transaction.atomic():
+        proofs = list(
+            SecurityProof.objects.select_for_update(skip_locked=True)
+            .filter(tenant_id=tenant_id, archive_status__in=ARCHIVE_RETRY_STATUSES)
+            .order_by('issued_at', 'id')
+            .only('id', 'tenant_id', 'jws', 'ledger_entry_sha256', 'issued_at', 'created_at')[:limit]
+        )
+        if not proofs:
+            return 0
+        SecurityProof.objects.filter(pk__in=[proof.pk for proof in proofs]).update(
+            archive_status='archiving', archive_claimed_at=claimed_at
+        )
+    claimed = SecurityProof.objects.filter(
+        pk__in=[proof.pk for proof in proofs], archive_status='archiving', archive_claimed_at=claimed_at
+    )
+
+    body, spans, metadata = build_proof_archive_bundle(tenant_id, proofs)
+    object_key = f"proofs/bundles/{tenant_id}/{claimed_at:%Y/%m/%d}/{uuid.uuid4()}.jws.gz"
+    try:
+        response = _put_object_lock(bucket, object_key, body, 'application/gzip', metadata)
+    except Exception as exc:
+        delayed_before = claimed_at - timedelta(minutes=5)
+        error = str(exc)[:2000]
+        claimed.filter(created_at__lte=delayed_before).update(archive_status='delayed', archive_error=error)
+        claimed.filter(created_at__gt=delayed_before).update(archive_status='failed', archive_error=error)
+        logger.exception(
+            'SecureApprove Proof bundle archive failed: tenant=%s proofs=%s', tenant_id, len(proofs)
+        )
+        return 0
+
+    archived_at = timezone.now()
+    with transaction.atomic():
+        still_claimed = set(claimed.select_for_update().values_list('pk', flat=True))
+        archived = [proof for proof in proofs if proof.pk in still_claimed]
+        for proof, (offset, length) in zip(proofs, spans):
+            proof.archive_status = 'archived'
+            proof.archive_object_key = object_key
+            proof.archive_version_id = response.get('VersionId', '')
+            proof.archive_bundle_offset = offset
+            proof.archive_bundle_length = length
+            proof.archived_at = archived_at
+            proof.archive_error = ''
+        SecurityProof.objects.bulk_update(archived, [
+            'archive_status',
+            'archive_object_key',
+            'archive_version_id',
+            'archive_bundle_offset',
+            'archive_bundle_length',
+            'archived_at',
+            'archive_error',
+        ])
+        proof_ids = [proof.pk for proof in archived]
+        transaction.on_commit(lambda: [forget_verification_result(proof_id) for proof_id in proof_ids])
+    return len(proofs)
+
+
+@shared_task
+def archive_security_proof_bundles():
+    """Write one compressed, manifest-indexed Object Lock bundle per tenant."""
+    from apps.authentication.models import SecurityProof
+
+    if getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_MODE', 'single') != 'bundle':
+        return 0
+    bucket = getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_BUCKET', '')
+    if not bucket:
+        logger.error('SecureApprove Proof archive bucket is not configured.')
+        return 0
+    limit = max(1, getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_BUNDLE_MAX_PROOFS', 5000))
+    tenant_ids = list(
+        SecurityProof.objects.filter(archive_status__in=ARCHIVE_RETRY_STATUSES)
+        .order_by()
+        .values_list('tenant_id', flat=True)
+        .distinct()
+    )
+    archived = 0
+    for tenant_id in tenant_ids:
+        while True:
+            count = _archive_tenant_bundle(tenant_id, bucket, limit)
+            archived += count
+            if count < limit:
+                break
+    if archived:
+        logger.info('Archived SecureApprove Proof bundles: proofs=%s tenants=%s', archived, len(tenant_ids))
+    return archived
+
+
+def _update_in_batches(queryset, metric, **changes):
+    """Apply ``changes`` to rows matching ``queryset`` in short SKIP LOCKED batches.
+
+    Every batch commits on its own and the loop pauses between batches, so
+    proof issuance never waits behind one long UPDATE. A run stopped by the
+    time budget resumes from the same predicate on the next schedule.
+    """
+    from apps.authentication.models import SecurityProof
+    from apps.authentication.proof_service import _metric
+
+    batch_size = max(1, getattr(settings, 'SECUREAPPROVE_PROOF_MAINTENANCE_BATCH_SIZE', 1000))
+    pause = getattr(settings, 'SECUREAPPROVE_PROOF_MAINTENANCE_PAUSE_SECONDS', 0.05)
+    deadline = time.monotonic() + getattr(settings, 'SECUREAPPROVE_PROOF_MAINTENANCE_MAX_SECONDS', 300)
+    total = 0
+    while True:
+        with transaction.atomic():
+            batch = list(queryset.select_for_update(skip_locked=True).values_list('pk', flat=True)[:batch_size])
+            count = SecurityProof.objects.filter(pk__in=batch).update(**changes) if batch else 0
+        if not count:
+            break
+        total += count
+        _metric(metric, count)
+        _metric(f'{metric}_batches')
+        if len(batch) < batch_size or time.monotonic() >= deadline:
+            break
+        time.sleep(pause)
+    return total
 
 
 @shared_task
@@ -72,11 +214,19 @@ def monitor_delayed_proof_archives():
     from apps.authentication.models import SecurityProof
 
     cutoff = timezone.now() - timedelta(minutes=5)
+    if getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_MODE', 'single') == 'bundle':
+        # Bundled proofs legitimately wait up to one bundle interval.
+        cutoff -= timedelta(seconds=getattr(settings, 'SECUREAPPROVE_PROOF_ARCHIVE_BUNDLE_INTERVAL_SECONDS', 300))
     delayed = SecurityProof.objects.filter(
         archive_status__in=['pending', 'failed'],
         created_at__lte=cutoff,
-    )
-    count = delayed.update(archive_status='delayed')
+    ).order_by('created_at')
+    count = _update_in_batches(delayed, 'archive_marked_delayed', archive_status='delayed')
+    stale_claims = SecurityProof.objects.filter(
+        archive_status='archiving',
+        archive_claimed_at__lte=timezone.now() - ARCHIVE_CLAIM_TIMEOUT,
+    ).order_by('created_at')
+    count += _update_in_batches(stale_claims, 'archive_claims_released', archive_status='delayed')
     if count:
         logger.critical('SecureApprove Proof archive delay exceeds five minutes: count=%s', count)
     return count
@@ -91,8 +241,10 @@ def purge_expired_proof_evidence():
     queryset = SecurityProof.objects.filter(
         evidence_expires_at__lte=now,
         evidence_purged_at__isnull=True,
-    )
-    count = queryset.update(
+    ).order_by('evidence_expires_at')
+    count = _update_in_batches(
+        queryset,
+        'evidence_purged',
         evidence_ciphertext=None,
         evidence_nonce=None,
         encrypted_data_key=None,
@@ -101,3 +253,20 @@ def purge_expired_proof_evidence():
     if count:
         logger.info('Purged expired SecureApprove Proof evidence: count=%s', count)
     return count
+
+
+@shared_task
+def verify_proof_ledgers(full=False):
+    """Re-verify every tenant proof chain from its last signed checkpoint."""
+    from apps.authentication.models import ProofLedgerHead
+    from apps.authentication.proof_service import verify_proof_ledger
+
+    tenant_ids = list(ProofLedgerHead.objects.filter(entry_count__gt=0).values_list('tenant_id', flat=True))
+    broken = [
+        str(tenant_id)
+        for tenant_id in tenant_ids
+        if verify_proof_ledger(tenant_id, full=full)['status'] != 'ok'
+    ]
+    if broken:
+        logger.critical('SecureApprove Proof ledger verification failed: tenants=%s', ','.join(broken))
+    return {'tenants': len(tenant_ids), 'broken': len(broken)}
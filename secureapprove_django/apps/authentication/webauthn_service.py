@@ -4,6 +4,7 @@
 
 import json
 import base64
+import functools
 import logging
 from typing import Optional, Dict, List, Any
 from django.conf import settings
@@ -27,10 +28,23 @@ from webauthn.helpers.structs import (
 )
 from webauthn.helpers.cose import COSEAlgorithmIdentifier
 
+from apps.authentication import metrics
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
+def _measured(ceremony: str):
+    """Record verification latency and outcome for one WebAuthn ceremony."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with metrics.timer('secureapprove_webauthn_verify_seconds', ceremony=ceremony):
+                return method(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
 class WebAuthnService:
     """
     WebAuthn service for handling passwordless authentication
@@ -142,6 +156,7 @@ class WebAuthnService:
         
         return result
     
+    @_measured('registration')
     def verify_registration_response(self, user: User, credential_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Verify WebAuthn registration response
@@ -269,6 +284,7 @@ class WebAuthnService:
             'userVerification': options.user_verification.value,
         }
     
+    @_measured('authentication')
     def verify_authentication_response(self, user: User, credential_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Verify WebAuthn authentication response
@@ -489,6 +505,7 @@ class WebAuthnService:
             'proofSchema': 'sap-proof-v1' if proof_binding else None,
         }
     
+    @_measured('approval')
     def verify_approval_response(self, user: User, approval_id: str, credential_data: Dict[str, Any], context_data: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Verify WebAuthn response for approval step-up authentication.
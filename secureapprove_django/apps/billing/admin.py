@@ -5,7 +5,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
-from .models import Plan, Subscription, Payment, UsageMetrics, Invoice
+from .models import Plan, Subscription, Payment, UsageMetrics, Invoice, WebhookEvent
 
 @admin.register(Plan)
 class PlanAdmin(admin.ModelAdmin):
@@ -114,7 +114,7 @@ class UsageMetricsAdmin(admin.ModelAdmin):
             'fields': ('requests_created', 'requests_approved', 'requests_rejected')
         }),
         (_('User Activity'), {
-            'fields': ('active_users', 'total_users', 'api_calls')
+            'fields': ('active_users', 'total_users', 'api_calls', 'api_calls_by_endpoint')
         }),
         (_('Timestamps'), {
             'fields': ('created_at', 'updated_at')
@@ -167,4 +167,17 @@ class InvoiceAdmin(admin.ModelAdmin):
     
     def subscription_tenant(self, obj):
         return obj.subscription.tenant.name
-    subscription_tenant.short_description = _('Tenant')
\ No newline at end of file
+    subscription_tenant.short_description = _('Tenant')
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = [
+        'event_key', 'provider', 'topic', 'action', 'resource_id',
+        'status', 'outcome', 'attempts', 'received_at', 'processed_at'
+    ]
+    list_filter = ['status', 'provider', 'topic']
+    search_fields = ['event_key', 'resource_id']
+    readonly_fields = [
+        'provider', 'event_key', 'topic', 'action', 'resource_id', 'payload',
+        'attempts', 'last_error', 'outcome', 'received_at', 'processed_at'
+    ]
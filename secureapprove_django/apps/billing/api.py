@@ -12,10 +12,9 @@ from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404
 from django.conf import settings
-import mercadopago
 
 from .models import Plan, Subscription, Payment
-from .services import BillingService
+from .services import get_billing_service
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +53,7 @@ def create_payment_preference(request):
             }, status=400)
         
         # Create subscription record
-        billing_service = BillingService()
+        billing_service = get_billing_service()
         subscription = billing_service.create_subscription(request.user, plan)
         
         # Create payment preference
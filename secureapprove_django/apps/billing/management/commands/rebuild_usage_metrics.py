@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.billing.usage import month_of, months_between, rebuild_usage_metrics
+from apps.tenants.models import Tenant
+
+# Months recomputed per set of grouped queries.
+CHUNK_MONTHS = 12
+
+
+def _month(value):
+    try:
+        year, month = (int(part) for part in value.split('-'))
+    except ValueError:
+        raise CommandError(f'Invalid month {value!r}; expected YYYY-MM.') from None
+    if not 1 <= month <= 12:
+        raise CommandError(f'Invalid month {value!r}; expected YYYY-MM.')
+    return year, month
+
+
+class Command(BaseCommand):
+    help = 'Recompute monthly usage rollups from requests and users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help='First month (YYYY-MM); defaults to the current month.')
+        parser.add_argument('--to', dest='end', help='Last month (YYYY-MM); defaults to --from.')
+        parser.add_argument('--tenant', action='append', dest='tenants', help='Tenant key; repeat to limit to several.')
+
+    def handle(self, *args, **options):
+        start = _month(options['start']) if options['start'] else month_of(timezone.now())
+        end = _month(options['end']) if options['end'] else start
+        if end < start:
+            raise CommandError('--to must not be before --from.')
+
+        tenant_ids = None
+        if options['tenants']:
+            found = dict(Tenant.objects.filter(key__in=options['tenants']).values_list('key', 'pk'))
+            unknown = sorted(set(options['tenants']) - found.keys())
+            if unknown:
+                raise CommandError(f"Unknown tenant(s): {', '.join(unknown)}")
+            tenant_ids = list(found.values())
+
+        months = months_between(start, end)
+        rows = 0
+        for index in range(0, len(months), CHUNK_MONTHS):
+            rows += rebuild_usage_metrics(months[index:index + CHUNK_MONTHS], tenant_ids=tenant_ids)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} usage rollup row(s) across {len(months)} month(s)'))
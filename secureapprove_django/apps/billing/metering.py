@@ -0,0 +1,161 @@
+"""API call metering per tenant and endpoint class.
+
+``ApiMeteringMiddleware`` only bumps a process-local dictionary. A daemon
+thread in every process adds the deltas to one Redis hash with a single
+pipelined HINCRBY batch, so counts survive worker restarts once flushed,
+and the ``flush_api_usage`` beat task drains that hash into
+``UsageMetrics.api_calls``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject, empty
+
+from apps.authentication.metrics import _redis_connection
+
+logger = logging.getLogger(__name__)
+
+USAGE_KEY = 'secureapprove_api_usage:v1'
+PROCESSING_KEY = f'{USAGE_KEY}:processing'
+DRAIN_LOCK_KEY = f'{USAGE_KEY}:drain-lock'
+ENDPOINT_CLASSES = frozenset({'auth', 'approvals', 'requests', 'chat', 'proofs', 'billing'})
+
+
+def endpoint_class(path: str) -> str | None:
+    """``/api/requests/42/`` -> ``requests``; None for paths that are not metered."""
+    parts = path.split('/', 3)
+    if len(parts) < 3 or parts[1] != 'api' or parts[2] == 'docs':
+        return None
+    return parts[2] if parts[2] in ENDPOINT_CLASSES else 'other'
+
+
+def parse_field(field: str) -> tuple[int, int, int, str]:
+    tenant_id, period, endpoint = field.split(':', 2)
+    year, month = period.split('-')
+    return int(tenant_id), int(year), int(month), endpoint
+
+
+class UsageMeter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[str, int] = {}
+        self._flusher: threading.Thread | None = None
+        self._fallback_lock = threading.Lock()
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._flusher = None
+
+    def record(self, tenant_id, endpoint: str) -> None:
+        period = timezone.localdate()
+        field = f'{tenant_id}:{period.year}-{period.month}:{endpoint}'
+        with self._lock:
+            if self._flusher is None and getattr(settings, 'SECUREAPPROVE_API_METERING_FLUSH_SECONDS', 5) > 0:
+                self._flusher = threading.Thread(target=self._flush_loop, name='api-metering-flush', daemon=True)
+                self._flusher.start()
+            self._pending[field] = self._pending.get(field, 0) + 1
+
+    def _flush_loop(self) -> None:
+        interval = max(0.1, float(getattr(settings, 'SECUREAPPROVE_API_METERING_FLUSH_SECONDS', 5)))
+        while True:
+            time.sleep(interval)
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+        try:
+            self._write(pending)
+        except Exception:
+            logger.warning('API usage flush failed; keeping counts for the next attempt.', exc_info=True)
+            with self._lock:
+                for field, amount in pending.items():
+                    self._pending[field] = self._pending.get(field, 0) + amount
+
+    def _write(self, pending: dict) -> None:
+        connection = _redis_connection()
+        if connection is not None:
+            pipeline = connection.pipeline(transaction=False)
+            for field, amount in pending.items():
+                pipeline.hincrby(USAGE_KEY, field, amount)
+            pipeline.execute()
+            return
+        with self._fallback_lock:
+            counts = cache.get(USAGE_KEY) or {}
+            for field, amount in pending.items():
+                counts[field] = counts.get(field, 0) + amount
+            cache.set(USAGE_KEY, counts, timeout=None)
+
+    def drain(self, apply) -> int:
+        """
+        Pass the shared counts to ``apply(counts)`` and remove them once it
+        returns. Returns the number of calls handed over.
+        """
+        self.flush()
+        if not cache.add(DRAIN_LOCK_KEY, 1, timeout=300):
+            return 0
+        try:
+            connection = _redis_connection()
+            if connection is None:
+                with self._fallback_lock:
+                    counts = cache.get(USAGE_KEY) or {}
+                    if counts:
+                        apply(counts)
+                    cache.delete(USAGE_KEY)
+                return sum(counts.values())
+            # Counts left in the processing key by a run that died before
+            # applying them are handled first; otherwise the live hash is
+            # swapped out atomically so new increments are not lost.
+            if not connection.exists(PROCESSING_KEY):
+                if not connection.exists(USAGE_KEY):
+                    return 0
+                connection.rename(USAGE_KEY, PROCESSING_KEY)
+            counts = {
+                field.decode(): int(amount)
+                for field, amount in connection.hgetall(PROCESSING_KEY).items()
+            }
+            if counts:
+                apply(counts)
+            connection.delete(PROCESSING_KEY)
+            return sum(counts.values())
+        finally:
+            cache.delete(DRAIN_LOCK_KEY)
+
+
+meter = UsageMeter()
+atexit.register(meter.flush)
+os.register_at_fork(after_in_child=meter._after_fork)
+
+
+class ApiMeteringMiddleware:
+    """Count authenticated ``/api/`` calls per tenant and endpoint class."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        endpoint = endpoint_class(request.path_info)
+        if endpoint is None:
+            return response
+        user = getattr(request, 'user', None)
+        if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+            # Nothing authenticated this request, and resolving the session
+            # user here would cost a query.
+            return response
+        tenant_id = getattr(user, 'tenant_id', None)
+        if tenant_id:
+            meter.record(tenant_id, endpoint)
+        return response
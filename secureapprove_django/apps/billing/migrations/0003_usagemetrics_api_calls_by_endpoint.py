@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0002_alter_plan_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usagemetrics',
+            name='api_calls_by_endpoint',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
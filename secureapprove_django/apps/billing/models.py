@@ -116,11 +116,7 @@ class Plan(models.Model):
     
     def can_create_approver(self, tenant):
         """Check if tenant can create another approver"""
-        current_approvers = User.objects.filter(
-            tenant=tenant,
-            role__in=['admin', 'approver']
-        ).count()
-        return current_approvers < self.max_approvers
+        return tenant.approvers_count < self.max_approvers
     
     def can_create_user(self, tenant):
         """
@@ -133,34 +129,23 @@ class Plan(models.Model):
         seats = getattr(tenant, "seats", 0) or 0
 
         if seats > 0:
-            current_users = User.objects.filter(tenant=tenant).count()
-            return current_users < seats
+            return tenant.active_users_count < seats
 
         # Legacy fallback: use plan-level max_users (0 = unlimited)
         if self.max_users == 0:
             return True
-        current_users = User.objects.filter(tenant=tenant).count()
-        return current_users < self.max_users
+        return tenant.active_users_count < self.max_users
     
     def can_create_request(self, tenant, month=None, year=None):
         """Check if tenant can create another request this month"""
         if self.max_requests_per_month == 0:  # Unlimited
             return True
         
-        from django.utils import timezone
-        from apps.requests.models import ApprovalRequest
+        # Reads the quota counter or the usage rollup; enforcement itself
+        # happens in apps.billing.quotas.reserve_request.
+        from apps.billing.quotas import requests_used
         
-        if not month or not year:
-            now = timezone.now()
-            month, year = now.month, now.year
-        
-        current_requests = ApprovalRequest.objects.filter(
-            tenant=tenant,
-            created_at__year=year,
-            created_at__month=month
-        ).count()
-        
-        return current_requests < self.max_requests_per_month
+        return requests_used(tenant, year, month) < self.max_requests_per_month
 
 class Subscription(models.Model):
     """Tenant subscription to a plan"""
@@ -309,6 +294,14 @@ class Payment(models.Model):
         ordering = ['-created_at']
         verbose_name = _('Payment')
         verbose_name_plural = _('Payments')
+        constraints = [
+            # Webhook processing relies on this to record a provider payment once.
+            models.UniqueConstraint(
+                fields=['mp_payment_id'],
+                condition=models.Q(mp_payment_id__gt=''),
+                name='billing_payment_mp_payment_id_uniq',
+            ),
+        ]
     
     def __str__(self):
         return f"Payment {self.id} - ${self.amount} ({self.status})"
@@ -338,6 +331,7 @@ class UsageMetrics(models.Model):
     requests_approved = models.PositiveIntegerField(default=0)
     requests_rejected = models.PositiveIntegerField(default=0)
     api_calls = models.PositiveIntegerField(default=0)
+    api_calls_by_endpoint = models.JSONField(default=dict, blank=True)
     
     # User activity
     active_users = models.PositiveIntegerField(default=0)
@@ -427,6 +421,53 @@ class Invoice(models.Model):
             # Generate invoice number
             from django.utils import timezone
             now = timezone.now()
-            self.invoice_number = f"INV-{now.year}{now.month:02d}-{now.day:02d}-{self.subscription.tenant.id[:8].upper()}"
+            self.invoice_number = (
+                f"INV-{now.year}{now.month:02d}-{now.day:02d}-{self.subscription.tenant_id}-{self.id.hex[:8].upper()}"
+            )
         
         super().save(*args, **kwargs)
+
+
+class WebhookEvent(models.Model):
+    """
+    Inbox of raw payment-provider notifications. The webhook view only
+    stores the event; ``process_webhook_event`` handles it in a worker.
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('processed', _('Processed')),
+        ('ignored', _('Ignored')),
+        ('failed', _('Failed')),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    provider = models.CharField(max_length=30, default='mercadopago')
+    # Provider notification id, or topic/action/resource when it has none.
+    event_key = models.CharField(max_length=200)
+    topic = models.CharField(max_length=50, blank=True)
+    action = models.CharField(max_length=100, blank=True)
+    resource_id = models.CharField(max_length=100, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    outcome = models.CharField(max_length=100, blank=True)
+    
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-received_at']
+        verbose_name = _('Webhook Event')
+        verbose_name_plural = _('Webhook Events')
+        constraints = [
+            models.UniqueConstraint(fields=['provider', 'event_key'], name='billing_webhook_event_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'received_at'], name='billing_webhook_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.provider} {self.event_key} ({self.status})"
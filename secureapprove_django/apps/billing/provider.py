@@ -0,0 +1,160 @@
+"""Process-wide MercadoPago client.
+
+Every billing call site goes through ``sdk()``, which hands out one
+``mercadopago.SDK`` per process built on ``ProviderHttpClient``: a
+keep-alive connection pool with explicit connect/read timeouts, retries
+with jittered backoff for GETs, a circuit breaker that fails fast after
+repeated provider failures, and latency metrics per operation.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+import mercadopago
+import requests
+from django.conf import settings
+from mercadopago.http import HttpClient
+from requests.adapters import HTTPAdapter
+
+from apps.authentication import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = 'https://api.mercadopago.com'
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+LATENCY_METRIC = 'secureapprove_payment_provider_request_seconds'
+CALLS_METRIC = 'secureapprove_payment_provider_calls_total'
+
+
+class PaymentProviderUnavailable(Exception):
+    """MercadoPago could not be reached, or the circuit breaker is open."""
+
+
+def _operation(url: str) -> str:
+    """``https://api.../v1/payments/123`` -> ``/v1/payments``; keeps metric labels bounded."""
+    path = url.split('://', 1)[-1].partition('/')[2].split('?', 1)[0]
+    segments = [segment for segment in path.split('/') if segment and not re.search(r'\d', segment)]
+    return '/' + '/'.join(segments[:2])
+
+
+class ProviderHttpClient(HttpClient):
+    """``mercadopago.http.HttpClient`` with pooling, timeouts, retries and a circuit breaker."""
+
+    def __init__(self, config: tuple):
+        (
+            _pid,
+            self.base_url,
+            connect_timeout,
+            read_timeout,
+            pool_size,
+            self.max_retries,
+            self.retry_backoff,
+            self.breaker_threshold,
+            self.breaker_reset,
+        ) = config
+        self.config = config
+        self.timeout = (connect_timeout, read_timeout)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = 0.0
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def _check_circuit(self, operation: str) -> None:
+        with self._lock:
+            circuit_open = time.monotonic() < self._open_until
+        if circuit_open:
+            metrics.inc(CALLS_METRIC, operation=operation, outcome='circuit_open')
+            raise PaymentProviderUnavailable('MercadoPago is unavailable.')
+
+    def _record_result(self, success: bool) -> None:
+        with self._lock:
+            if success:
+                self._failures = 0
+                self._open_until = 0.0
+                return
+            self._failures += 1
+            if self._failures >= self.breaker_threshold:
+                if time.monotonic() >= self._open_until:
+                    logger.warning('MercadoPago circuit breaker opened after %s failures', self._failures)
+                self._open_until = time.monotonic() + self.breaker_reset
+
+    def request(self, method, url, maxretries=None, **kwargs):
+        if url.startswith(DEFAULT_BASE_URL):
+            url = self.base_url + url[len(DEFAULT_BASE_URL):]
+        operation = _operation(url)
+        self._check_circuit(operation)
+        # The SDK passes its own 60s default; our timeouts always win.
+        kwargs['timeout'] = self.timeout
+        # Only GETs are safe to repeat; a retried POST could create a second
+        # preference or charge.
+        retries = self.max_retries if method == 'GET' else 0
+
+        for attempt in range(retries + 1):
+            started = time.perf_counter()
+            try:
+                response = self._session.request(method, url, **kwargs)
+            except requests.RequestException as exc:
+                error, outcome = exc, 'transport_error'
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    metrics.observe(LATENCY_METRIC, time.perf_counter() - started, operation=operation, outcome='ok')
+                    metrics.inc(CALLS_METRIC, operation=operation, outcome='ok')
+                    self._record_result(True)
+                    try:
+                        body = response.json()
+                    except ValueError:
+                        body = {'message': response.text[:500]}
+                    return {'status': response.status_code, 'response': body}
+                error, outcome = f'HTTP {response.status_code}', 'http_error'
+            metrics.observe(LATENCY_METRIC, time.perf_counter() - started, operation=operation, outcome=outcome)
+            if attempt < retries:
+                metrics.inc(CALLS_METRIC, operation=operation, outcome='retried')
+                time.sleep(random.uniform(0, self.retry_backoff * (2 ** attempt)))
+
+        metrics.inc(CALLS_METRIC, operation=operation, outcome=outcome)
+        self._record_result(False)
+        raise PaymentProviderUnavailable(f'MercadoPago {operation} failed: {error}')
+
+
+_sdk_instance = None
+_sdk_key = None
+_sdk_lock = threading.Lock()
+
+
+def _client_config() -> tuple:
+    # The PID is part of the configuration so a forked worker never reuses
+    # sockets inherited from its parent.
+    return (
+        os.getpid(),
+        getattr(settings, 'MERCADOPAGO_API_BASE_URL', DEFAULT_BASE_URL).rstrip('/'),
+        getattr(settings, 'SECUREAPPROVE_MERCADOPAGO_CONNECT_TIMEOUT_SECONDS', 3),
+        getattr(settings, 'SECUREAPPROVE_MERCADOPAGO_READ_TIMEOUT_SECONDS', 10),
+        getattr(settings, 'SECUREAPPROVE_MERCADOPAGO_POOL_SIZE', 10),
+        getattr(settings, 'SECUREAPPROVE_MERCADOPAGO_MAX_RETRIES', 2),
+        getattr(settings, 'SECUREAPPROVE_MERCADOPAGO_RETRY_BACKOFF_SECONDS', 0.2),
+        getattr(settings, 'SECUREAPPROVE_MERCADOPAGO_CIRCUIT_BREAKER_THRESHOLD', 5),
+        getattr(settings, 'SECUREAPPROVE_MERCADOPAGO_CIRCUIT_BREAKER_RESET_SECONDS', 30),
+    )
+
+
+def sdk() -> mercadopago.SDK:
+    """The shared ``mercadopago.SDK`` for this process."""
+    global _sdk_instance, _sdk_key
+
+    config = _client_config()
+    access_token = getattr(settings, 'MERCADOPAGO_ACCESS_TOKEN', 'TEST-demo-token')
+    key = (access_token, config)
+    with _sdk_lock:
+        if _sdk_instance is None or _sdk_key != key:
+            _sdk_instance = mercadopago.SDK(access_token, http_client=ProviderHttpClient(config))
+            _sdk_key = key
+        return _sdk_instance
@@ -0,0 +1,256 @@
+"""Plan quota enforcement.
+
+Monthly request quotas are counted in Redis. ``reserve_request`` takes a
+slot with a single Lua check-and-increment, so parallel submissions cannot
+both pass the check for the last slot, and gives the slot back if the
+insert fails. Counters are seeded from the ``UsageMetrics`` rollup and
+re-synced from it by ``reconcile_request_quotas``. A counter above the
+rollup may be counting inserts that have not committed yet, so it is only
+lowered once two runs saw the same value; that returns slots held by
+transactions that rolled back after the insert.
+
+Seat quotas are checked against the tenant's seat counter row; callers hold
+``Tenant.lock_seat_counter()`` while they grant the seat.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from apps.authentication.metrics import _redis_connection
+
+from .usage import month_of
+
+REQUEST_KEY = 'secureapprove_quota:v1:{tenant_id}:requests:{year}-{month}'
+# Counter value a reconcile run found above the rollup, kept for the next run.
+DRIFT_KEY = REQUEST_KEY + ':drift'
+# Outlives the month it counts; later months use new keys.
+KEY_TTL_SECONDS = 40 * 86400
+
+# KEYS[1] counter; ARGV[1] limit. Returns false when the counter is not
+# seeded, else {taken, count}.
+_TAKE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return false
+end
+current = tonumber(current)
+if current >= tonumber(ARGV[1]) then
+    return {0, current}
+end
+return {1, redis.call('INCR', KEYS[1])}
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('DECR', KEYS[1])
+end
+return false
+"""
+
+# KEYS[1] counter; ARGV[1] value seen before the database was read,
+# ARGV[2] database count, ARGV[3] TTL. Skips counters that moved meanwhile.
+_SYNC_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+_fallback_lock = threading.Lock()
+
+
+class QuotaExceeded(Exception):
+    """A plan or seat limit would be exceeded."""
+
+    def __init__(self, limit_type, current, limit):
+        self.limit_type = limit_type
+        self.current = current
+        self.limit = limit
+        super().__init__(f'{limit_type} quota exceeded ({current}/{limit})')
+
+    @property
+    def message(self):
+        if self.limit_type == 'requests':
+            return _(
+                'Your plan allows %(limit)s requests per month and this month\'s quota has been used. '
+                'Please upgrade your subscription to create more requests.'
+            ) % {'limit': self.limit}
+        if self.limit_type == 'approvers':
+            return _('This tenant has reached its approver limit.')
+        return _('This tenant has no available seats. Please contact the administrator.')
+
+
+def _subscription(tenant):
+    from .models import Subscription
+
+    return Subscription.objects.select_related('plan').filter(tenant_id=tenant.pk).first()
+
+
+def _request_key(tenant_id, year, month):
+    return REQUEST_KEY.format(tenant_id=tenant_id, year=year, month=month)
+
+
+def _rollup_requests(subscription, year, month):
+    from .services import get_billing_service
+
+    return get_billing_service().get_usage_stats(subscription, year, month).requests_created
+
+
+def _take(connection, key, limit, seed):
+    if connection is None:
+        with _fallback_lock:
+            current = cache.get(key)
+            if current is None:
+                current = seed()
+            if current >= limit:
+                return False, current
+            cache.set(key, current + 1, KEY_TTL_SECONDS)
+            return True, current + 1
+    take = connection.register_script(_TAKE_SCRIPT)
+    result = take(keys=[key], args=[limit])
+    if result is None:
+        # First reservation of the month: whoever seeds first wins, and the
+        # rest use the seeded value.
+        connection.set(key, seed(), ex=KEY_TTL_SECONDS, nx=True)
+        result = take(keys=[key], args=[limit])
+    return bool(result[0]), int(result[1])
+
+
+def _release(connection, key):
+    if connection is None:
+        with _fallback_lock:
+            current = cache.get(key)
+            if current:
+                cache.set(key, current - 1, KEY_TTL_SECONDS)
+        return
+    connection.register_script(_RELEASE_SCRIPT)(keys=[key])
+
+
+@contextmanager
+def reserve_request(tenant):
+    """
+    Take one of the tenant's monthly request slots for the enclosed insert.
+
+    Raises ``QuotaExceeded`` when the plan's monthly limit is used up. The
+    slot is given back if the block raises.
+    """
+    subscription = _subscription(tenant) if tenant is not None else None
+    limit = subscription.plan.max_requests_per_month if subscription else 0
+    if not limit:
+        yield
+        return
+    year, month = month_of(timezone.now())
+    key = _request_key(tenant.pk, year, month)
+    connection = _redis_connection()
+    taken, current = _take(connection, key, limit, lambda: _rollup_requests(subscription, year, month))
+    if not taken:
+        raise QuotaExceeded('requests', current, limit)
+    try:
+        yield
+    except BaseException:
+        _release(connection, key)
+        raise
+
+
+def requests_used(tenant, year=None, month=None):
+    """Requests counted against the tenant's quota for a month (the current one by default)."""
+    subscription = _subscription(tenant)
+    if subscription is None:
+        return 0
+    current_period = month_of(timezone.now())
+    year, month = (year, month) if year and month else current_period
+    if (year, month) == current_period:
+        key = _request_key(tenant.pk, year, month)
+        connection = _redis_connection()
+        value = cache.get(key) if connection is None else connection.get(key)
+        if value is not None:
+            return int(value)
+    return _rollup_requests(subscription, year, month)
+
+
+def reconcile_request_quotas():
+    """
+    Re-sync this month's request counters with the rollup; returns how many
+    were corrected.
+
+    Counters below the rollup are raised at once. A counter above it may
+    include slots whose insert has not committed yet, so it is only lowered
+    when the previous run saw the same value, i.e. nothing was reserved or
+    committed in between.
+    """
+    from .models import UsageMetrics
+
+    year, month = month_of(timezone.now())
+    tenant_ids = list(
+        UsageMetrics.objects.filter(
+            year=year, month=month, subscription__plan__max_requests_per_month__gt=0
+        ).values_list('subscription__tenant_id', flat=True)
+    )
+    if not tenant_ids:
+        return 0
+    keys = [_request_key(tenant_id, year, month) for tenant_id in tenant_ids]
+    drift_keys = [
+        DRIFT_KEY.format(tenant_id=tenant_id, year=year, month=month) for tenant_id in tenant_ids
+    ]
+    drift_ttl = 3 * getattr(settings, 'SECUREAPPROVE_QUOTA_RECONCILE_INTERVAL_SECONDS', 300)
+    connection = _redis_connection()
+    # Counters are read before the database so a reservation that lands in
+    # between makes the compare-and-set below skip that counter this round.
+    if connection is None:
+        seen = {key: cache.get(key) for key in keys}
+        drift = {key: cache.get(key) for key in drift_keys}
+    else:
+        seen = dict(zip(keys, connection.mget(keys)))
+        drift = dict(zip(drift_keys, connection.mget(drift_keys)))
+    counts = dict(
+        UsageMetrics.objects.filter(year=year, month=month, subscription__tenant_id__in=tenant_ids)
+        .values_list('subscription__tenant_id', 'requests_created')
+    )
+
+    corrected = 0
+    sync = connection.register_script(_SYNC_SCRIPT) if connection is not None else None
+    for tenant_id, key, drift_key in zip(tenant_ids, keys, drift_keys):
+        observed, actual = seen[key], counts.get(tenant_id)
+        if observed is None or actual is None or int(observed) == actual:
+            if drift[drift_key] is not None:
+                (cache if connection is None else connection).delete(drift_key)
+            continue
+        if int(observed) > actual and drift[drift_key] != observed:
+            if connection is None:
+                cache.set(drift_key, observed, drift_ttl)
+            else:
+                connection.set(drift_key, observed, ex=drift_ttl)
+            continue
+        if sync is None:
+            with _fallback_lock:
+                if cache.get(key) == observed:
+                    cache.set(key, actual, KEY_TTL_SECONDS)
+                    corrected += 1
+        elif sync(keys=[key], args=[observed, actual, KEY_TTL_SECONDS]):
+            corrected += 1
+    return corrected
+
+
+def check_seat(tenant, *, seat=True, approver=False):
+    """
+    Raise ``QuotaExceeded`` unless the tenant can take one more active user
+    (if ``seat``) and one more approver (if ``approver``). Reads the seat
+    counter row only.
+    """
+    if seat:
+        available_seats = tenant.available_seats
+        if available_seats is not None and available_seats <= 0:
+            raise QuotaExceeded('seats', tenant.used_seats, tenant.seats)
+        subscription = _subscription(tenant)
+        if subscription is not None and not subscription.plan.can_create_user(tenant):
+            raise QuotaExceeded('users', tenant.used_seats, subscription.plan.max_users)
+    if approver and not tenant.can_add_approver():
+        raise QuotaExceeded('approvers', tenant.approvers_count, tenant.approver_limit)
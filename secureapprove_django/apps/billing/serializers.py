@@ -112,7 +112,7 @@ class UsageMetricsSerializer(serializers.ModelSerializer):
             'subscription', 'year', 'month',
             'requests_created', 'requests_approved', 'requests_rejected',
             'total_requests', 'approval_rate',
-            'api_calls', 'active_users', 'total_users',
+            'api_calls', 'api_calls_by_endpoint', 'active_users', 'total_users',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
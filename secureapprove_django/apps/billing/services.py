@@ -2,7 +2,6 @@
 # SecureApprove Django - Billing Services
 # ==================================================
 
-import mercadopago
 from django.conf import settings
 from django.utils import timezone
 from django.utils.translation import gettext as _
@@ -10,32 +9,25 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 import logging
 
+from . import provider
 from .models import Plan, Subscription, Payment, UsageMetrics, Invoice
 from .pricing import get_price_per_user
+from .usage import month_of, rebuild_usage_metrics
 
 logger = logging.getLogger(__name__)
 
 class MercadoPagoService:
     """Service for MercadoPago API integration"""
     
-    def __init__(self):
-        # Lazy initialization - only create SDK when needed
-        self._sdk = None
-    
     @property
     def sdk(self):
-        """Lazy initialization of MercadoPago SDK"""
-        if self._sdk is None:
-            try:
-                import mercadopago
-                access_token = getattr(settings, 'MERCADOPAGO_ACCESS_TOKEN', 'TEST-demo-token')
-                self._sdk = mercadopago.SDK(access_token)
-            except Exception as e:
-                logger.warning(f"Could not initialize MercadoPago SDK: {e}")
-                # Return a mock SDK for testing
-                self._sdk = None
-        return self._sdk
-
+        """The process-wide MercadoPago SDK, or None if it cannot be built"""
+        try:
+            return provider.sdk()
+        except Exception as e:
+            logger.warning(f"Could not initialize MercadoPago SDK: {e}")
+            return None
+    
     def _get_tenant_admin_email(self, subscription):
         """
         Try to obtain an email address for the tenant admin.
@@ -93,7 +85,7 @@ class MercadoPagoService:
                 "email": self._get_tenant_admin_email(subscription),
             },
             "external_reference": str(subscription.id),
-            "notification_url": f"{settings.SITE_URL}/api/billing/webhooks/mercadopago/",
+            "notification_url": f"{settings.SITE_URL}/billing/webhooks/mercadopago/",
             "back_urls": {
                 "success": f"{settings.SITE_URL}/billing/success/",
                 "failure": f"{settings.SITE_URL}/billing/failure/",
@@ -170,62 +162,39 @@ class MercadoPagoService:
                 'error': str(e)
             }
     
-    def process_webhook(self, webhook_data):
-        """Process MercadoPago webhook notification"""
-        try:
-            if webhook_data.get('type') == 'payment':
-                payment_id = webhook_data.get('data', {}).get('id')
-                
-                if not payment_id:
-                    return {'success': False, 'error': 'No payment ID in webhook'}
-                
-                # Get payment info from MercadoPago
-                payment_info = self.get_payment_info(payment_id)
-                
-                if not payment_info['success']:
-                    return payment_info
-                
-                mp_payment = payment_info['payment']
-                external_reference = mp_payment.get('external_reference')
-                
-                if not external_reference:
-                    return {'success': False, 'error': 'No external reference'}
-                
-                # Find subscription
-                try:
-                    subscription = Subscription.objects.get(id=external_reference)
-                except Subscription.DoesNotExist:
-                    return {'success': False, 'error': 'Subscription not found'}
-                
-                # Update payment status
-                payment = Payment.objects.filter(
-                    subscription=subscription,
-                    mp_preference_id=mp_payment.get('preference_id')
-                ).first()
-                
-                if payment:
-                    payment.mp_payment_id = payment_id
-                    payment.status = self._map_mp_status(mp_payment.get('status'))
-                    payment.payment_method = mp_payment.get('payment_method_id', '')
-                    payment.metadata = mp_payment
-                    
-                    if payment.status == 'approved':
-                        payment.paid_at = timezone.now()
-                        
-                        # Update subscription
-                        self._activate_subscription(subscription, payment)
-                    
-                    payment.save()
-                    
-                    return {'success': True, 'payment_updated': True}
-                
-                return {'success': True, 'payment_not_found': True}
-            
-            return {'success': True, 'not_payment_webhook': True}
+    def apply_payment(self, subscription, mp_payment):
+        """
+        Apply a fetched MercadoPago payment to the subscription's Payment
+        record. Call inside a transaction; repeated calls are no-ops.
+        """
+        payment = Payment.objects.select_for_update().filter(
+            subscription=subscription,
+            mp_preference_id=mp_payment.get('preference_id')
+        ).first()
+        
+        if not payment:
+            return 'payment_not_found'
+        
+        mp_payment_id = str(mp_payment.get('id'))
+        new_status = self._map_mp_status(mp_payment.get('status'))
+        if payment.mp_payment_id == mp_payment_id and payment.status == new_status:
+            return 'duplicate'
+        
+        was_approved = payment.status == 'approved'
+        payment.mp_payment_id = mp_payment_id
+        payment.status = new_status
+        payment.payment_method = mp_payment.get('payment_method_id', '')
+        payment.metadata = mp_payment
+        
+        if payment.status == 'approved' and not was_approved:
+            payment.paid_at = timezone.now()
             
-        except Exception as e:
-            logger.error(f"Webhook processing error: {str(e)}")
-            return {'success': False, 'error': str(e)}
+            # Update subscription
+            self._activate_subscription(subscription, payment)
+        
+        payment.save()
+        
+        return 'payment_updated'
     
     def _map_mp_status(self, mp_status):
         """Map MercadoPago status to our payment status"""
@@ -283,16 +252,10 @@ class MercadoPagoService:
 class BillingService:
     """Main billing service"""
     
-    def __init__(self):
-        # Lazy initialization of MercadoPago service
-        self._mp_service = None
-    
     @property 
     def mp_service(self):
-        """Lazy initialization of MercadoPago service"""
-        if self._mp_service is None:
-            self._mp_service = MercadoPagoService()
-        return self._mp_service
+        """Shared MercadoPago service"""
+        return get_mp_service()
     
     def create_subscription(self, tenant, plan_name, billing_cycle='monthly'):
         """Create a new subscription for a tenant"""
@@ -362,73 +325,22 @@ class BillingService:
         return {'success': True}
     
     def get_usage_stats(self, subscription, year=None, month=None):
-        """Get usage statistics for a subscription"""
+        """Get usage statistics for a subscription from the monthly rollup"""
         
         if not year or not month:
-            now = timezone.now()
-            year, month = now.year, now.month
-        
-        metrics, created = UsageMetrics.objects.get_or_create(
-            subscription=subscription,
-            year=year,
-            month=month,
-            defaults={
-                'requests_created': 0,
-                'requests_approved': 0,
-                'requests_rejected': 0,
-                'api_calls': 0,
-                'active_users': 0,
-                'total_users': 0
-            }
-        )
+            year, month = month_of(timezone.now())
         
-        if created:
-            # Calculate actual metrics
-            self._update_usage_metrics(metrics)
+        metrics = UsageMetrics.objects.filter(
+            subscription=subscription, year=year, month=month
+        ).first()
+        if metrics is None:
+            # First read of the month: build the row once; signals keep it
+            # current from here on.
+            rebuild_usage_metrics([(year, month)], tenant_ids=[subscription.tenant_id])
+            metrics = UsageMetrics.objects.get(subscription=subscription, year=year, month=month)
         
         return metrics
     
-    def _update_usage_metrics(self, metrics):
-        """Update usage metrics with actual data"""
-        
-        from apps.requests.models import ApprovalRequest
-        from django.contrib.auth import get_user_model
-        
-        User = get_user_model()
-        subscription = metrics.subscription
-        tenant = subscription.tenant
-        
-        # Date range for the month (timezone-aware)
-        tz = timezone.get_current_timezone()
-        start_naive = datetime(metrics.year, metrics.month, 1)
-        if metrics.month == 12:
-            end_naive = datetime(metrics.year + 1, 1, 1)
-        else:
-            end_naive = datetime(metrics.year, metrics.month + 1, 1)
-        start_date = timezone.make_aware(start_naive, tz)
-        end_date = timezone.make_aware(end_naive, tz)
-        
-        # Request metrics
-        requests_qs = ApprovalRequest.objects.filter(
-            tenant=tenant,
-            created_at__gte=start_date,
-            created_at__lt=end_date
-        )
-        
-        metrics.requests_created = requests_qs.count()
-        metrics.requests_approved = requests_qs.filter(status='approved').count()
-        metrics.requests_rejected = requests_qs.filter(status='rejected').count()
-        
-        # User metrics
-        metrics.total_users = User.objects.filter(tenant=tenant).count()
-        metrics.active_users = User.objects.filter(
-            tenant=tenant,
-            last_login__gte=start_date,
-            last_login__lt=end_date
-        ).count()
-        
-        metrics.save()
-    
     def check_limits(self, subscription):
         """Check if subscription is within plan limits"""
         
@@ -440,7 +352,7 @@ class BillingService:
             return {
                 'within_limits': False,
                 'limit_type': 'users',
-                'current': tenant.users.count(),
+                'current': tenant.active_users_count,
                 'limit': plan.max_users
             }
         
@@ -449,37 +361,38 @@ class BillingService:
             return {
                 'within_limits': False,
                 'limit_type': 'approvers',
-                'current': tenant.users.filter(role__in=['admin', 'approver']).count(),
+                'current': tenant.approvers_count,
                 'limit': plan.max_approvers
             }
         
-        # Check request limits
-        if not plan.can_create_request(tenant):
-            now = timezone.now()
-            from apps.requests.models import ApprovalRequest
-            current_requests = ApprovalRequest.objects.filter(
-                tenant=tenant,
-                created_at__year=now.year,
-                created_at__month=now.month
-            ).count()
-            
+        # Check request limits against the monthly rollup
+        requests_created = self.get_usage_stats(subscription).requests_created
+        if plan.max_requests_per_month and requests_created >= plan.max_requests_per_month:
             return {
                 'within_limits': False,
                 'limit_type': 'requests',
-                'current': current_requests,
+                'current': requests_created,
                 'limit': plan.max_requests_per_month
             }
         
         return {'within_limits': True}
 
-# Service instances - Lazy initialization to avoid startup errors
-# billing_service = BillingService()
-# mp_service = MercadoPagoService()
+# Both services are stateless; the SDK and its connection pool live in
+# apps.billing.provider, so one instance of each serves the whole process.
+_billing_service = None
+_mp_service = None
+
 
 def get_billing_service():
-    """Get billing service instance (lazy initialization)"""
-    return BillingService()
+    """Get the shared billing service instance"""
+    global _billing_service
+    if _billing_service is None:
+        _billing_service = BillingService()
+    return _billing_service
 
 def get_mp_service():
-    """Get MercadoPago service instance (lazy initialization)"""
-    return MercadoPagoService()
+    """Get the shared MercadoPago service instance"""
+    global _mp_service
+    if _mp_service is None:
+        _mp_service = MercadoPagoService()
+    return _mp_service
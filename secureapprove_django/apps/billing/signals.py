@@ -2,12 +2,15 @@
 # SecureApprove Django - Billing Signals
 # ==================================================
 
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
 from django.utils import timezone
+from apps.requests.models import ApprovalRequest
 from apps.tenants.models import Tenant
 from .models import Plan, Subscription
 from .services import get_billing_service
+from . import usage
 
 @receiver(post_save, sender=Tenant)
 def create_default_subscription(sender, instance, created, **kwargs):
@@ -33,4 +36,55 @@ def create_default_subscription(sender, instance, created, **kwargs):
                 current_period_start=now,
                 current_period_end=trial_end,
                 trial_end=trial_end
-            )
\ No newline at end of file
+            )
+
+
+# Monthly usage rollups. Each instance remembers what it contributed when it
+# was loaded, and saves apply only the difference. Instances loaded with
+# deferred fields are skipped; rebuild_usage_metrics corrects those.
+
+@receiver(post_init, sender=ApprovalRequest)
+def remember_request_usage_state(sender, instance, **kwargs):
+    instance._usage_state = usage.request_state(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=ApprovalRequest)
+def update_usage_on_request_save(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_usage_state', None)
+    current = usage.request_state(instance)
+    instance._usage_state = current
+    if current is None or (previous is None and not created) or previous == current:
+        return
+    usage.apply_usage_change(usage.request_units(previous), usage.request_units(current))
+
+
+@receiver(post_delete, sender=ApprovalRequest)
+def update_usage_on_request_delete(sender, instance, **kwargs):
+    previous = getattr(instance, '_usage_state', None)
+    if previous is not None:
+        usage.apply_usage_change(usage.request_units(previous), usage.Counter(), create_missing=False)
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_user_usage_state(sender, instance, **kwargs):
+    instance._usage_state = usage.user_state(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def update_usage_on_user_save(sender, instance, created, **kwargs):
+    # Logins reach this through update_last_login's save().
+    previous = None if created else getattr(instance, '_usage_state', None)
+    current = usage.user_state(instance)
+    instance._usage_state = current
+    if current is None or (previous is None and not created) or previous == current:
+        return
+    period = usage.month_of(timezone.now())
+    usage.apply_usage_change(usage.user_units(previous, period), usage.user_units(current, period))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def update_usage_on_user_delete(sender, instance, **kwargs):
+    previous = getattr(instance, '_usage_state', None)
+    if previous is not None:
+        period = usage.month_of(timezone.now())
+        usage.apply_usage_change(usage.user_units(previous, period), usage.Counter(), create_missing=False)
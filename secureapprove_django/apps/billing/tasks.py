@@ -0,0 +1,175 @@
+import logging
+from collections import defaultdict
+
+from datetime import timedelta
+
+from celery import shared_task
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_MAX_RETRIES = 8
+# Pending inbox events older than this are assumed lost by the broker.
+WEBHOOK_REDISPATCH_AFTER = timedelta(minutes=5)
+
+
+def apply_api_usage(counts):
+    """Add drained ``tenant:year-month:endpoint`` counts to the UsageMetrics rows."""
+    from apps.billing.metering import parse_field
+    from apps.billing.models import Subscription, UsageMetrics
+    from apps.billing.usage import rebuild_usage_metrics
+
+    periods = defaultdict(lambda: defaultdict(int))
+    for field, amount in counts.items():
+        tenant_id, year, month, endpoint = parse_field(field)
+        periods[(tenant_id, year, month)][endpoint] += amount
+
+    subscriptions = {
+        subscription.tenant_id: subscription
+        for subscription in Subscription.objects.filter(tenant_id__in={key[0] for key in periods})
+    }
+    unmatched = sorted({tenant_id for tenant_id, _, _ in periods if tenant_id not in subscriptions})
+    if unmatched:
+        logger.warning('Dropping API usage for tenants without a subscription: %s', unmatched)
+
+    wanted = {
+        (subscriptions[tenant_id].pk, year, month): endpoints
+        for (tenant_id, year, month), endpoints in periods.items()
+        if tenant_id in subscriptions
+    }
+    if not wanted:
+        return
+    existing = set(
+        UsageMetrics.objects.filter(subscription_id__in={key[0] for key in wanted})
+        .values_list('subscription_id', 'year', 'month')
+    )
+    tenant_by_subscription = {subscription.pk: tenant_id for tenant_id, subscription in subscriptions.items()}
+    missing = defaultdict(list)
+    for subscription_id, year, month in wanted.keys() - existing:
+        missing[(year, month)].append(tenant_by_subscription[subscription_id])
+    for period, tenant_ids in sorted(missing.items()):
+        # First activity of the month: build the rows from the database so
+        # their request and user counts are filled in as well.
+        rebuild_usage_metrics([period], tenant_ids=tenant_ids)
+
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            UsageMetrics.objects.select_for_update()
+            .filter(subscription_id__in={key[0] for key in wanted})
+            .filter(year__in={key[1] for key in wanted}, month__in={key[2] for key in wanted})
+        )
+        updated = []
+        for row in rows:
+            endpoints = wanted.get((row.subscription_id, row.year, row.month))
+            if not endpoints:
+                continue
+            by_endpoint = dict(row.api_calls_by_endpoint or {})
+            for endpoint, amount in endpoints.items():
+                by_endpoint[endpoint] = by_endpoint.get(endpoint, 0) + amount
+            row.api_calls += sum(endpoints.values())
+            row.api_calls_by_endpoint = by_endpoint
+            row.updated_at = now
+            updated.append(row)
+        UsageMetrics.objects.bulk_update(updated, ['api_calls', 'api_calls_by_endpoint', 'updated_at'])
+
+
+@shared_task
+def flush_api_usage():
+    """Move metered API calls from Redis into UsageMetrics."""
+    from apps.billing.metering import meter
+
+    calls = meter.drain(apply_api_usage)
+    if calls:
+        logger.info('Recorded %s metered API call(s)', calls)
+    return {'calls': calls}
+
+
+@shared_task
+def rebuild_recent_usage_metrics():
+    """Recompute the previous and current month's usage rollups from the database."""
+    from apps.billing.usage import month_of, months_between, rebuild_usage_metrics
+
+    year, month = month_of(timezone.now())
+    previous = (year - 1, 12) if month == 1 else (year, month - 1)
+    rows = rebuild_usage_metrics(months_between(previous, (year, month)))
+    logger.info('Rebuilt %s usage rollup row(s)', rows)
+    return {'rows': rows}
+
+
+@shared_task
+def reconcile_request_quotas():
+    """Re-sync this month's request quota counters with the usage rollup."""
+    from apps.billing import quotas
+
+    corrected = quotas.reconcile_request_quotas()
+    if corrected:
+        logger.info('Corrected %s request quota counter(s)', corrected)
+    return {'corrected': corrected}
+
+
+@shared_task(bind=True, max_retries=WEBHOOK_MAX_RETRIES)
+def process_webhook_event(self, event_id):
+    """Apply one stored payment-provider notification."""
+    from apps.billing.models import WebhookEvent
+    from apps.billing.webhooks import apply_event, fetch_event_payment
+
+    try:
+        event = WebhookEvent.objects.filter(pk=event_id, status='pending').first()
+        if event is None:
+            return {'status': 'skipped'}
+        # The provider lookup runs before the transaction so a slow or
+        # retried request never holds the event lock or a DB transaction.
+        mp_payment = fetch_event_payment(event)
+        with transaction.atomic():
+            # skip_locked: a redelivered task for an event another worker is
+            # applying returns at once instead of waiting for it.
+            event = (
+                WebhookEvent.objects.select_for_update(skip_locked=True)
+                .filter(pk=event_id, status='pending')
+                .first()
+            )
+            if event is None:
+                return {'status': 'skipped'}
+            outcome = apply_event(event, mp_payment)
+            event.status = 'ignored' if outcome.startswith('ignored') else 'processed'
+            event.outcome = outcome[:100]
+            event.attempts += 1
+            event.last_error = ''
+            event.processed_at = timezone.now()
+            event.save(update_fields=['status', 'outcome', 'attempts', 'last_error', 'processed_at'])
+            return {'status': event.status, 'outcome': outcome}
+    except Exception as exc:
+        # Lookup failures, provider outages and races on the unique payment
+        # id all land here; the retry sees whatever the other side committed.
+        exhausted = self.request.retries >= self.max_retries
+        WebhookEvent.objects.filter(pk=event_id, status='pending').update(
+            attempts=F('attempts') + 1,
+            last_error=str(exc)[:2000],
+            status='failed' if exhausted else 'pending',
+        )
+        if exhausted:
+            logger.exception('Webhook event %s failed permanently', event_id)
+            return {'status': 'failed'}
+        logger.warning('Webhook event %s failed, retrying: %s', event_id, exc)
+        raise self.retry(exc=exc, countdown=min(300, 2 ** min(self.request.retries + 1, 8)))
+
+
+@shared_task
+def dispatch_pending_webhook_events(limit=500):
+    """Queue inbox events whose task was never delivered (failed attempts retry on their own)."""
+    from apps.billing.models import WebhookEvent
+
+    cutoff = timezone.now() - WEBHOOK_REDISPATCH_AFTER
+    event_ids = list(
+        WebhookEvent.objects.filter(status='pending', attempts=0, received_at__lt=cutoff)
+        .order_by('received_at')
+        .values_list('pk', flat=True)[:limit]
+    )
+    for event_id in event_ids:
+        process_webhook_event.delay(str(event_id))
+    if event_ids:
+        logger.info('Re-queued %s pending webhook event(s)', len(event_ids))
+    return {'queued': len(event_ids)}
@@ -0,0 +1,520 @@
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest.mock import patch
+from django.db import connection
+from django.utils import timezone
+
+from apps.billing.metering import USAGE_KEY, endpoint_class, meter
+from apps.billing import provider, quotas
+from apps.billing.models import Payment, Plan, UsageMetrics, WebhookEvent
+from apps.billing.services import get_billing_service, get_mp_service
+from apps.billing.usage import month_bounds, month_of
+from apps.billing.tasks import flush_api_usage, process_webhook_event, reconcile_request_quotas
+from apps.billing.webhooks import TransientWebhookError
+from apps.requests.models import ApprovalRequest
+from apps.tenants.models import Tenant
+
+
+User = get_user_model()
+
+
+class ApiMeteringTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        meter._pending.clear()
+        self.addCleanup(meter._pending.clear)
+        Plan.objects.create(
+            name="starter",
+            display_name="Starter",
+            monthly_price=Decimal("90.00"),
+            max_approvers=2,
+            max_requests_per_month=0,
+            max_users=0,
+        )
+        self.tenant = Tenant.objects.create(key="acme", name="Acme", status="active")
+        self.user = User.objects.create_user(
+            username="requester",
+            email="requester@acme.test",
+            password="test-password",
+            tenant=self.tenant,
+        )
+        ApprovalRequest.objects.create(
+            title="Laptop", description="", requester=self.user, tenant=self.tenant
+        )
+        self.url = f"/api/proofs/{uuid.uuid4()}/verify/"
+
+    def test_endpoint_class(self):
+        self.assertEqual(endpoint_class("/api/requests/42/"), "requests")
+        self.assertEqual(endpoint_class("/api/unknown/"), "other")
+        self.assertIsNone(endpoint_class("/api/docs/"))
+        self.assertIsNone(endpoint_class("/en/requests/"))
+
+    def test_authenticated_calls_are_counted_per_tenant_and_endpoint(self):
+        self.client.get(self.url)
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        period = timezone.localdate()
+        self.assertEqual(meter._pending, {f"{self.tenant.pk}:{period.year}-{period.month}:proofs": 2})
+
+    def test_flush_folds_counts_into_usage_metrics(self):
+        self.client.force_login(self.user)
+        for _ in range(3):
+            self.client.get(self.url)
+
+        self.assertEqual(flush_api_usage(), {"calls": 3})
+        self.assertIsNone(cache.get(USAGE_KEY))
+
+        period = timezone.localdate()
+        usage = UsageMetrics.objects.get(
+            subscription__tenant=self.tenant, year=period.year, month=period.month
+        )
+        self.assertEqual(usage.api_calls, 3)
+        self.assertEqual(usage.api_calls_by_endpoint, {"proofs": 3})
+        # The row is created through the billing service, so its request
+        # counts are filled in as well.
+        self.assertEqual(usage.requests_created, 1)
+
+        self.client.get(self.url)
+        flush_api_usage()
+        usage.refresh_from_db()
+        self.assertEqual(usage.api_calls, 4)
+
+
+class UsageRollupTests(TestCase):
+    def setUp(self):
+        Plan.objects.create(
+            name="starter",
+            display_name="Starter",
+            monthly_price=Decimal("90.00"),
+            max_approvers=2,
+            max_requests_per_month=3,
+            max_users=0,
+        )
+        self.tenant = Tenant.objects.create(key="acme", name="Acme", status="active")
+        self.subscription = self.tenant.subscription
+        self.user = User.objects.create_user(
+            username="requester",
+            email="requester@acme.test",
+            password="test-password",
+            tenant=self.tenant,
+        )
+        self.approver = User.objects.create_user(
+            username="approver",
+            email="approver@acme.test",
+            password="test-password",
+            tenant=self.tenant,
+            role="approver",
+        )
+        self.period = month_of(timezone.now())
+
+    def _request(self, title="Laptop"):
+        return ApprovalRequest.objects.create(
+            title=title, description="", requester=self.user, tenant=self.tenant
+        )
+
+    def _usage(self):
+        return UsageMetrics.objects.get(subscription=self.subscription, year=self.period[0], month=self.period[1])
+
+    def test_lifecycle_changes_update_the_rollup_incrementally(self):
+        first = self._request()
+        usage = self._usage()
+        self.assertEqual((usage.requests_created, usage.total_users), (1, 2))
+
+        second = self._request("Monitor")
+        ApprovalRequest.objects.get(pk=first.pk).approve(self.approver)
+        second.reject(self.approver, "No budget")
+        self.client.force_login(self.user)
+
+        usage.refresh_from_db()
+        self.assertEqual(
+            (usage.requests_created, usage.requests_approved, usage.requests_rejected, usage.active_users),
+            (2, 1, 1, 1),
+        )
+
+        second.delete()
+        User.objects.create_user(username="late", email="late@acme.test", password="pw", tenant=self.tenant)
+        usage.refresh_from_db()
+        self.assertEqual((usage.requests_created, usage.requests_rejected, usage.total_users), (1, 0, 3))
+
+    def test_status_change_is_a_single_update(self):
+        request = self._request()
+        with CaptureQueriesContext(connection) as queries:
+            request.approve(self.approver)
+        rollup_updates = [q for q in queries if 'UPDATE "billing_usagemetrics"' in q["sql"]]
+        self.assertEqual(len(rollup_updates), 1)
+
+    def test_rebuild_command_recomputes_a_range(self):
+        self._request()
+        last_month = month_bounds(*self.period)[0] - timedelta(days=1)
+        old = self._request("Old")
+        ApprovalRequest.objects.filter(pk=old.pk).update(created_at=last_month, status="approved")
+        UsageMetrics.objects.filter(subscription=self.subscription).update(requests_created=99)
+
+        out = StringIO()
+        call_command(
+            "rebuild_usage_metrics",
+            "--from", f"{last_month.year}-{last_month.month:02d}",
+            "--to", f"{self.period[0]}-{self.period[1]:02d}",
+            "--tenant", "acme",
+            stdout=out,
+        )
+
+        self.assertIn("2 month(s)", out.getvalue())
+        self.assertEqual(self._usage().requests_created, 1)
+        previous = UsageMetrics.objects.get(
+            subscription=self.subscription, year=last_month.year, month=last_month.month
+        )
+        self.assertEqual((previous.requests_created, previous.requests_approved), (1, 1))
+
+    def test_rebuild_counts_after_locking_the_rows(self):
+        from apps.billing import usage
+
+        depth = len(connection.atomic_blocks)
+        counted = usage._computed_usage
+        depths = []
+
+        def computed_usage(*args, **kwargs):
+            depths.append(len(connection.atomic_blocks) - depth)
+            return counted(*args, **kwargs)
+
+        with patch.object(usage, "_computed_usage", side_effect=computed_usage):
+            usage.rebuild_usage_metrics([self.period])
+        self.assertEqual(depths, [1])
+
+    def test_billing_reads_do_not_count_requests(self):
+        for title in ("A", "B", "C"):
+            self._request(title)
+        service = get_billing_service()
+        with CaptureQueriesContext(connection) as queries:
+            stats = service.get_usage_stats(self.subscription)
+            limits = service.check_limits(self.subscription)
+        self.assertEqual(stats.requests_created, 3)
+        self.assertEqual(limits, {"within_limits": False, "limit_type": "requests", "current": 3, "limit": 3})
+        self.assertFalse([q for q in queries if "requests_approvalrequest" in q["sql"]])
+
+
+class RequestQuotaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        Plan.objects.create(
+            name="starter",
+            display_name="Starter",
+            monthly_price=Decimal("90.00"),
+            max_approvers=2,
+            max_requests_per_month=3,
+            max_users=0,
+        )
+        self.tenant = Tenant.objects.create(key="acme", name="Acme", status="active")
+        self.user = User.objects.create_user(
+            username="requester",
+            email="requester@acme.test",
+            password="test-password",
+            tenant=self.tenant,
+        )
+
+    def _create(self, title="Laptop"):
+        with quotas.reserve_request(self.tenant):
+            return ApprovalRequest.objects.create(
+                title=title, description="", requester=self.user, tenant=self.tenant
+            )
+
+    def test_reservations_stop_at_the_monthly_limit(self):
+        ApprovalRequest.objects.create(title="Seeded", description="", requester=self.user, tenant=self.tenant)
+        self._create("A")
+        self._create("B")
+
+        with self.assertRaises(quotas.QuotaExceeded) as raised:
+            self._create("C")
+
+        self.assertEqual((raised.exception.current, raised.exception.limit), (3, 3))
+        self.assertEqual(ApprovalRequest.objects.filter(tenant=self.tenant).count(), 3)
+        self.assertFalse(self.tenant.subscription.can_create_request())
+
+    def test_failed_insert_gives_the_slot_back(self):
+        self._create("A")
+        with self.assertRaises(RuntimeError):
+            with quotas.reserve_request(self.tenant):
+                raise RuntimeError("insert failed")
+        self.assertEqual(quotas.requests_used(self.tenant), 1)
+
+    def test_parallel_reservations_never_exceed_the_limit(self):
+        self._create("A")
+        outcomes = []
+
+        def reserve():
+            try:
+                with quotas.reserve_request(self.tenant):
+                    outcomes.append(True)
+            except quotas.QuotaExceeded:
+                outcomes.append(False)
+
+        # The counter is seeded and the subscription cached per thread, so
+        # the threads below only contend on the quota counter itself.
+        with patch("apps.billing.quotas._subscription", return_value=self.tenant.subscription):
+            threads = [threading.Thread(target=reserve) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(outcomes.count(True), 2)
+        self.assertEqual(quotas.requests_used(self.tenant), 3)
+
+    def test_reconcile_lowers_a_counter_only_once_it_is_stable(self):
+        self._create("A")
+        year, month = month_of(timezone.now())
+        key = quotas._request_key(self.tenant.pk, year, month)
+        cache.set(key, 3, quotas.KEY_TTL_SECONDS)
+
+        # The extra slots may belong to inserts that have not committed yet.
+        self.assertEqual(reconcile_request_quotas(), {"corrected": 0})
+        self.assertEqual(quotas.requests_used(self.tenant), 3)
+        self.assertEqual(reconcile_request_quotas(), {"corrected": 1})
+        self.assertEqual(quotas.requests_used(self.tenant), 1)
+
+    def test_reconcile_keeps_slots_of_inserts_committed_between_runs(self):
+        year, month = month_of(timezone.now())
+        key = quotas._request_key(self.tenant.pk, year, month)
+        with quotas.reserve_request(self.tenant):
+            # The slot is taken but the rollup has not seen the insert yet.
+            self.assertEqual(reconcile_request_quotas(), {"corrected": 0})
+            ApprovalRequest.objects.create(title="A", description="", requester=self.user, tenant=self.tenant)
+        self.assertEqual(reconcile_request_quotas(), {"corrected": 0})
+        self.assertEqual(cache.get(key), 1)
+
+    def test_reconcile_raises_a_counter_below_the_rollup_at_once(self):
+        self._create("A")
+        self._create("B")
+        year, month = month_of(timezone.now())
+        cache.set(quotas._request_key(self.tenant.pk, year, month), 0, quotas.KEY_TTL_SECONDS)
+
+        self.assertEqual(reconcile_request_quotas(), {"corrected": 1})
+        self.assertEqual(quotas.requests_used(self.tenant), 2)
+
+    def test_check_seat_enforces_the_approver_limit(self):
+        self.tenant.approver_limit = 1
+        self.tenant.save()
+        User.objects.create_user(
+            username="approver", email="approver@acme.test", password="pw", tenant=self.tenant, role="approver"
+        )
+        tenant = Tenant.objects.get(pk=self.tenant.pk)
+        quotas.check_seat(tenant)
+        with self.assertRaises(quotas.QuotaExceeded) as raised:
+            quotas.check_seat(tenant, approver=True)
+        self.assertEqual(raised.exception.limit_type, "approvers")
+
+
+class FakeMercadoPago(BaseHTTPRequestHandler):
+    """Serves ``GET /v1/payments/<id>`` from ``payments``; the next ``outages`` requests get a 503."""
+
+    protocol_version = "HTTP/1.1"
+    payments = {}
+    outages = 0
+    requests = []
+
+    def do_GET(self):
+        FakeMercadoPago.requests.append(self.client_address)
+        if FakeMercadoPago.outages:
+            FakeMercadoPago.outages -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        payment = self.payments.get(self.path.split("?")[0].rstrip("/").rsplit("/", 1)[-1])
+        body = json.dumps(payment or {"message": "Payment not found"}).encode()
+        self.send_response(200 if payment else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeMercadoPagoTestCase(TestCase):
+    provider_settings = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeMercadoPago)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.settings_override = override_settings(
+            MERCADOPAGO_ACCESS_TOKEN="TEST-token",
+            MERCADOPAGO_API_BASE_URL=f"http://127.0.0.1:{cls.server.server_port}",
+            **cls.provider_settings,
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        FakeMercadoPago.payments.clear()
+        FakeMercadoPago.outages = 0
+        FakeMercadoPago.requests = []
+        provider._sdk_instance = None
+
+
+class PaymentProviderClientTests(FakeMercadoPagoTestCase):
+    provider_settings = {
+        "SECUREAPPROVE_MERCADOPAGO_MAX_RETRIES": 2,
+        "SECUREAPPROVE_MERCADOPAGO_RETRY_BACKOFF_SECONDS": 0,
+        "SECUREAPPROVE_MERCADOPAGO_CIRCUIT_BREAKER_THRESHOLD": 2,
+    }
+
+    def test_lookups_share_one_connection_and_retry_server_errors(self):
+        FakeMercadoPago.payments["555"] = {"id": 555, "status": "approved"}
+        FakeMercadoPago.outages = 2
+        mp_service = get_mp_service()
+
+        self.assertTrue(mp_service.get_payment_info("555")["success"])
+        self.assertTrue(get_mp_service().get_payment_info("555")["success"])
+
+        self.assertIs(get_mp_service(), mp_service)
+        self.assertEqual(len(FakeMercadoPago.requests), 4)
+        self.assertEqual(len(set(FakeMercadoPago.requests)), 1)
+
+    def test_breaker_fails_fast_after_repeated_outages(self):
+        FakeMercadoPago.payments["555"] = {"id": 555, "status": "approved"}
+        FakeMercadoPago.outages = 6
+        mp_service = get_mp_service()
+
+        for _ in range(2):
+            self.assertFalse(mp_service.get_payment_info("555")["success"])
+        self.assertEqual(len(FakeMercadoPago.requests), 6)
+
+        result = mp_service.get_payment_info("555")
+        self.assertFalse(result["success"])
+        self.assertIn("unavailable", result["error"])
+        self.assertEqual(len(FakeMercadoPago.requests), 6)
+
+        with patch("apps.billing.provider.time.monotonic", return_value=time.monotonic() + 60):
+            self.assertTrue(mp_service.get_payment_info("555")["success"])
+
+
+class MercadoPagoWebhookTests(FakeMercadoPagoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.plan = Plan.objects.create(
+            name="starter",
+            display_name="Starter",
+            monthly_price=Decimal("90.00"),
+            max_approvers=2,
+            max_requests_per_month=0,
+            max_users=0,
+        )
+
+    def _notify(self, notification_id, payment_id, action="payment.created"):
+        body = {"id": notification_id, "type": "payment", "action": action, "data": {"id": payment_id}}
+        with patch("apps.billing.tasks.process_webhook_event.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    "/billing/webhooks/mercadopago/", data=json.dumps(body), content_type="application/json"
+                )
+        self.assertEqual(response.status_code, 200)
+        return delay
+
+    def test_notifications_are_stored_once_and_queued(self):
+        first = self._notify(101, "555")
+        redelivery = self._notify(101, "555")
+
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.event_key, event.resource_id, event.status), ("101", "555", "pending"))
+        first.assert_called_once_with(str(event.pk))
+        redelivery.assert_not_called()
+
+    def test_new_customer_payment_creates_the_account_once(self):
+        FakeMercadoPago.payments["555"] = {
+            "id": 555,
+            "status": "approved",
+            "transaction_amount": 120,
+            "currency_id": "USD",
+            "external_reference": "new-starter-buyer@example.test",
+            "metadata": {"plan_name": "starter", "customer_email": "buyer@example.test", "seats": 2},
+        }
+        self._notify(101, "555")
+        self._notify(102, "555", action="payment.updated")
+        created, updated = WebhookEvent.objects.order_by("event_key")
+
+        self.assertEqual(process_webhook_event(str(created.pk))["outcome"], "account_created")
+        self.assertEqual(process_webhook_event(str(updated.pk))["outcome"], "duplicate")
+        self.assertEqual(process_webhook_event(str(created.pk)), {"status": "skipped"})
+
+        payment = Payment.objects.get(mp_payment_id="555")
+        self.assertEqual(payment.subscription.status, "active")
+        self.assertEqual(payment.subscription.tenant.users.get().email, "buyer@example.test")
+
+    def test_upgrade_payment_updates_the_pending_payment(self):
+        tenant = Tenant.objects.create(key="acme", name="Acme")
+        pending = Payment.objects.create(
+            subscription=tenant.subscription,
+            amount=Decimal("120.00"),
+            status="pending",
+            mp_preference_id="pref-1",
+        )
+        FakeMercadoPago.payments["777"] = {
+            "id": 777,
+            "status": "approved",
+            "preference_id": "pref-1",
+            "external_reference": str(tenant.subscription.pk),
+        }
+        self._notify(201, "777")
+
+        result = process_webhook_event(str(WebhookEvent.objects.get().pk))
+
+        self.assertEqual(result, {"status": "processed", "outcome": "payment_updated"})
+        pending.refresh_from_db()
+        self.assertEqual((pending.status, pending.mp_payment_id), ("approved", "777"))
+        tenant.subscription.refresh_from_db()
+        self.assertEqual(tenant.subscription.status, "active")
+
+    def test_payment_lookup_runs_outside_the_event_transaction(self):
+        FakeMercadoPago.payments["555"] = {"id": 555, "status": "rejected"}
+        self._notify(401, "555")
+        depth = len(connection.atomic_blocks)
+        lookup = get_mp_service().get_payment_info
+        depths = []
+
+        def get_payment_info(payment_id):
+            depths.append(len(connection.atomic_blocks) - depth)
+            return lookup(payment_id)
+
+        with patch.object(get_mp_service(), "get_payment_info", side_effect=get_payment_info):
+            result = process_webhook_event(str(WebhookEvent.objects.get().pk))
+
+        self.assertEqual(result["status"], "ignored")
+        self.assertEqual(depths, [0])
+
+    def test_lookup_failures_are_recorded_and_retried(self):
+        self._notify(301, "999")
+        event = WebhookEvent.objects.get()
+
+        # Called directly, Celery's retry re-raises the original error.
+        with self.assertRaises(TransientWebhookError):
+            process_webhook_event(str(event.pk))
+
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ("pending", 1))
+        self.assertIn("lookup failed", event.last_error)
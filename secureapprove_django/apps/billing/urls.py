@@ -4,7 +4,7 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views, api
+from . import views, api, webhooks
 
 # API Router
 router = DefaultRouter()
@@ -35,7 +35,7 @@ urlpatterns = [
     path('api/plans/', api.get_plans, name='api_plans'),
     
     # Webhooks
-    path('webhooks/mercadopago/', views.mercadopago_webhook, name='mercadopago_webhook'),
+    path('webhooks/mercadopago/', webhooks.mercadopago_webhook, name='mercadopago_webhook'),
     
     # DRF API
     path('api/', include(router.urls)),
@@ -0,0 +1,228 @@
+"""Monthly usage rollups in ``UsageMetrics``.
+
+Request and user lifecycle signals keep the rows current with single
+``UPDATE ... SET col = col + n`` statements, so billing pages read one row
+instead of counting. ``rebuild_usage_metrics`` recomputes whole month
+ranges with grouped queries; it backfills history and corrects drift from
+writes that bypass signals.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+ROLLUP_FIELDS = ('requests_created', 'requests_approved', 'requests_rejected', 'active_users', 'total_users')
+
+
+def month_of(moment) -> tuple[int, int]:
+    local = timezone.localtime(moment)
+    return local.year, local.month
+
+
+def month_bounds(year: int, month: int):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime(year, month, 1), tz)
+    end = timezone.make_aware(datetime(year + month // 12, month % 12 + 1, 1), tz)
+    return start, end
+
+
+def months_between(start: tuple[int, int], end: tuple[int, int]) -> list[tuple[int, int]]:
+    """Inclusive list of ``(year, month)`` from ``start`` to ``end``."""
+    (year, month), months = start, []
+    while (year, month) <= end:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def apply_usage_delta(tenant_id, year: int, month: int, *, create_missing=True, **deltas) -> None:
+    """
+    Add ``deltas`` to a tenant's month row. A missing row is built from the
+    database unless ``create_missing`` is false, as during cascade deletes.
+    """
+    from apps.billing.models import UsageMetrics
+
+    deltas = {field: amount for field, amount in deltas.items() if amount}
+    if not tenant_id or not deltas:
+        return
+    updated = UsageMetrics.objects.filter(
+        subscription__tenant_id=tenant_id, year=year, month=month
+    ).update(**{field: models.F(field) + amount for field, amount in deltas.items()}, updated_at=timezone.now())
+    if not updated and create_missing:
+        # The rebuild reads the database, which already includes this change.
+        rebuild_usage_metrics([(year, month)], tenant_ids=[tenant_id])
+
+
+def request_state(request):
+    """``(tenant_id, created_at, status)`` of a request, or None if a field is deferred."""
+    if any(field not in request.__dict__ for field in ('tenant_id', 'created_at', 'status')):
+        return None
+    return (request.tenant_id, request.created_at, request.status)
+
+
+def user_state(user):
+    """``(tenant_id, last_login)`` of a user, or None if a field is deferred."""
+    if any(field not in user.__dict__ for field in ('tenant_id', 'last_login')):
+        return None
+    return (user.tenant_id, user.last_login)
+
+
+def request_units(state) -> Counter:
+    """Rollup counters a request in ``state`` contributes to."""
+    units = Counter()
+    tenant_id, created_at, status = state or (None, None, None)
+    if tenant_id and created_at:
+        period = month_of(created_at)
+        units[(tenant_id, *period, 'requests_created')] += 1
+        if status in ('approved', 'rejected'):
+            units[(tenant_id, *period, f'requests_{status}')] += 1
+    return units
+
+
+def user_units(state, period) -> Counter:
+    """Rollup counters a user in ``state`` contributes to; ``period`` is the current month."""
+    units = Counter()
+    tenant_id, last_login = state or (None, None)
+    if tenant_id:
+        units[(tenant_id, *period, 'total_users')] += 1
+        if last_login:
+            units[(tenant_id, *month_of(last_login), 'active_users')] += 1
+    return units
+
+
+def apply_usage_change(previous: Counter, current: Counter, *, create_missing=True) -> None:
+    """Move the rollup from ``previous`` contributions to ``current`` ones."""
+    deltas = {}
+    for unit in previous.keys() | current.keys():
+        amount = current[unit] - previous[unit]
+        if amount:
+            tenant_id, year, month, field = unit
+            deltas.setdefault((tenant_id, year, month), {})[field] = amount
+    for (tenant_id, year, month), fields in sorted(deltas.items()):
+        apply_usage_delta(tenant_id, year, month, create_missing=create_missing, **fields)
+
+
+def _computed_usage(months, tenant_ids=None) -> dict:
+    """``{(tenant_id, year, month): {field: value}}`` for every tenant with a subscription."""
+    from apps.billing.models import Subscription
+    from apps.requests.models import ApprovalRequest
+
+    User = get_user_model()
+    range_start = month_bounds(*months[0])[0]
+    range_end = month_bounds(*months[-1])[1]
+    tenants = Subscription.objects.values_list('tenant_id', flat=True)
+    if tenant_ids is not None:
+        tenants = tenants.filter(tenant_id__in=tenant_ids)
+    usage = {
+        (tenant_id, year, month): dict.fromkeys(ROLLUP_FIELDS, 0)
+        for tenant_id in tenants
+        for year, month in months
+    }
+    if not usage:
+        return usage
+    scope = {'tenant_id__in': tenant_ids} if tenant_ids is not None else {'tenant__isnull': False}
+
+    requests = (
+        ApprovalRequest.objects.filter(created_at__gte=range_start, created_at__lt=range_end, **scope)
+        .annotate(period=TruncMonth('created_at'))
+        .values('tenant_id', 'period')
+        .annotate(
+            created=models.Count('pk'),
+            approved=models.Count('pk', filter=models.Q(status='approved')),
+            rejected=models.Count('pk', filter=models.Q(status='rejected')),
+        )
+        .order_by()
+    )
+    for row in requests:
+        key = (row['tenant_id'], *month_of(row['period']))
+        if key in usage:
+            usage[key].update(
+                requests_created=row['created'],
+                requests_approved=row['approved'],
+                requests_rejected=row['rejected'],
+            )
+
+    logins = (
+        User.objects.filter(last_login__gte=range_start, last_login__lt=range_end, **scope)
+        .annotate(period=TruncMonth('last_login'))
+        .values('tenant_id', 'period')
+        .annotate(active=models.Count('pk'))
+        .order_by()
+    )
+    for row in logins:
+        key = (row['tenant_id'], *month_of(row['period']))
+        if key in usage:
+            usage[key]['active_users'] = row['active']
+
+    # Users that exist now and had joined by the end of each month.
+    totals = (
+        User.objects.filter(**scope)
+        .values('tenant_id')
+        .annotate(**{
+            f'm{index}': models.Count('pk', filter=models.Q(date_joined__lt=month_bounds(*period)[1]))
+            for index, period in enumerate(months)
+        })
+        .order_by()
+    )
+    for row in totals:
+        for index, (year, month) in enumerate(months):
+            key = (row['tenant_id'], year, month)
+            if key in usage:
+                usage[key]['total_users'] = row[f'm{index}']
+    return usage
+
+
+def rebuild_usage_metrics(months, tenant_ids=None) -> int:
+    """Recompute the rollup for ``months`` (sorted ``(year, month)`` pairs); returns rows written."""
+    from apps.billing.models import Subscription, UsageMetrics
+
+    if not months:
+        return 0
+    subscriptions = Subscription.objects.values_list('tenant_id', 'pk')
+    if tenant_ids is not None:
+        subscriptions = subscriptions.filter(tenant_id__in=tenant_ids)
+    subscriptions = dict(subscriptions)
+    if not subscriptions:
+        return 0
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {
+            (row.subscription_id, row.year, row.month): row
+            for row in UsageMetrics.objects.select_for_update().filter(
+                subscription_id__in=subscriptions.values(),
+                year__in={year for year, _ in months},
+                month__in={month for _, month in months},
+            ).order_by('pk')
+        }
+        # Counted only once the rows are locked: a signal's F() increment
+        # either committed before the lock, and is in the count, or waits
+        # for this transaction and lands on top of the written totals.
+        usage = _computed_usage(months, tenant_ids)
+        changed, created = [], []
+        for (tenant_id, year, month), values in usage.items():
+            if tenant_id not in subscriptions:
+                continue  # Subscribed after the lookup above; built on its first delta.
+            row = existing.get((subscriptions[tenant_id], year, month))
+            if row is None:
+                created.append(UsageMetrics(subscription_id=subscriptions[tenant_id], year=year, month=month, **values))
+                continue
+            if any(getattr(row, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(row, field, value)
+                row.updated_at = now
+                changed.append(row)
+        UsageMetrics.objects.bulk_update(changed, [*ROLLUP_FIELDS, 'updated_at'], batch_size=500)
+        try:
+            with transaction.atomic():
+                UsageMetrics.objects.bulk_create(created, batch_size=500)
+        except IntegrityError:
+            # A concurrent writer created some of the rows first; theirs are
+            # computed the same way.
+            UsageMetrics.objects.bulk_create(created, batch_size=500, ignore_conflicts=True)
+    return len(changed) + len(created)
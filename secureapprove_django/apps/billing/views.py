@@ -5,9 +5,8 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
-from django.views.decorators.csrf import csrf_exempt
 from django.utils.translation import gettext as _
 from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
@@ -18,10 +17,10 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from datetime import timedelta
 from secrets import token_urlsafe
-import json
 import logging
 
 from .models import Plan, Subscription, Payment, Invoice
+from .provider import PaymentProviderUnavailable
 from .services import get_billing_service, get_mp_service
 from .serializers import PlanSerializer, SubscriptionSerializer, PaymentSerializer
 from apps.tenants.models import Tenant, TenantUserInvite
@@ -165,6 +164,9 @@ def subscribe_to_plan(request, plan_name):
                 logger.error(f"MercadoPago preference creation failed: {preference_response}")
                 context['error'] = _('Failed to create payment session. Please try again.')
             
+        except PaymentProviderUnavailable as e:
+            logger.warning(f"Checkout unavailable: {e}")
+            context['error'] = _('Payments are temporarily unavailable. Please try again in a few minutes.')
         except Exception as e:
             logger.error(f"Error creating checkout: {str(e)}")
             context['error'] = _('Failed to create checkout session. Please contact support.')
@@ -228,12 +230,6 @@ def payment_pending(request):
     """Payment pending page"""
     return render(request, 'billing/payment_pending.html')
 
-def mercadopago_webhook(request):
-    """MercadoPago webhook handler - delegate to webhooks module"""
-    from .webhooks import MercadoPagoWebhookView
-    webhook_view = MercadoPagoWebhookView()
-    return webhook_view.post(request)
-
 @login_required
 def invoices(request):
     """List invoices"""
@@ -491,31 +487,3 @@ def create_subscription_api(request):
             {'error': result['error']},
             status=status.HTTP_400_BAD_REQUEST
         )
-
-# ==================================================
-# Webhook Handlers
-# ==================================================
-
-@csrf_exempt
-@require_http_methods(["POST"])
-def mercadopago_webhook(request):
-    """Handle MercadoPago webhook notifications"""
-    
-    try:
-        webhook_data = json.loads(request.body)
-        logger.info(f"MercadoPago webhook received: {webhook_data}")
-        
-        result = get_mp_service().process_webhook(webhook_data)
-        
-        if result['success']:
-            return HttpResponse(status=200)
-        else:
-            logger.error(f"Webhook processing failed: {result['error']}")
-            return HttpResponse(status=400)
-            
-    except json.JSONDecodeError:
-        logger.error("Invalid JSON in webhook")
-        return HttpResponse(status=400)
-    except Exception as e:
-        logger.error(f"Webhook error: {str(e)}")
-        return HttpResponse(status=500)
@@ -5,6 +5,8 @@ from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.utils import timezone
 
+from apps.authentication import metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,6 +16,8 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
 
     Features:
     - Joins user-specific groups for targeted event delivery
+    - Joins one group per conversation the user takes part in, so chat
+      events reach only that conversation's participants
     - Handles incoming ping/pong for connection health checks
     - Broadcasts message_created events when new messages arrive
     - Broadcasts typing events when users are typing
@@ -48,7 +52,7 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         Handle WebSocket connection.
         
         - Authenticates user
-        - Joins user-specific group for targeted broadcasts
+        - Joins the user's conversation groups and user-specific group
         - Accepts connection if authenticated
         """
         user = self.scope.get("user")
@@ -56,24 +60,25 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         # Reject unauthenticated connections
         if not user or not user.is_authenticated:
             logger.warning("Rejected unauthenticated chat connection")
+            metrics.inc("secureapprove_chat_connections_total", outcome="unauthenticated")
             await self.close(code=4401)
             return
 
         tenant_id = getattr(user, "tenant_id", None)
         if not tenant_id:
             logger.warning("Rejected chat connection for user %s without tenant", user.id)
+            metrics.inc("secureapprove_chat_connections_total", outcome="no_tenant")
             await self.close(code=4403)
             return
 
         # Store user info
         self.user = user
-        self.tenant_group_name = f"tenant_{tenant_id}_chat"
-        
-        # Join tenant group (all chat events are broadcast per tenant)
-        await self.channel_layer.group_add(
-            self.tenant_group_name,
-            self.channel_name
-        )
+
+        # Join one group per conversation; membership changes arrive later
+        # as chat.conversation_joined / chat.conversation_left events.
+        self.conversation_groups = set()
+        for conversation_id in await self.get_conversation_ids():
+            await self.join_conversation(conversation_id)
 
         # Join user-specific group for targeted notifications
         self.user_group_name = f"user_{user.id}"
@@ -87,6 +92,7 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         
         # Accept connection
         await self.accept()
+        metrics.inc("secureapprove_chat_connections_total", outcome="accepted")
 
         logger.info(
             "[CHAT] WebSocket connected for user %s (tenant %s)",
@@ -105,17 +111,16 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         """
         Handle WebSocket disconnection.
         
-        - Removes user from their group
+        - Removes user from their conversation and user groups
         - Optionally updates presence to offline (with delay)
         """
-        if not hasattr(self, 'user') or not hasattr(self, 'tenant_group_name'):
+        if not hasattr(self, 'user') or not hasattr(self, 'conversation_groups'):
             return
         
-        # Leave tenant group
-        await self.channel_layer.group_discard(
-            self.tenant_group_name,
-            self.channel_name
-        )
+        # Leave conversation groups
+        for group_name in list(self.conversation_groups):
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+        self.conversation_groups.clear()
 
         # Leave user group
         if hasattr(self, 'user_group_name'):
@@ -139,7 +144,11 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         - typing: User is typing (future: could broadcast to conversation)
         """
         msg_type = content.get("type")
-        
+        metrics.inc(
+            "secureapprove_chat_client_events_total",
+            type=msg_type if msg_type in {"ping", "typing"} else "other",
+        )
+
         if hasattr(self, "user") and self.user.is_authenticated:
             logger.debug(
                 "[CHAT] WebSocket receive_json user=%s payload=%s",
@@ -160,7 +169,7 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
 
     async def chat_message_created(self, event: Dict[str, Any]) -> None:
         """
-        Handler for "chat_message_created" events sent to the tenant group.
+        Handler for "chat_message_created" events sent to the conversation group.
 
         Ensures we only forward the payload once per user and skips echoing
         the sender's own messages to avoid duplicates in the UI.
@@ -238,6 +247,42 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
             "messages": event.get("messages", []),
         })
 
+    async def chat_conversation_joined(self, event: Dict[str, Any]) -> None:
+        """
+        Handler for "chat.conversation_joined" events sent to the user group
+        when the user is added to a conversation.
+        """
+        await self.join_conversation(event["conversation_id"])
+
+    async def chat_conversation_left(self, event: Dict[str, Any]) -> None:
+        """
+        Handler for "chat.conversation_left" events sent to the user group
+        when the user leaves or is removed from a conversation.
+        """
+        from .models import ChatConversation
+
+        group_name = ChatConversation.group_name_for(event["conversation_id"])
+        if group_name in self.conversation_groups:
+            self.conversation_groups.discard(group_name)
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+
+    async def join_conversation(self, conversation_id) -> None:
+        from .models import ChatConversation
+
+        group_name = ChatConversation.group_name_for(conversation_id)
+        if group_name not in self.conversation_groups:
+            self.conversation_groups.add(group_name)
+            await self.channel_layer.group_add(group_name, self.channel_name)
+
+    @database_sync_to_async
+    def get_conversation_ids(self):
+        """IDs of the conversations the connected user takes part in."""
+        from .models import ChatParticipant
+
+        return list(
+            ChatParticipant.objects.filter(user=self.user).values_list('conversation_id', flat=True)
+        )
+
     async def notification_approval_request(self, event: Dict[str, Any]) -> None:
         """
         Handler for "notification.approval_request" events.
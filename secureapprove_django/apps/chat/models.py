@@ -63,6 +63,15 @@ class ChatConversation(models.Model):
             return f"{self.title} ({self.tenant_id})"
         return f"Conversation {self.id} (tenant={self.tenant_id})"
 
+    @staticmethod
+    def group_name_for(conversation_id) -> str:
+        """Channel-layer group joined by the participants' chat sockets."""
+        return f"chat_conversation_{conversation_id}"
+
+    @property
+    def group_name(self) -> str:
+        return self.group_name_for(self.id)
+
 
 class ChatParticipant(models.Model):
     """
@@ -0,0 +1,66 @@
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+
+from apps.chat.consumers import ChatConsumer
+from apps.chat.models import ChatConversation, ChatParticipant
+from apps.chat.views import broadcast_to_conversation, sync_conversation_groups
+from apps.tenants.models import Tenant
+
+
+User = get_user_model()
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class ConversationGroupTests(TransactionTestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(key="acme", name="Acme", status="active")
+        self.alice, self.bob, self.carol = (
+            User.objects.create_user(
+                username=name, email=f"{name}@acme.test", password="test-password", tenant=self.tenant
+            )
+            for name in ("alice", "bob", "carol")
+        )
+        self.conversation = ChatConversation.objects.create(tenant=self.tenant)
+        for user in (self.alice, self.bob):
+            ChatParticipant.objects.create(conversation=self.conversation, user=user)
+
+    async def _connect(self, user):
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual((await communicator.receive_json_from())["type"], "connected")
+        return communicator
+
+    async def _broadcast(self, text):
+        await sync_to_async(broadcast_to_conversation)(
+            self.conversation,
+            "chat_message_created",
+            {"conversation_id": str(self.conversation.id), "message": {"content": text}},
+        )
+
+    async def test_messages_reach_only_the_conversation_participants(self):
+        alice, bob, carol = [await self._connect(user) for user in (self.alice, self.bob, self.carol)]
+
+        await self._broadcast("hello")
+
+        for communicator in (alice, bob):
+            event = await communicator.receive_json_from()
+            self.assertEqual((event["type"], event["message"]["content"]), ("message_created", "hello"))
+        self.assertTrue(await carol.receive_nothing())
+        for communicator in (alice, bob, carol):
+            await communicator.disconnect()
+
+    async def test_open_sockets_follow_membership_changes(self):
+        carol = await self._connect(self.carol)
+
+        await sync_to_async(sync_conversation_groups)(self.conversation.id, joined=[self.carol.id])
+        await self._broadcast("welcome")
+        self.assertEqual((await carol.receive_json_from())["message"]["content"], "welcome")
+
+        await sync_to_async(sync_conversation_groups)(self.conversation.id, left=[self.carol.id])
+        await self._broadcast("bye")
+        self.assertTrue(await carol.receive_nothing())
+        await carol.disconnect()
@@ -71,15 +71,8 @@ class ChatPageView(TemplateView):
         return super().dispatch(request, *args, **kwargs)
 
 
-def broadcast_to_conversation(conversation, event_type, payload):
-    """
-    Helper to broadcast WebSocket events to all participants in a conversation.
-
-    Sends a single event to the tenant-wide chat channel so every user that
-    belongs to the tenant receives the update in real time (frontend filters
-    automatically based on the conversation data it already has).
-    """
-    if not async_to_sync or not get_channel_layer or not conversation:
+def _group_send(group_name, event):
+    if not async_to_sync or not get_channel_layer:
         return
 
     try:
@@ -87,16 +80,46 @@ def broadcast_to_conversation(conversation, event_type, payload):
         if not channel_layer:
             return
 
-        async_to_sync(channel_layer.group_send)(
-            f"tenant_{conversation.tenant_id}_chat",
-            {
-                "type": event_type,
-                **payload,
-            },
-        )
+        async_to_sync(channel_layer.group_send)(group_name, event)
     except Exception as e:
         # Log but don't fail the request
-        logger.warning("WebSocket broadcast error for conversation %s: %s", conversation.id, e)
+        logger.warning("WebSocket broadcast error for group %s: %s", group_name, e)
+
+
+def broadcast_to_conversation(conversation, event_type, payload):
+    """
+    Helper to broadcast WebSocket events to all participants in a conversation.
+
+    Sends a single event to the conversation's group, which only the
+    participants' sockets join, so fan-out grows with the conversation
+    rather than the tenant.
+    """
+    if not conversation:
+        return
+
+    _group_send(
+        conversation.group_name,
+        {
+            "type": event_type,
+            **payload,
+        },
+    )
+
+
+def sync_conversation_groups(conversation_id, joined=(), left=()):
+    """
+    Tell the open sockets of users who joined or left a conversation to
+    join or leave its group.
+    """
+    for event_type, user_ids in (
+        ("chat.conversation_joined", joined),
+        ("chat.conversation_left", left),
+    ):
+        for user_id in user_ids:
+            _group_send(
+                f"user_{user_id}",
+                {"type": event_type, "conversation_id": str(conversation_id)},
+            )
 
 
 def _aggregate_message_status(message):
@@ -273,6 +296,7 @@ class ChatConversationViewSet(viewsets.ModelViewSet):
             ChatParticipant.objects.create(conversation=conv, user=user)
             ChatParticipant.objects.create(conversation=conv, user=other)
 
+        sync_conversation_groups(conv.id, joined=[user.id, other.id])
         serializer = self.get_serializer(conv)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -340,6 +364,7 @@ class ChatConversationViewSet(viewsets.ModelViewSet):
             for participant in participants:
                 ChatParticipant.objects.create(conversation=conv, user=participant)
 
+        sync_conversation_groups(conv.id, joined=[user.id] + [participant.id for participant in participants])
         serializer = self.get_serializer(conv)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -388,6 +413,7 @@ class ChatConversationViewSet(viewsets.ModelViewSet):
                 except User.DoesNotExist:
                     pass  # Skip invalid users
         
+        sync_conversation_groups(conv.id, joined=added)
         serializer = self.get_serializer(conv)
         return Response({
             'conversation': serializer.data,
@@ -433,6 +459,7 @@ class ChatConversationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
         
+        conversation_id = conv.id
         with transaction.atomic():
             deleted_count, _ = conv.participant_set.filter(user_id=participant_id).delete()
             
@@ -443,9 +470,13 @@ class ChatConversationViewSet(viewsets.ModelViewSet):
                 )
             
             # If no participants left, delete the conversation
-            if conv.participant_set.count() == 0:
+            conversation_deleted = conv.participant_set.count() == 0
+            if conversation_deleted:
                 conv.delete()
-                return Response({'status': 'conversation_deleted'})
+        
+        sync_conversation_groups(conversation_id, left=[participant_id])
+        if conversation_deleted:
+            return Response({'status': 'conversation_deleted'})
         
         serializer = self.get_serializer(conv)
         return Response({
@@ -7,6 +7,7 @@ from django.utils.translation import gettext_lazy as _
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Fieldset, Row, Column, Submit, HTML
 from crispy_forms.bootstrap import Field
+from apps.billing.quotas import reserve_request
 from .models import ApprovalRequest
 
 class MultipleFileInput(forms.ClearableFileInput):
@@ -344,6 +345,10 @@ class DynamicRequestForm(forms.ModelForm):
         request.metadata = metadata
         
         if commit:
-            request.save()
+            # Raises QuotaExceeded when the tenant's monthly request quota
+            # is used up; callers saving with commit=False must reserve a
+            # slot themselves.
+            with reserve_request(request.tenant if request.tenant_id else None):
+                request.save()
         
         return request
\ No newline at end of file
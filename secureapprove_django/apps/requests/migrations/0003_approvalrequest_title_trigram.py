@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('requests', '0002_requestattachment'),
+        # pg_trgm is created there.
+        ('authentication', '0015_audit_search_indexes'),
+    ]
+
+    operations = [
+        # Matches the UPPER(title) LIKE expression Django emits for icontains.
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS "approval_request_title_trgm_idx" '
+            'ON "requests_approvalrequest" USING gin (UPPER("title") gin_trgm_ops)',
+            'DROP INDEX CONCURRENTLY IF EXISTS "approval_request_title_trgm_idx"',
+        ),
+    ]
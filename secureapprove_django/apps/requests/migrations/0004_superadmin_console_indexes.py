@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:19
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('requests', '0003_approvalrequest_title_trigram'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='approvalrequest',
+            index=models.Index(fields=['tenant', '-created_at'], name='approval_request_recent_idx'),
+        ),
+    ]
@@ -109,6 +109,7 @@ class ApprovalRequest(models.Model):
             models.Index(fields=['requester', 'created_at']),
             models.Index(fields=['approver', 'approved_at']),
             models.Index(fields=['status', 'priority']),
+            models.Index(fields=['tenant', '-created_at'], name='approval_request_recent_idx'),
         ]
     
     def __str__(self):
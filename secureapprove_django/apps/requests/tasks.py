@@ -4,6 +4,8 @@ from webpush import send_user_notification
 from django.contrib.auth import get_user_model
 from django.conf import settings
 
+from apps.authentication import metrics
+
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
@@ -16,12 +18,16 @@ def send_webpush_notification(self, user_id, payload, ttl=None):
 
     try:
         user = User.objects.get(id=user_id)
-        send_user_notification(user=user, payload=payload, ttl=ttl_value)
+        with metrics.timer('secureapprove_webpush_send_seconds'):
+            send_user_notification(user=user, payload=payload, ttl=ttl_value)
+        metrics.inc('secureapprove_webpush_notifications_total', outcome='sent')
         logger.info(f"WebPush sent to user {user_id} (ttl={ttl_value})")
         return f"Notification sent to user {user_id}"
     except User.DoesNotExist:
+        metrics.inc('secureapprove_webpush_notifications_total', outcome='unknown_user')
         logger.error(f"WebPush failed: User {user_id} not found")
         return f"User {user_id} not found"
     except Exception as e:
+        metrics.inc('secureapprove_webpush_notifications_total', outcome='failed')
         logger.error(f"WebPush failed for user {user_id}: {str(e)}")
         return f"Error sending notification to user {user_id}: {str(e)}"
@@ -12,8 +12,10 @@ from django.db.models import Q
 from django.utils.translation import gettext as _, gettext_lazy
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from apps.billing.quotas import QuotaExceeded, reserve_request
 from .models import ApprovalRequest, RequestAttachment
 from .forms import DynamicRequestForm
 from .serializers import ApprovalRequestSerializer
@@ -129,7 +131,11 @@ def create_request(request):
         
         form = DynamicRequestForm(request.POST, request.FILES, user=request.user)
         if form.is_valid():
-            approval_request = form.save()
+            try:
+                approval_request = form.save()
+            except QuotaExceeded as exc:
+                messages.error(request, exc.message)
+                return render(request, 'requests/create.html', {'form': form, 'page_title': _('New Request')})
             
             # Handle attachments - get from cleaned_data or FILES
             files = form.cleaned_data.get('attachments', [])
@@ -353,10 +359,15 @@ class ApprovalRequestViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Set requester and tenant when creating"""
-        serializer.save(
-            requester=self.request.user,
-            tenant=self.request.user.tenant
-        )
+        tenant = self.request.user.tenant
+        try:
+            with reserve_request(tenant):
+                serializer.save(
+                    requester=self.request.user,
+                    tenant=tenant
+                )
+        except QuotaExceeded as exc:
+            raise PermissionDenied(exc.message)
     
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
@@ -0,0 +1,259 @@
+"""Streaming CSV export of tenant audit logs.
+
+On PostgreSQL the projection, timestamp formatting, choice labels and
+formula-injection escaping are compiled into one
+``COPY (SELECT ...) TO STDOUT WITH (FORMAT csv)`` that a helper thread
+streams into the response, so no model instances are built. Other
+database backends fall back to iterating the queryset in Python, rendering
+rows byte-for-byte like COPY does: ``\n`` line endings, microsecond
+timestamps and ``jsonb`` key order for the context column.
+"""
+
+import csv
+import json
+import logging
+import queue
+import threading
+import zlib
+
+from django.db import connection, transaction
+from django.db.models import Case, F, Func, TextField, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+logger = logging.getLogger(__name__)
+
+FORMULA_PREFIXES = ("=", "+", "-", "@")
+COPY_CHUNK_BYTES = 64 * 1024
+COPY_QUEUE_CHUNKS = 16
+# COPY ... WITH (FORMAT csv) always ends rows with a bare newline.
+CSV_LINE_TERMINATOR = "\n"
+
+
+def safe_csv_value(value):
+    """Prevent spreadsheet formula execution when an exported cell is opened."""
+
+    if value is None:
+        return ""
+    rendered = str(value)
+    if rendered.startswith(FORMULA_PREFIXES):
+        return f"'{rendered}"
+    return rendered
+
+
+class _CsvBuffer:
+    """Minimal file-like object used by csv.writer for streaming rows."""
+
+    def write(self, value):
+        return value
+
+
+class CsvSafe(Func):
+    """SQL counterpart of ``safe_csv_value``: NULL becomes '' and formulas get a quote prefix."""
+
+    template = "regexp_replace(COALESCE((%(expressions)s)::text, ''), '^([=+@-])', '''\\1')"
+    output_field = TextField()
+
+
+def _jsonb_ordered(value):
+    # jsonb stores object keys shortest first, then by their UTF-8 bytes.
+    if isinstance(value, dict):
+        return {
+            key: _jsonb_ordered(value[key])
+            for key in sorted(value, key=lambda key: (len(key.encode("utf-8")), key.encode("utf-8")))
+        }
+    if isinstance(value, list):
+        return [_jsonb_ordered(item) for item in value]
+    return value
+
+
+def jsonb_text(value):
+    """Render ``value`` the way PostgreSQL casts a ``jsonb`` column to text."""
+
+    return json.dumps(_jsonb_ordered(value), ensure_ascii=False)
+
+
+def _csv_writer():
+    return csv.writer(_CsvBuffer(), lineterminator=CSV_LINE_TERMINATOR)
+
+
+def _headers(audit_type):
+    if audit_type == "terms":
+        return [
+            _("Timestamp"), _("Status"), _("User"), _("Initiated by"),
+            _("Document type"), _("Document version"), _("Document hash"),
+            _("Credential"), _("Challenge"), _("IP address"), _("User agent"),
+            _("Error"), _("Context"), _("Audit ID"), _("Proof ID"),
+            _("Proof archive status"), _("Transaction SHA-256"),
+        ]
+    return [
+        _("Timestamp"), _("Status"), _("User"), _("Request ID"),
+        _("Request"), _("Action"), _("Credential"), _("Challenge"),
+        _("IP address"), _("User agent"), _("Error"), _("Context"), _("Audit ID"),
+        _("Proof ID"), _("Proof archive status"), _("Transaction SHA-256"),
+    ]
+
+
+def _python_rows(audits, audit_type):
+    for audit in audits.iterator(chunk_size=1000):
+        proof = getattr(audit, "security_proof", None)
+        proof_columns = [
+            proof.id if proof else "", proof.archive_status if proof else "",
+            proof.transaction_sha256 if proof else "",
+        ]
+        context = jsonb_text(audit.context_data)
+        performed_at = timezone.localtime(audit.performed_at).isoformat(timespec="microseconds")
+        if audit_type == "terms":
+            yield [
+                performed_at, audit.get_status_display(),
+                audit.user.email, audit.initiated_by.email if audit.initiated_by else "",
+                audit.document_type, audit.document_version, audit.document_hash,
+                audit.credential_id, audit.challenge_id, audit.ip_address, audit.user_agent,
+                audit.error_message, context, audit.id, *proof_columns,
+            ]
+        else:
+            yield [
+                performed_at, audit.get_status_display(),
+                audit.user.email, audit.approval_request_id, audit.approval_request.title,
+                audit.get_action_display(), audit.credential_id, audit.challenge_id,
+                audit.ip_address, audit.user_agent, audit.error_message,
+                context, audit.id, *proof_columns,
+            ]
+
+
+def _python_chunks(audits, audit_type):
+    writer = _csv_writer()
+    yield "\ufeff".encode("utf-8")
+    yield writer.writerow([safe_csv_value(value) for value in _headers(audit_type)]).encode("utf-8")
+    for row in _python_rows(audits, audit_type):
+        yield writer.writerow([safe_csv_value(value) for value in row]).encode("utf-8")
+
+
+def _choice_label(field_name, choices):
+    return Case(
+        *[When(**{field_name: value}, then=Value(str(label))) for value, label in choices],
+        default=F(field_name),
+    )
+
+
+def _copy_columns(audits, audit_type):
+    model = audits.model
+    timestamp = Func(
+        F("performed_at"), Value('YYYY-MM-DD"T"HH24:MI:SS.USTZH:TZM'),
+        function="to_char", output_field=TextField(),
+    )
+    status = _choice_label("status", model._meta.get_field("status").choices)
+    ip_address = Func(F("ip_address"), function="host", output_field=TextField())
+    context = Cast("context_data", TextField())
+    proof_columns = [
+        F("security_proof__id"), F("security_proof__archive_status"), F("security_proof__transaction_sha256"),
+    ]
+    if audit_type == "terms":
+        return [
+            timestamp, status, F("user__email"), F("initiated_by__email"),
+            F("document_type"), F("document_version"), F("document_hash"),
+            F("credential_id"), F("challenge_id"), ip_address, F("user_agent"),
+            F("error_message"), context, F("id"), *proof_columns,
+        ]
+    return [
+        timestamp, status, F("user__email"), F("approval_request_id"), F("approval_request__title"),
+        _choice_label("action", model._meta.get_field("action").choices),
+        F("credential_id"), F("challenge_id"), ip_address, F("user_agent"), F("error_message"),
+        context, F("id"), *proof_columns,
+    ]
+
+
+def copy_select_sql(audits, audit_type):
+    """Return ``(sql, params)`` for the SELECT that COPY streams as CSV."""
+
+    columns = {
+        f"csv_{index}": CsvSafe(expression)
+        for index, expression in enumerate(_copy_columns(audits, audit_type))
+    }
+    return audits.annotate(**columns).values_list(*columns).query.sql_with_params()
+
+
+class _ChunkSink:
+    """File-like target for ``copy_expert`` feeding a bounded queue."""
+
+    def __init__(self):
+        self.chunks = queue.Queue(maxsize=COPY_QUEUE_CHUNKS)
+        self.cancelled = threading.Event()
+        self.error = None
+
+    def _put(self, item):
+        while not self.cancelled.is_set():
+            try:
+                self.chunks.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def write(self, data):
+        # Raising here aborts the COPY once the client has gone away.
+        if not self._put(bytes(data)):
+            raise BrokenPipeError("Audit export consumer stopped.")
+        return len(data)
+
+
+def _copy_worker(sql, params, timezone_name, sink):
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL TIME ZONE %s", [timezone_name])
+                copy_sql = cursor.mogrify(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv)", params)
+                cursor.copy_expert(copy_sql, sink, size=COPY_CHUNK_BYTES)
+    except Exception as exc:
+        if not sink.cancelled.is_set():
+            logger.exception("Audit COPY export failed.")
+        sink.error = exc
+    finally:
+        connection.close()
+        sink._put(None)
+
+
+def _copy_chunks(audits, audit_type):
+    sql, params = copy_select_sql(audits, audit_type)
+    header = _csv_writer().writerow(
+        [safe_csv_value(value) for value in _headers(audit_type)]
+    )
+    sink = _ChunkSink()
+    worker = threading.Thread(
+        target=_copy_worker,
+        args=(sql, params, timezone.get_current_timezone_name(), sink),
+        name="audit-export-copy",
+        daemon=True,
+    )
+    worker.start()
+    try:
+        yield ("\ufeff" + header).encode("utf-8")
+        while True:
+            chunk = sink.chunks.get()
+            if chunk is None:
+                break
+            yield chunk
+        if sink.error is not None:
+            raise sink.error
+    finally:
+        sink.cancelled.set()
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def audit_csv_chunks(audits, audit_type, *, compress=False):
+    """Yield the CSV export of ``audits`` as UTF-8 bytes, gzip-compressed if requested."""
+
+    if connection.vendor == "postgresql":
+        chunks = _copy_chunks(audits, audit_type)
+    else:
+        chunks = _python_chunks(audits, audit_type)
+    return _gzip_chunks(chunks) if compress else chunks
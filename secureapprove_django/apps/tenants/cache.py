@@ -0,0 +1,141 @@
+"""Tenant-scoped cache entries.
+
+Every key embeds the tenant's generation number, so ``invalidate_tenant``
+retires all of a tenant's entries with a single INCR and leaves them to
+expire on their own. ``get_or_set`` is a read-through helper protected
+against stampedes: one caller recomputes a missing entry under a
+single-flight lock while the others wait for its result, and entries are
+refreshed shortly before they expire with a probability that grows as
+expiry nears (XFetch), so busy keys are rarely recomputed by many callers
+at once.
+"""
+
+import logging
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+from apps.authentication import metrics
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "tenant_cache:{tenant_id}:generation"
+REQUESTS_METRIC = "secureapprove_tenant_cache_requests_total"
+LOCK_TIMEOUT_SECONDS = 10
+LOCK_POLL_SECONDS = 0.05
+
+
+def generation(tenant_id):
+    """Current cache generation of a tenant."""
+
+    key = GENERATION_KEY.format(tenant_id=tenant_id)
+    value = cache.get(key)
+    if value is None:
+        # Seeded from the clock so an evicted generation never comes back
+        # with a value that older entries were stored under.
+        cache.add(key, time.time_ns(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def invalidate_tenant(tenant_id):
+    """Retire every cached entry of a tenant."""
+
+    key = GENERATION_KEY.format(tenant_id=tenant_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate_tenants(tenant_ids):
+    for tenant_id in tenant_ids:
+        invalidate_tenant(tenant_id)
+
+
+def make_key(tenant_id, namespace, key):
+    return f"tenant_cache:{tenant_id}:{generation(tenant_id)}:{namespace}:{key}"
+
+
+def get(tenant_id, namespace, key, default=None):
+    entry = cache.get(make_key(tenant_id, namespace, key))
+    metrics.inc(REQUESTS_METRIC, namespace=namespace, result="miss" if entry is None else "hit")
+    return default if entry is None else entry["value"]
+
+
+def set(tenant_id, namespace, key, value, timeout):
+    _store(make_key(tenant_id, namespace, key), value, timeout, 0.0)
+
+
+def delete(tenant_id, namespace, key):
+    cache.delete(make_key(tenant_id, namespace, key))
+
+
+def _store(full_key, value, timeout, compute_seconds):
+    # The envelope keeps cached None values distinguishable from misses and
+    # carries what the early-refresh check needs.
+    cache.set(
+        full_key,
+        {"value": value, "expires_at": time.time() + timeout, "compute_seconds": compute_seconds},
+        timeout,
+    )
+
+
+def _refresh_early(entry, beta):
+    # XFetch: -log(U) is exponentially distributed, so the chance of an early
+    # refresh rises sharply in the last few compute-times before expiry.
+    jitter = -math.log(1.0 - random.random())
+    return time.time() + entry["compute_seconds"] * beta * jitter >= entry["expires_at"]
+
+
+def _compute(full_key, compute, timeout):
+    started = time.perf_counter()
+    value = compute()
+    _store(full_key, value, timeout, time.perf_counter() - started)
+    return value
+
+
+def get_or_set(tenant_id, namespace, key, compute, timeout, *, beta=1.0, lock_timeout=LOCK_TIMEOUT_SECONDS):
+    """
+    Return the cached value for ``key``, calling ``compute()`` to fill it.
+
+    ``beta`` scales how early entries are refreshed (0 disables early
+    refresh). Callers that lose the single-flight race serve the current
+    value if there is one, otherwise wait up to ``lock_timeout`` seconds for
+    the winner before computing the value themselves.
+    """
+
+    full_key = make_key(tenant_id, namespace, key)
+    entry = cache.get(full_key)
+    if entry is not None and not (beta and _refresh_early(entry, beta)):
+        metrics.inc(REQUESTS_METRIC, namespace=namespace, result="hit")
+        return entry["value"]
+
+    lock_key = f"{full_key}:lock"
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            value = _compute(full_key, compute, timeout)
+        finally:
+            cache.delete(lock_key)
+        metrics.inc(REQUESTS_METRIC, namespace=namespace, result="miss" if entry is None else "refresh")
+        return value
+
+    if entry is not None:
+        # Someone else is already refreshing this entry.
+        metrics.inc(REQUESTS_METRIC, namespace=namespace, result="hit")
+        return entry["value"]
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_SECONDS)
+        entry = cache.get(full_key)
+        if entry is not None:
+            metrics.inc(REQUESTS_METRIC, namespace=namespace, result="wait")
+            return entry["value"]
+        if cache.get(lock_key) is None:
+            break
+    logger.debug("Tenant cache lock for %s expired without a value; computing locally.", full_key)
+    metrics.inc(REQUESTS_METRIC, namespace=namespace, result="miss")
+    return _compute(full_key, compute, timeout)
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+APPROVER_ROLES = ('approver', 'tenant_admin', 'superadmin')
+
+
+def backfill_seat_counters(apps, schema_editor):
+    Tenant = apps.get_model('tenants', 'Tenant')
+    TenantSeatCounter = apps.get_model('tenants', 'TenantSeatCounter')
+    User = apps.get_model('authentication', 'User')
+
+    counts = {
+        row['tenant_id']: row
+        for row in User.objects.filter(tenant__isnull=False, is_active=True)
+        .values('tenant_id')
+        .annotate(
+            active_users=models.Count('pk'),
+            approvers=models.Count('pk', filter=models.Q(role__in=APPROVER_ROLES)),
+        )
+    }
+    TenantSeatCounter.objects.bulk_create(
+        [
+            TenantSeatCounter(
+                tenant_id=tenant_id,
+                active_users=counts.get(tenant_id, {}).get('active_users', 0),
+                approvers=counts.get(tenant_id, {}).get('approvers', 0),
+            )
+            for tenant_id in Tenant.objects.values_list('pk', flat=True)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0006_tenant_proof_retention_years'),
+        ('authentication', '0015_audit_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantSeatCounter',
+            fields=[
+                ('tenant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seat_counter', serialize=False, to='tenants.tenant', verbose_name='Tenant')),
+                ('active_users', models.IntegerField(default=0, verbose_name='Active users')),
+                ('approvers', models.IntegerField(default=0, verbose_name='Approvers')),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True, verbose_name='Reconciled At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Tenant Seat Counter',
+                'verbose_name_plural': 'Tenant Seat Counters',
+            },
+        ),
+        migrations.RunPython(backfill_seat_counters, migrations.RunPython.noop),
+    ]
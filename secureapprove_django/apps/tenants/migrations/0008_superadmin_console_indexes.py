@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:19
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+def trigram_index(name, table, column):
+    # Same UPPER(column) expression Django emits for icontains on PostgreSQL.
+    return migrations.RunSQL(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" USING gin (UPPER("{column}") gin_trgm_ops)',
+        f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"',
+    )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('tenants', '0007_tenant_seat_counter'),
+        # pg_trgm is created there.
+        ('authentication', '0015_audit_search_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='tenant',
+            index=models.Index(fields=['created_at', 'id'], name='tenant_created_keyset_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tenant',
+            index=models.Index(fields=['name', 'id'], name='tenant_name_keyset_idx'),
+        ),
+        trigram_index('tenant_name_trgm_idx', 'tenants_tenant', 'name'),
+        trigram_index('tenant_key_trgm_idx', 'tenants_tenant', 'key'),
+    ]
@@ -5,12 +5,15 @@ import uuid
 # ==================================================
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from apps.billing.pricing import get_price_per_user
 
+# Roles that occupy an approver slot when the user is active.
+APPROVER_ROLES = ('approver', 'tenant_admin', 'superadmin')
+
 
 class Tenant(models.Model):
     """
@@ -82,6 +85,11 @@ class Tenant(models.Model):
         verbose_name = _('Tenant')
         verbose_name_plural = _('Tenants')
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the superadmin console.
+            models.Index(fields=['created_at', 'id'], name='tenant_created_keyset_idx'),
+            models.Index(fields=['name', 'id'], name='tenant_name_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.key})"
@@ -91,18 +99,32 @@ class Tenant(models.Model):
         """Get plan display name"""
         return dict(self.PLAN_CHOICES).get(self.plan_id, self.plan_id)
     
+    def get_seat_counter(self):
+        """Return the stored seat counters, rebuilding them if the row is missing"""
+        try:
+            return self.seat_counter
+        except TenantSeatCounter.DoesNotExist:
+            self.seat_counter = TenantSeatCounter.rebuild(self.pk)
+            return self.seat_counter
+
+    def lock_seat_counter(self):
+        """
+        Lock this tenant's seat counter row for the current transaction so
+        concurrent seat grants are serialized, and return it.
+        """
+        TenantSeatCounter.objects.get_or_create(tenant_id=self.pk)
+        self.seat_counter = TenantSeatCounter.objects.select_for_update().get(tenant_id=self.pk)
+        return self.seat_counter
+
     @property
     def active_users_count(self):
         """Count of active users in this tenant"""
-        return self.users.filter(is_active=True).count()
+        return self.get_seat_counter().active_users
     
     @property
     def approvers_count(self):
         """Count of users who can approve requests"""
-        return self.users.filter(
-            is_active=True,
-            role__in=['approver', 'tenant_admin', 'superadmin']
-        ).count()
+        return self.get_seat_counter().approvers
     
     @property
     def is_over_approver_limit(self):
@@ -142,6 +164,78 @@ class Tenant(models.Model):
         return max(remaining, 0)
 
 
+class TenantSeatCounter(models.Model):
+    """
+    Active user and approver counts for a tenant, kept in step by the User
+    signals in ``apps.tenants.signals``. Writes that bypass signals
+    (``QuerySet.update``, ``bulk_create``) are corrected by the
+    ``reconcile_tenant_seat_counters`` task.
+    """
+
+    tenant = models.OneToOneField(
+        Tenant,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='seat_counter',
+        verbose_name=_('Tenant'),
+    )
+    active_users = models.IntegerField(_('Active users'), default=0)
+    approvers = models.IntegerField(_('Approvers'), default=0)
+    reconciled_at = models.DateTimeField(_('Reconciled At'), null=True, blank=True)
+    updated_at = models.DateTimeField(_('Updated At'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('Tenant Seat Counter')
+        verbose_name_plural = _('Tenant Seat Counters')
+
+    def __str__(self):
+        return f"{self.tenant_id}: {self.active_users} users, {self.approvers} approvers"
+
+    @staticmethod
+    def current_counts(tenant_id):
+        """Count active users and approvers straight from the user table"""
+        from django.contrib.auth import get_user_model
+
+        return get_user_model().objects.filter(tenant_id=tenant_id, is_active=True).aggregate(
+            active_users=models.Count('pk'),
+            approvers=models.Count('pk', filter=models.Q(role__in=APPROVER_ROLES)),
+        )
+
+    @classmethod
+    def rebuild(cls, tenant_id):
+        """
+        Recount the tenant's seats under the counter's row lock, creating the
+        row if needed. The row is never removed, so readers and seat grants
+        always find it.
+        """
+        with transaction.atomic():
+            cls.objects.get_or_create(tenant_id=tenant_id)
+            counter = cls.objects.select_for_update().get(tenant_id=tenant_id)
+            counts = cls.current_counts(tenant_id)
+            counter.active_users = counts['active_users']
+            counter.approvers = counts['approvers']
+            counter.reconciled_at = timezone.now()
+            counter.save(update_fields=['active_users', 'approvers', 'reconciled_at', 'updated_at'])
+        return counter
+
+    @classmethod
+    def apply_delta(cls, tenant_id, active_users=0, approvers=0):
+        if not tenant_id or not (active_users or approvers):
+            return
+        # A missing row is left alone; the next read rebuilds it from scratch.
+        cls.objects.filter(tenant_id=tenant_id).update(
+            active_users=models.F('active_users') + active_users,
+            approvers=models.F('approvers') + approvers,
+            updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def recount(cls, tenant_id):
+        """Recount a tenant whose change could not be applied as a delta"""
+        if tenant_id:
+            cls.rebuild(tenant_id)
+
+
 class TenantUserInvite(models.Model):
     """
     Invitation for a user to join a tenant.
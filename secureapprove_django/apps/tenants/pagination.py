@@ -0,0 +1,94 @@
+"""Keyset pagination shared by the tenant audit log and the superadmin console.
+
+Pages are addressed by an opaque ``after``/``before`` cursor holding the
+sort value and primary key of the boundary row, so fetching page N costs
+the same as fetching page 1.
+"""
+
+import json
+
+from django.db import models
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+class KeysetPage:
+    """One page of rows addressed by ``(sort value, pk)`` cursors instead of offsets."""
+
+    def __init__(self, object_list, *, next_cursor="", previous_cursor=""):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return bool(self.next_cursor)
+
+    @property
+    def has_previous(self):
+        return bool(self.previous_cursor)
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def encode_cursor(scope, value, pk):
+    """Opaque cursor for a row whose sort column holds ``value``."""
+
+    # str() keeps full microsecond precision for datetimes and handles UUIDs.
+    return urlsafe_base64_encode(json.dumps([scope, value, pk], default=str).encode())
+
+
+def decode_cursor(raw, scope, parse):
+    """Return ``parse(value, pk)`` for a cursor issued under ``scope``, else None.
+
+    ``parse`` restores the column types and raises ``TypeError`` or
+    ``ValueError`` for anything it does not accept, so tampered or stale
+    cursors fall back to the first page.
+    """
+
+    if not raw:
+        return None
+    try:
+        cursor_scope, value, pk = json.loads(urlsafe_base64_decode(raw))
+        if cursor_scope != scope:
+            return None
+        return parse(value, pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(queryset, params, *, field, newest_first, page_size, scope, parse):
+    """Fetch the page after/before the cursor in ``params``, ordered by ``(field, pk)``."""
+
+    after = decode_cursor(params.get("after"), scope, parse)
+    before = None if after else decode_cursor(params.get("before"), scope, parse)
+    cursor = after or before
+    # Walking backwards reverses the scan; rows are flipped back below.
+    descending = newest_first != (before is not None)
+    if cursor:
+        value, pk = cursor
+        lookup = "lt" if descending else "gt"
+        queryset = queryset.filter(
+            models.Q(**{f"{field}__{lookup}": value})
+            | models.Q(**{field: value, f"pk__{lookup}": pk})
+        )
+    ordering = (f"-{field}", "-pk") if descending else (field, "pk")
+    rows = list(queryset.order_by(*ordering)[: page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if before:
+        rows.reverse()
+    if not rows:
+        return KeysetPage(rows)
+    has_next = has_more if not before else True
+    has_previous = has_more if before else cursor is not None
+
+    def cursor_for(row):
+        return encode_cursor(scope, getattr(row, field), row.pk)
+
+    return KeysetPage(
+        rows,
+        next_cursor=cursor_for(rows[-1]) if has_next else "",
+        previous_cursor=cursor_for(rows[0]) if has_previous else "",
+    )
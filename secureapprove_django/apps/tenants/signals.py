@@ -3,10 +3,12 @@
 # ==================================================
 
 import logging
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
 
-from .models import Tenant, ApprovalTypeConfig
+from . import cache as tenant_cache
+from .models import APPROVER_ROLES, Tenant, ApprovalTypeConfig, TenantSeatCounter
 
 logger = logging.getLogger(__name__)
 
@@ -37,3 +39,77 @@ def initialize_approval_types_for_new_tenant(sender, instance, created, **kwargs
             logger.error(
                 f"Failed to initialize Proof ledger for tenant {instance.key}: {e}"
             )
+        try:
+            TenantSeatCounter.objects.get_or_create(tenant=instance)
+        except Exception as e:
+            logger.error(
+                f"Failed to initialize seat counters for tenant {instance.key}: {e}"
+            )
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+def invalidate_tenant_cache_on_tenant_change(sender, instance, created=False, **kwargs):
+    if not created:
+        tenant_cache.invalidate_tenant(instance.pk)
+
+
+@receiver(post_save, sender=ApprovalTypeConfig)
+@receiver(post_delete, sender=ApprovalTypeConfig)
+def invalidate_tenant_cache_on_approval_type_change(sender, instance, **kwargs):
+    tenant_cache.invalidate_tenant(instance.tenant_id)
+
+
+_SEAT_FIELDS = ('tenant_id', 'is_active', 'role')
+
+
+def _seat_state(user):
+    """Return ``(tenant_id, counts_as_user, counts_as_approver)`` or None if unknown."""
+    if any(field not in user.__dict__ for field in _SEAT_FIELDS):
+        # Deferred fields would cost a query to load; the counters are
+        # recounted from the database instead when such an instance is saved.
+        return None
+    active = bool(user.tenant_id and user.is_active)
+    return (user.tenant_id, active, active and user.role in APPROVER_ROLES)
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_user_seat_state(sender, instance, **kwargs):
+    instance._seat_state = _seat_state(instance) if instance.pk else (None, False, False)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def update_seat_counters_on_save(sender, instance, created, **kwargs):
+    previous = (None, False, False) if created else getattr(instance, '_seat_state', None)
+    current = _seat_state(instance)
+    instance._seat_state = current
+    if previous == current:
+        return
+    if previous is None or current is None:
+        # The old tenant is unknown when it was deferred; the reconcile task
+        # corrects that side.
+        TenantSeatCounter.recount(getattr(instance, 'tenant_id', None))
+        if previous is not None:
+            TenantSeatCounter.recount(previous[0])
+        return
+    old_tenant, old_active, old_approver = previous
+    new_tenant, new_active, new_approver = current
+    if old_tenant == new_tenant:
+        TenantSeatCounter.apply_delta(
+            new_tenant,
+            active_users=int(new_active) - int(old_active),
+            approvers=int(new_approver) - int(old_approver),
+        )
+        return
+    TenantSeatCounter.apply_delta(old_tenant, active_users=-int(old_active), approvers=-int(old_approver))
+    TenantSeatCounter.apply_delta(new_tenant, active_users=int(new_active), approvers=int(new_approver))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def update_seat_counters_on_delete(sender, instance, **kwargs):
+    state = getattr(instance, '_seat_state', None)
+    if state is None:
+        TenantSeatCounter.recount(getattr(instance, 'tenant_id', None))
+        return
+    tenant_id, active, approver = state
+    TenantSeatCounter.apply_delta(tenant_id, active_users=-int(active), approvers=-int(approver))
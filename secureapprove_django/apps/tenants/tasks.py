@@ -0,0 +1,93 @@
+import logging
+import time
+
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_tenant_seat_counters():
+    """Recount every tenant's seats and correct counters that drifted."""
+    from apps.tenants.models import APPROVER_ROLES, Tenant, TenantSeatCounter
+
+    actual = {
+        row['tenant_id']: (row['active_users'], row['approvers'])
+        for row in get_user_model().objects.filter(tenant__isnull=False, is_active=True)
+        .values('tenant_id')
+        .annotate(active_users=Count('pk'), approvers=Count('pk', filter=Q(role__in=APPROVER_ROLES)))
+    }
+    stored = {
+        tenant_id: (active_users, approvers)
+        for tenant_id, active_users, approvers in TenantSeatCounter.objects.values_list(
+            'tenant_id', 'active_users', 'approvers'
+        )
+    }
+    tenant_ids = list(Tenant.objects.values_list('pk', flat=True))
+    drifted = [
+        tenant_id
+        for tenant_id in tenant_ids
+        if stored.get(tenant_id) != actual.get(tenant_id, (0, 0))
+    ]
+    for tenant_id in drifted:
+        # Recount under the row lock so a concurrent signal delta is not lost.
+        TenantSeatCounter.rebuild(tenant_id)
+    TenantSeatCounter.objects.update(reconciled_at=timezone.now())
+    if drifted:
+        logger.warning(
+            'Corrected tenant seat counters: tenants=%s',
+            ','.join(str(tenant_id) for tenant_id in drifted),
+        )
+    return {'tenants': len(tenant_ids), 'corrected': len(drifted)}
+
+
+@shared_task
+def expire_trials(batch_size=None):
+    """
+    Suspend trial subscriptions past ``trial_end`` and their tenants.
+
+    Each batch is one transaction: the subscriptions are claimed with
+    ``FOR UPDATE SKIP LOCKED`` and both tables are updated with a single
+    UPDATE each, so concurrent workers split the backlog instead of
+    blocking on each other.
+    """
+    from apps.authentication import metrics
+    from apps.billing.models import Subscription
+    from apps.tenants.models import Tenant
+    from apps.tenants.cache import invalidate_tenants
+
+    batch_size = batch_size or getattr(settings, 'SECUREAPPROVE_TRIAL_EXPIRY_BATCH_SIZE', 500)
+    started = time.perf_counter()
+    now = timezone.now()
+    expired_tenant_ids = []
+    while True:
+        with transaction.atomic():
+            claimed = list(
+                Subscription.objects.select_for_update(skip_locked=True)
+                .filter(status='trialing', trial_end__lt=now)
+                .order_by('trial_end')
+                .values_list('pk', 'tenant_id')[:batch_size]
+            )
+            if not claimed:
+                break
+            subscription_ids = [subscription_id for subscription_id, _ in claimed]
+            tenant_ids = [tenant_id for _, tenant_id in claimed]
+            Subscription.objects.filter(pk__in=subscription_ids).update(status='suspended')
+            Tenant.objects.filter(pk__in=tenant_ids).update(
+                is_active=False, status='suspended', updated_at=now
+            )
+        invalidate_tenants(tenant_ids)
+        expired_tenant_ids.extend(tenant_ids)
+        if len(claimed) < batch_size:
+            break
+
+    metrics.inc('secureapprove_trials_expired_total', len(expired_tenant_ids))
+    logger.info(
+        'Expired %s trial(s) in %.3f s', len(expired_tenant_ids), time.perf_counter() - started
+    )
+    return {'expired': len(expired_tenant_ids)}
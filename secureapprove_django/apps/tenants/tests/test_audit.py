@@ -1,13 +1,21 @@
-from datetime import timedelta
+import csv
+import gzip
+import io
+from datetime import datetime, time, timedelta
+from unittest import skipUnless
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase
 from django.urls import reverse
 from django.utils import timezone
 
 from apps.authentication.models import ApprovalAudit, TermsAcceptanceAudit
 from apps.requests.models import ApprovalRequest
+from apps.tenants import audit_export
 from apps.tenants.models import Tenant
+from apps.tenants.views import TenantAuditView
 
 
 User = get_user_model()
@@ -17,6 +25,8 @@ class TenantAuditViewTests(TestCase):
     password = "test-password"
 
     def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
         self.tenant = Tenant.objects.create(key="acme", name="Acme", status="active")
         self.other_tenant = Tenant.objects.create(key="other", name="Other", status="active")
         self.admin = User.objects.create_user(
@@ -100,7 +110,7 @@ class TenantAuditViewTests(TestCase):
         )
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.context["page_obj"].paginator.count, 1)
+        self.assertEqual(len(response.context["page_obj"].object_list), 1)
         self.assertEqual(response.context["metrics"]["total"], 1)
         self.assertEqual(response.context["metrics"]["successful"], 0)
         self.assertEqual(response.context["metrics"]["attention"], 1)
@@ -148,10 +158,125 @@ class TenantAuditViewTests(TestCase):
             },
         )
 
-        self.assertEqual(response.context["page_obj"].paginator.count, 1)
+        self.assertEqual(len(response.context["page_obj"].object_list), 1)
+        self.assertEqual(response.context["metrics"]["total"], 1)
         self.assertContains(response, "2026-08")
         self.assertNotContains(response, "2025-01")
 
+    def test_search_fast_paths_match_ids_digests_and_ips_exactly(self):
+        digest = "ab" * 32
+        terms_audit = TermsAcceptanceAudit.objects.create(
+            tenant=self.tenant,
+            user=self.actor,
+            document_hash=digest,
+            status="success",
+            ip_address="203.0.113.20",
+        )
+        TermsAcceptanceAudit.objects.create(
+            tenant=self.tenant,
+            user=self.actor,
+            document_hash=digest[:-2] + "cd",
+            status="success",
+        )
+
+        def search(audit_type, query):
+            response = self.client.get(self.url, {"type": audit_type, "q": query})
+            return [audit.pk for audit in response.context["page_obj"].object_list]
+
+        self.assertEqual(search("approvals", str(self.failed_audit.pk)), [self.failed_audit.pk])
+        self.assertEqual(search("approvals", "192.0.2.10"), [self.success_audit.pk])
+        self.assertEqual(search("approvals", "198.51.100.3"), [])
+        self.assertEqual(search("terms", digest.upper()), [terms_audit.pk])
+        self.assertEqual(search("terms", "203.0.113.20"), [terms_audit.pk])
+        self.assertCountEqual(search("approvals", "supplier"), [self.success_audit.pk, self.failed_audit.pk])
+        self.assertCountEqual(search("approvals", "ACTOR@acme"), [self.success_audit.pk, self.failed_audit.pk])
+
+    def test_date_range_is_inclusive_of_the_whole_end_day(self):
+        day = timezone.localdate() - timedelta(days=3)
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        ApprovalAudit.objects.filter(pk=self.success_audit.pk).update(performed_at=start)
+        ApprovalAudit.objects.filter(pk=self.failed_audit.pk).update(
+            performed_at=start + timedelta(days=1) - timedelta(microseconds=1)
+        )
+
+        response = self.client.get(
+            self.url,
+            {"type": "approvals", "date_from": day.isoformat(), "date_to": day.isoformat()},
+        )
+        next_day = self.client.get(
+            self.url,
+            {"type": "approvals", "date_from": (day + timedelta(days=1)).isoformat()},
+        )
+
+        self.assertEqual(response.context["metrics"]["total"], 2)
+        self.assertEqual(next_day.context["metrics"]["total"], 0)
+
+    def _create_terms_audits(self, count, performed_at):
+        audits = [
+            TermsAcceptanceAudit.objects.create(
+                tenant=self.tenant,
+                user=self.actor,
+                document_version=f"v{index}",
+                status="success",
+            )
+            for index in range(count)
+        ]
+        # Identical timestamps force the id tie-breaker to keep pages disjoint.
+        TermsAcceptanceAudit.objects.filter(tenant=self.tenant).update(performed_at=performed_at)
+        return audits
+
+    def test_keyset_pages_walk_forward_and_back_without_gaps(self):
+        audits = self._create_terms_audits(60, timezone.now())
+        expected = sorted(audit.pk for audit in audits)[::-1]
+
+        first = self.client.get(self.url, {"type": "terms", "page_size": "25"}).context["page_obj"]
+        second = self.client.get(
+            self.url, {"type": "terms", "page_size": "25", "after": first.next_cursor}
+        ).context["page_obj"]
+        third = self.client.get(
+            self.url, {"type": "terms", "page_size": "25", "after": second.next_cursor}
+        ).context["page_obj"]
+        back = self.client.get(
+            self.url, {"type": "terms", "page_size": "25", "before": third.previous_cursor}
+        ).context["page_obj"]
+
+        walked = [audit.pk for page in (first, second, third) for audit in page.object_list]
+        self.assertEqual(walked, expected)
+        self.assertEqual((first.has_previous, first.has_next), (False, True))
+        self.assertEqual((third.has_previous, third.has_next), (True, False))
+        self.assertEqual([audit.pk for audit in back.object_list], expected[25:50])
+        self.assertTrue(back.has_previous and back.has_next)
+
+    def test_malformed_cursor_falls_back_to_the_first_page(self):
+        self._create_terms_audits(3, timezone.now())
+
+        response = self.client.get(self.url, {"type": "terms", "after": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["page_obj"].object_list), 3)
+        self.assertFalse(response.context["page_obj"].has_previous)
+
+    def test_summary_metrics_are_cached_with_an_as_of_timestamp(self):
+        first = self.client.get(self.url, {"type": "approvals"})
+        ApprovalAudit.objects.create(
+            approval_request=self.request,
+            user=self.admin,
+            credential_id="credential-new",
+            challenge_id="challenge-new",
+            action="approve",
+            status="success",
+        )
+
+        cached = self.client.get(self.url, {"type": "approvals"})
+        filtered = self.client.get(self.url, {"type": "approvals", "status": "success"})
+
+        self.assertEqual(cached.context["metrics"], first.context["metrics"])
+        self.assertEqual(cached.context["metrics"]["total"], 2)
+        self.assertEqual(len(cached.context["page_obj"].object_list), 3)
+        self.assertEqual(filtered.context["metrics"]["total"], 2)
+        self.assertEqual(filtered.context["metrics"]["unique_users"], 2)
+        self.assertLessEqual(cached.context["metrics"]["as_of"], timezone.now())
+
     def test_csv_export_honors_filters_and_prevents_formula_injection(self):
         self.request.title = '=HYPERLINK("https://example.test")'
         self.request.save(update_fields=["title"])
@@ -170,6 +295,43 @@ class TenantAuditViewTests(TestCase):
         self.assertNotIn("credential-failed", content)
         self.assertNotIn("credential-other", content)
 
+    def test_csv_export_can_be_gzip_compressed(self):
+        response = self.client.get(
+            self.url,
+            {"type": "approvals", "format": "csv", "compress": "gzip"},
+        )
+        content = gzip.decompress(b"".join(response.streaming_content)).decode("utf-8")
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertTrue(response["Content-Disposition"].endswith('.csv.gz"'))
+        self.assertTrue(content.startswith("\ufeff"))
+        self.assertIn("credential-success", content)
+        self.assertIn("credential-failed", content)
+        self.assertNotIn("credential-other", content)
+
+    def test_copy_sql_escapes_every_exported_column(self):
+        for audit_type, model in (("approvals", ApprovalAudit), ("terms", TermsAcceptanceAudit)):
+            with self.subTest(audit_type=audit_type):
+                sql, params = audit_export.copy_select_sql(model.objects.all(), audit_type)
+
+                self.assertEqual(sql.count("regexp_replace(COALESCE("), len(audit_export._headers(audit_type)))
+                self.assertIn('YYYY-MM-DD"T"HH24:MI:SS.USTZH:TZM', params)
+
+    def test_python_export_is_formatted_like_postgres_copy(self):
+        ApprovalAudit.objects.filter(pk=self.success_audit.pk).update(
+            performed_at=timezone.make_aware(datetime(2026, 3, 1, 12, 30)),
+            context_data={"decision": "approve", "id": 7, "nested": {"zz": 1, "a": "ñ"}},
+        )
+        audits = ApprovalAudit.objects.filter(pk=self.success_audit.pk)
+
+        content = b"".join(audit_export._python_chunks(audits, "approvals")).decode("utf-8")
+
+        self.assertNotIn("\r", content)
+        self.assertEqual(content.count("\n"), 2)
+        row = next(csv.reader(io.StringIO(content.splitlines()[1])))
+        self.assertEqual(row[0], "2026-03-01T12:30:00.000000+00:00")
+        self.assertEqual(row[11], '{"id": 7, "nested": {"a": "ñ", "zz": 1}, "decision": "approve"}')
+
     def test_invalid_filter_values_are_reported_without_breaking_the_page(self):
         response = self.client.get(
             self.url,
@@ -218,3 +380,45 @@ class TenantAuditViewTests(TestCase):
         self.assertContains(response, "Auditorías de aprobación")
         self.assertContains(response, "Fecha y hora")
         self.assertContains(response, "Restablecer")
+
+
+@skipUnless(connection.vendor == "postgresql", "COPY export needs PostgreSQL.")
+class TenantAuditCopyExportTests(TransactionTestCase):
+    """COPY streams from its own connection, so fixtures must be committed."""
+
+    password = TenantAuditViewTests.password
+    setUp = TenantAuditViewTests.setUp
+
+    def _audits(self, audit_type):
+        return TenantAuditView._apply_filters(
+            TenantAuditView._base_queryset(self.tenant, audit_type),
+            audit_type,
+            {**TenantAuditView()._parse_filters(RequestFactory().get("/"), audit_type), "sort": "oldest"},
+        )
+
+    def test_copy_export_matches_the_python_projection(self):
+        self.request.title = "@SUM(A1)"
+        self.request.save(update_fields=["title"])
+        self.success_audit.context_data = {"decision": "approve", "id": 7, "nested": {"zz": 1, "a": "ñ"}}
+        self.success_audit.save(update_fields=["context_data"])
+        TermsAcceptanceAudit.objects.create(
+            user=self.actor,
+            tenant=self.tenant,
+            document_type="terms",
+            document_version="2026-01",
+            document_hash="a" * 64,
+            status="success",
+            ip_address="2001:db8::1",
+            context_data={"locale": "es", "b": [1, 2.5, None, True]},
+        )
+
+        for audit_type in ("approvals", "terms"):
+            with self.subTest(audit_type=audit_type):
+                audits = self._audits(audit_type)
+                copied = b"".join(audit_export._copy_chunks(audits, audit_type))
+                python = b"".join(audit_export._python_chunks(audits, audit_type))
+
+                self.assertEqual(copied, python)
+                self.assertEqual(len(copied.decode("utf-8").splitlines()), audits.count() + 1)
+                if audit_type == "approvals":
+                    self.assertIn(b"'@SUM(A1)", copied)
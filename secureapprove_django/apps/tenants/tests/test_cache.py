@@ -0,0 +1,112 @@
+import threading
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from apps.authentication import metrics
+from apps.tenants import cache as tenant_cache
+from apps.tenants.models import ApprovalTypeConfig, Tenant
+
+
+class TenantCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+
+    def test_invalidating_a_tenant_retires_only_its_entries(self):
+        tenant_cache.set(1, "settings", "flags", {"beta": True}, 60)
+        tenant_cache.set(2, "settings", "flags", {"beta": False}, 60)
+
+        tenant_cache.invalidate_tenant(1)
+
+        self.assertIsNone(tenant_cache.get(1, "settings", "flags"))
+        self.assertEqual(tenant_cache.get(2, "settings", "flags"), {"beta": False})
+
+    def test_invalidating_after_the_generation_was_evicted_does_not_revive_entries(self):
+        tenant_cache.set(1, "settings", "flags", "old", 60)
+        cache.delete(tenant_cache.GENERATION_KEY.format(tenant_id=1))
+        tenant_cache.invalidate_tenant(1)
+        self.assertIsNone(tenant_cache.get(1, "settings", "flags"))
+
+    def test_get_or_set_caches_none_and_counts_hits_and_misses(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return None
+
+        for _ in range(3):
+            self.assertIsNone(tenant_cache.get_or_set(1, "lookup", "key", compute, 60, beta=0))
+
+        self.assertEqual(len(calls), 1)
+        exposition = metrics.render_prometheus()
+        self.assertIn(
+            'secureapprove_tenant_cache_requests_total{namespace="lookup",result="miss"} 1', exposition
+        )
+        self.assertIn(
+            'secureapprove_tenant_cache_requests_total{namespace="lookup",result="hit"} 2', exposition
+        )
+
+    def test_entries_near_expiry_are_refreshed_early(self):
+        tenant_cache.get_or_set(1, "lookup", "key", lambda: "first", 60)
+        full_key = tenant_cache.make_key(1, "lookup", "key")
+        entry = cache.get(full_key)
+        # Pretend the value took 30 s to compute and expires in one second.
+        cache.set(full_key, {**entry, "compute_seconds": 30.0, "expires_at": time.time() + 1}, 60)
+
+        with patch("apps.tenants.cache.random.random", return_value=0.5):
+            value = tenant_cache.get_or_set(1, "lookup", "key", lambda: "second", 60)
+
+        self.assertEqual(value, "second")
+
+    def test_concurrent_misses_compute_once(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results = []
+        leader = threading.Thread(
+            target=lambda: results.append(tenant_cache.get_or_set(1, "lookup", "key", slow_compute, 60))
+        )
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(
+            target=lambda: results.append(tenant_cache.get_or_set(1, "lookup", "key", slow_compute, 60))
+        )
+        follower.start()
+        time.sleep(tenant_cache.LOCK_POLL_SECONDS * 2)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(results, ["value", "value"])
+        self.assertEqual(len(calls), 1)
+
+
+class TenantCacheInvalidationSignalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.tenant = Tenant.objects.create(key="acme", name="Acme")
+
+    def test_tenant_and_approval_type_changes_bump_the_generation(self):
+        generation = tenant_cache.generation(self.tenant.pk)
+        self.tenant.name = "Acme Corp"
+        self.tenant.save()
+        self.assertNotEqual(tenant_cache.generation(self.tenant.pk), generation)
+
+        generation = tenant_cache.generation(self.tenant.pk)
+        config = ApprovalTypeConfig.objects.filter(tenant=self.tenant).first()
+        config.name = "Travel"
+        config.save()
+        self.assertNotEqual(tenant_cache.generation(self.tenant.pk), generation)
@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.tenants.models import Tenant, TenantSeatCounter, TenantUserInvite
+from apps.tenants.tasks import reconcile_tenant_seat_counters
+
+
+User = get_user_model()
+
+
+class TenantSeatCounterTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(key="acme", name="Acme", status="active", seats=3)
+        self.other_tenant = Tenant.objects.create(key="other", name="Other", status="active")
+
+    def _user(self, name, role="requester", tenant=None, **extra):
+        return User.objects.create_user(
+            username=name,
+            email=f"{name}@acme.test",
+            password="test-password",
+            role=role,
+            tenant=tenant or self.tenant,
+            **extra,
+        )
+
+    def _counts(self, tenant):
+        counter = TenantSeatCounter.objects.get(tenant=tenant)
+        return counter.active_users, counter.approvers
+
+    def test_counter_row_is_created_with_the_tenant(self):
+        self.assertEqual(self._counts(self.tenant), (0, 0))
+
+    def test_user_changes_adjust_counters(self):
+        requester = self._user("requester")
+        approver = self._user("approver", role="approver")
+        self.assertEqual(self._counts(self.tenant), (2, 1))
+
+        requester.role = "tenant_admin"
+        requester.save()
+        self.assertEqual(self._counts(self.tenant), (2, 2))
+
+        approver.is_active = False
+        approver.save(update_fields=["is_active"])
+        self.assertEqual(self._counts(self.tenant), (1, 1))
+
+        requester.tenant = self.other_tenant
+        requester.save()
+        self.assertEqual(self._counts(self.tenant), (0, 0))
+        self.assertEqual(self._counts(self.other_tenant), (1, 1))
+
+        requester.delete()
+        self.assertEqual(self._counts(self.other_tenant), (0, 0))
+
+    def test_tenant_properties_read_the_counter_without_counting_users(self):
+        self._user("approver", role="approver")
+        tenant = Tenant.objects.select_related("seat_counter").get(pk=self.tenant.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(tenant.used_seats, 1)
+            self.assertEqual(tenant.available_seats, 2)
+            self.assertEqual(tenant.approvers_count, 1)
+
+    def test_deferred_saves_and_missing_rows_fall_back_to_a_recount(self):
+        self._user("approver", role="approver")
+        deferred = User.objects.only("pk", "name").get(username="approver")
+        deferred.name = "Renamed"
+        deferred.save(update_fields=["name"])
+        # Recounted in place: the row never disappears from under readers.
+        self.assertEqual(self._counts(self.tenant), (1, 1))
+        self.assertEqual(Tenant.objects.get(pk=self.tenant.pk).approvers_count, 1)
+
+        TenantSeatCounter.objects.filter(tenant=self.tenant).delete()
+        self.assertEqual(Tenant.objects.get(pk=self.tenant.pk).used_seats, 1)
+        self.assertTrue(TenantSeatCounter.objects.filter(tenant=self.tenant).exists())
+
+    def test_reconcile_corrects_drift_from_bulk_updates(self):
+        self._user("approver", role="approver")
+        self._user("requester")
+        User.objects.filter(tenant=self.tenant).update(is_active=False)
+        self.assertEqual(self._counts(self.tenant), (2, 1))
+
+        result = reconcile_tenant_seat_counters()
+
+        self.assertEqual(result, {"tenants": 2, "corrected": 1})
+        self.assertEqual(self._counts(self.tenant), (0, 0))
+        self.assertIsNotNone(TenantSeatCounter.objects.get(tenant=self.tenant).reconciled_at)
+
+    def test_invite_acceptance_respects_the_seat_limit(self):
+        self.tenant.seats = 1
+        self.tenant.save(update_fields=["seats"])
+        first = TenantUserInvite.objects.create(tenant=self.tenant, email="first@acme.test", token="first")
+        second = TenantUserInvite.objects.create(tenant=self.tenant, email="second@acme.test", token="second")
+
+        self.client.post(reverse("tenants:invite_accept", args=[first.token]))
+        self.client.post(reverse("tenants:invite_accept", args=[second.token]))
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, "accepted")
+        self.assertEqual(second.status, "pending")
+        self.assertFalse(User.objects.filter(email="second@acme.test").exists())
+        self.assertEqual(self._counts(self.tenant), (1, 0))
@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.requests.models import ApprovalRequest
+from apps.tenants.models import Tenant
+from apps.tenants.views import SuperAdminTenantView
+
+
+User = get_user_model()
+
+
+class SuperAdminTenantViewTests(TestCase):
+    def setUp(self):
+        self.operator = User.objects.create_user(
+            username="operator",
+            email="eudyespinoza@gmail.com",
+            password="test-password",
+            role="superadmin",
+        )
+        self.client.force_login(self.operator)
+        self.url = reverse("tenants:superadmin")
+        self.tenants = [
+            Tenant.objects.create(key=f"tenant-{index:02d}", name=f"Tenant {index:02d}", status="active")
+            for index in range(5)
+        ]
+        busy = self.tenants[2]
+        for index in range(3):
+            User.objects.create_user(
+                username=f"busy-{index}",
+                email=f"busy-{index}@tenant.test",
+                password="test-password",
+                role="approver" if index else "requester",
+                tenant=busy,
+            )
+        requester = User.objects.get(username="busy-0")
+        for index in range(2):
+            ApprovalRequest.objects.create(
+                title=f"Request {index}", description="", requester=requester, tenant=busy
+            )
+
+    def test_rows_are_annotated_in_a_constant_number_of_queries(self):
+        with self.assertNumQueries(4):
+            # session, user, count, page
+            response = self.client.get(self.url, {"sort": "name"})
+        self.assertEqual(response.status_code, 200)
+        rows = {tenant.key: tenant for tenant in response.context["tenants"]}
+        busy = rows["tenant-02"]
+        self.assertEqual((busy.user_total, busy.approver_total, busy.request_total), (3, 2, 2))
+        self.assertIsNotNone(busy.last_request_at)
+        self.assertEqual(rows["tenant-00"].request_total, 0)
+        self.assertIsNone(rows["tenant-00"].last_request_at)
+        self.assertEqual(response.context["total"], 5)
+
+    def test_search_and_status_filter(self):
+        self.tenants[4].status = "suspended"
+        self.tenants[4].save()
+
+        response = self.client.get(self.url, {"q": "TENANT-0", "status": "active"})
+        self.assertEqual(response.context["total"], 4)
+
+        response = self.client.get(self.url, {"q": str(self.tenants[1].pk)})
+        self.assertIn(self.tenants[1], response.context["tenants"])
+
+    def _small_pages(self):
+        original = SuperAdminTenantView.page_size
+        SuperAdminTenantView.page_size = 2
+        self.addCleanup(setattr, SuperAdminTenantView, "page_size", original)
+
+    def test_keyset_pages_walk_every_tenant_once(self):
+        self._small_pages()
+        seen = []
+        params = {"sort": "users"}
+        while True:
+            page = self.client.get(self.url, params).context["page_obj"]
+            seen.extend(tenant.key for tenant in page.object_list)
+            if not page.has_next:
+                break
+            params = {"sort": "users", "after": page.next_cursor}
+        self.assertEqual(seen[0], "tenant-02")
+        self.assertEqual(sorted(seen), sorted(tenant.key for tenant in self.tenants))
+
+        previous = self.client.get(self.url, {"sort": "users", "before": page.previous_cursor}).context["page_obj"]
+        self.assertEqual(len(previous.object_list), 2)
+        self.assertTrue(previous.has_next)
+
+    def test_cursor_from_another_sort_is_ignored(self):
+        self._small_pages()
+        cursor = self.client.get(self.url, {"sort": "name"}).context["page_obj"].next_cursor
+
+        response = self.client.get(self.url, {"sort": "oldest", "after": cursor})
+        self.assertEqual([tenant.key for tenant in response.context["tenants"]], ["tenant-00", "tenant-01"])
+        self.assertFalse(response.context["page_obj"].has_previous)
+
+        response = self.client.get(self.url, {"sort": "name", "after": "not-a-cursor"})
+        self.assertEqual(response.status_code, 200)
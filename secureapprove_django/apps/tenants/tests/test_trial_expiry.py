@@ -0,0 +1,69 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.authentication import metrics
+from apps.billing.models import Plan, Subscription
+from apps.tenants.models import Tenant
+from apps.tenants.tasks import expire_trials
+from apps.tenants import cache as tenant_cache
+
+
+class ExpireTrialsTaskTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+        # Tenant creation attaches a 14-day trial on the first active plan.
+        Plan.objects.create(
+            name="starter",
+            display_name="Starter",
+            monthly_price=Decimal("90.00"),
+            max_approvers=2,
+            max_requests_per_month=0,
+            max_users=0,
+        )
+        now = timezone.now()
+        self.expired = []
+        for index in range(3):
+            tenant = Tenant.objects.create(key=f"expired-{index}", name=f"Expired {index}", status="trial")
+            Subscription.objects.filter(tenant=tenant).update(trial_end=now - timedelta(days=1))
+            self.expired.append(tenant)
+        self.current = Tenant.objects.create(key="current", name="Current", status="trial")
+        self.paid = Tenant.objects.create(key="paid", name="Paid", status="active")
+        Subscription.objects.filter(tenant=self.paid).update(status="active", trial_end=now - timedelta(days=1))
+
+    def test_expired_trials_are_suspended_in_batches(self):
+        generation = tenant_cache.generation(self.expired[0].pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = expire_trials(batch_size=1)
+
+        # One UPDATE per table per batch, never one per row.
+        updates = [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 2 * 3)
+
+        self.assertEqual(result, {"expired": 3})
+        self.assertEqual(
+            set(Tenant.objects.filter(status="suspended", is_active=False).values_list("key", flat=True)),
+            {"expired-0", "expired-1", "expired-2"},
+        )
+        self.assertEqual(Subscription.objects.filter(status="suspended").count(), 3)
+        self.assertEqual(Subscription.objects.get(tenant=self.current).status, "trialing")
+        self.assertEqual(Subscription.objects.get(tenant=self.paid).status, "active")
+        self.assertNotEqual(tenant_cache.generation(self.expired[0].pk), generation)
+        self.assertIn("secureapprove_trials_expired_total 3", metrics.render_prometheus())
+
+    def test_command_runs_the_task(self):
+        out = StringIO()
+        call_command("expire_trials", stdout=out)
+        self.assertIn("Successfully expired 3 trials", out.getvalue())
+        self.assertEqual(expire_trials(), {"expired": 0})
@@ -1,6 +1,9 @@
+from django.db import transaction
 from django.utils import timezone
 
-from .models import Tenant, TenantUserInvite
+from apps.billing.quotas import QuotaExceeded, check_seat
+
+from .models import APPROVER_ROLES, Tenant, TenantUserInvite
 
 
 def ensure_user_tenant(user):
@@ -77,29 +80,25 @@ def assign_tenant_from_reservation(user):
 
     tenant = invite.tenant
 
-    seats = tenant.seats or 0
-    used_seats = tenant.used_seats
-    has_subscription = hasattr(tenant, "subscription")
-    can_by_subscription = (
-        tenant.subscription.can_create_user() if has_subscription else True
-    )
-
-    if seats and used_seats >= seats:
-        return
-
-    if not can_by_subscription:
-        return
-
-    user.tenant = tenant
-    # Do not downgrade superadmin; otherwise honour reserved role
-    if getattr(user, "role", None) not in ("superadmin",) and invite.role:
-        user.role = invite.role
-    user.is_active = True
-    user.save(update_fields=["tenant", "role", "is_active"])
-
-    invite.status = "accepted"
-    invite.accepted_at = timezone.now()
-    invite.save(update_fields=["status", "accepted_at"])
+    # Serialize against other seat grants for this tenant until commit.
+    with transaction.atomic():
+        tenant.lock_seat_counter()
+
+        try:
+            check_seat(tenant, approver=invite.role in APPROVER_ROLES)
+        except QuotaExceeded:
+            return
+
+        user.tenant = tenant
+        # Do not downgrade superadmin; otherwise honour reserved role
+        if getattr(user, "role", None) not in ("superadmin",) and invite.role:
+            user.role = invite.role
+        user.is_active = True
+        user.save(update_fields=["tenant", "role", "is_active"])
+
+        invite.status = "accepted"
+        invite.accepted_at = timezone.now()
+        invite.save(update_fields=["status", "accepted_at"])
 
 
 def generate_unique_slug(name):
@@ -1,14 +1,17 @@
-import csv
+import hashlib
 import ipaddress
 import json
+import re
+import uuid
+from datetime import datetime, time, timedelta
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import get_user_model, login
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.http import JsonResponse, StreamingHttpResponse
-from django.core.paginator import Paginator
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.utils import timezone
@@ -17,12 +20,19 @@ from django.utils.translation import gettext_lazy as _
 from django.views import View
 
 from apps.authentication.models import ApprovalAudit, TermsAcceptanceAudit
+from apps.billing.models import Subscription
+from apps.billing.quotas import QuotaExceeded, check_seat
 from apps.requests.models import ApprovalRequest
-from .models import Tenant, TenantUserInvite, ApprovalTypeConfig
+from .audit_export import audit_csv_chunks
+from .models import APPROVER_ROLES, Tenant, TenantUserInvite, ApprovalTypeConfig
+from .pagination import keyset_page
+from . import cache as tenant_cache
 from .utils import ensure_user_tenant
 
 User = get_user_model()
 
+AUDIT_DIGEST = re.compile(r"^[0-9a-f]{64}(?:[0-9a-f]{64})?$")
+
 
 class TenantSettingsView(LoginRequiredMixin, View):
     """
@@ -109,10 +119,24 @@ class TenantSettingsView(LoginRequiredMixin, View):
 
             valid_roles = {code for code, _ in User.ROLE_CHOICES}
             if role in valid_roles:
-                user.role = role
-                user.is_active = is_active
-                user.save(update_fields=["role", "is_active"])
-                messages.success(request, _("User updated successfully."))
+                try:
+                    with transaction.atomic():
+                        tenant.lock_seat_counter()
+                        gains_seat = is_active and not user.is_active
+                        gains_approver = (
+                            is_active
+                            and role in APPROVER_ROLES
+                            and not (user.is_active and user.role in APPROVER_ROLES)
+                        )
+                        if gains_seat or gains_approver:
+                            check_seat(tenant, seat=gains_seat, approver=gains_approver)
+                        user.role = role
+                        user.is_active = is_active
+                        user.save(update_fields=["role", "is_active"])
+                except QuotaExceeded as exc:
+                    messages.error(request, exc.message)
+                else:
+                    messages.success(request, _("User updated successfully."))
             else:
                 messages.error(request, _("Invalid role selected."))
 
@@ -128,28 +152,20 @@ class TenantSettingsView(LoginRequiredMixin, View):
             if role not in valid_roles:
                 role = "requester"
 
-            seats = tenant.seats or 0
-            used_seats = tenant.used_seats
-            has_subscription = hasattr(tenant, "subscription")
-            can_by_subscription = (
-                tenant.subscription.can_create_user() if has_subscription else True
-            )
-            if seats and used_seats >= seats:
-                messages.error(
-                    request,
-                    _(
+            try:
+                check_seat(tenant, approver=role in APPROVER_ROLES)
+            except QuotaExceeded as exc:
+                if exc.limit_type == "seats":
+                    message = _(
                         "You have reached the maximum number of users for your current seats. Please upgrade your subscription to add more users."
-                    ),
-                )
-                return redirect("tenants:settings")
-
-            if not can_by_subscription:
-                messages.error(
-                    request,
-                    _(
+                    )
+                elif exc.limit_type == "users":
+                    message = _(
                         "Your current subscription does not allow adding more users this month."
-                    ),
-                )
+                    )
+                else:
+                    message = exc.message
+                messages.error(request, message)
                 return redirect("tenants:settings")
 
             from secrets import token_urlsafe
@@ -380,26 +396,11 @@ class TenantAuditView(LoginRequiredMixin, View):
     template_name = "tenants/audit.html"
     page_sizes = (25, 50, 100)
 
-    class CsvBuffer:
-        """Minimal file-like object used by csv.writer for streaming rows."""
-
-        def write(self, value):
-            return value
+    metrics_cache_namespace = "audit_metrics:v1"
 
     def get_tenant(self, request):
         return ensure_user_tenant(request.user)
 
-    @staticmethod
-    def _safe_csv_value(value):
-        """Prevent spreadsheet formula execution when an exported cell is opened."""
-
-        if value is None:
-            return ""
-        rendered = str(value)
-        if rendered.startswith(("=", "+", "-", "@")):
-            return f"'{rendered}"
-        return rendered
-
     def _parse_filters(self, request, audit_type):
         status_choices = dict(ApprovalAudit.STATUS_CHOICES)
         action_choices = dict(ApprovalAudit._meta.get_field("action").choices)
@@ -502,36 +503,69 @@ class TenantAuditView(LoginRequiredMixin, View):
             audits = audits.filter(security_proof__isnull=True)
         if filters["normalized_ip"]:
             audits = audits.filter(ip_address=filters["normalized_ip"])
+        # Half-open timestamp ranges keep performed_at indexable, unlike __date.
         if filters["date_from"]:
-            audits = audits.filter(performed_at__date__gte=filters["date_from"])
+            audits = audits.filter(performed_at__gte=TenantAuditView._day_start(filters["date_from"]))
         if filters["date_to"]:
-            audits = audits.filter(performed_at__date__lte=filters["date_to"])
-
-        query = filters["q"]
-        if query and audit_type == "terms":
             audits = audits.filter(
-                models.Q(user__email__icontains=query)
-                | models.Q(initiated_by__email__icontains=query)
+                performed_at__lt=TenantAuditView._day_start(filters["date_to"] + timedelta(days=1))
+            )
+        if filters["q"]:
+            audits = audits.filter(TenantAuditView._search_filter(audit_type, filters["q"]))
+
+        if filters["sort"] == "oldest":
+            return audits.order_by("performed_at", "id")
+        return audits.order_by("-performed_at", "-id")
+
+    @staticmethod
+    def _day_start(day):
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    @staticmethod
+    def _search_filter(audit_type, query):
+        """Exact lookups for IDs, digests and IPs; trigram-indexed substring search otherwise."""
+
+        try:
+            object_id = uuid.UUID(query)
+        except ValueError:
+            object_id = None
+        if object_id:
+            return models.Q(id=object_id) | models.Q(security_proof__id=object_id)
+
+        if AUDIT_DIGEST.match(query.lower()):
+            digest = query.lower()
+            exact = models.Q(security_proof__transaction_sha256=digest)
+            if audit_type == "terms":
+                exact |= models.Q(document_hash=digest)
+            return exact
+
+        try:
+            return models.Q(ip_address=str(ipaddress.ip_address(query)))
+        except ValueError:
+            pass
+
+        # Substring matches on related tables run as IN-subqueries so each one
+        # can use its own pg_trgm index instead of filtering the joined rows.
+        matching_users = User.objects.filter(email__icontains=query).values("pk")
+        if audit_type == "terms":
+            return (
+                models.Q(user__in=matching_users)
+                | models.Q(initiated_by__in=matching_users)
                 | models.Q(document_type__icontains=query)
                 | models.Q(document_version__icontains=query)
                 | models.Q(document_hash__icontains=query)
             )
-        elif query:
-            search_query = (
-                models.Q(user__email__icontains=query)
-                | models.Q(approval_request__title__icontains=query)
-            )
-            if query.isdigit():
-                search_query |= models.Q(approval_request__id=int(query))
-            audits = audits.filter(search_query)
-
-        ordering = "performed_at" if filters["sort"] == "oldest" else "-performed_at"
-        return audits.order_by(ordering)
+        search = models.Q(user__in=matching_users) | models.Q(
+            approval_request__in=ApprovalRequest.objects.filter(title__icontains=query).values("pk")
+        )
+        if query.isdigit() and len(query) < 19:
+            search |= models.Q(approval_request_id=int(query))
+        return search
 
     @staticmethod
     def _query_string(request, *, audit_type=None, remove=(), additions=None):
         params = request.GET.copy()
-        for key in ("page", "format", *remove):
+        for key in ("page", "after", "before", "format", "compress", *remove):
             params.pop(key, None)
         if audit_type:
             params["type"] = audit_type
@@ -563,63 +597,67 @@ class TenantAuditView(LoginRequiredMixin, View):
             if value
         ]
 
-    def _csv_response(self, tenant, audit_type, audits):
-        pseudo_buffer = self.CsvBuffer()
-        writer = csv.writer(pseudo_buffer)
-
-        if audit_type == "terms":
-            headers = [
-                _("Timestamp"), _("Status"), _("User"), _("Initiated by"),
-                _("Document type"), _("Document version"), _("Document hash"),
-                _("Credential"), _("Challenge"), _("IP address"), _("User agent"),
-                _("Error"), _("Context"), _("Audit ID"), _("Proof ID"),
-                _("Proof archive status"), _("Transaction SHA-256"),
-            ]
+    @staticmethod
+    def _parse_cursor(performed_at, pk):
+        return datetime.fromisoformat(performed_at), uuid.UUID(str(pk))
+
+    def _keyset_page(self, request, audits, audit_type, filters):
+        """Fetch one page after/before a cursor; cost is independent of the page depth."""
+
+        return keyset_page(
+            audits,
+            request.GET,
+            field="performed_at",
+            newest_first=filters["sort"] == "newest",
+            page_size=filters["page_size"],
+            scope=audit_type,
+            parse=self._parse_cursor,
+        )
 
-            def data_rows():
-                for audit in audits.iterator(chunk_size=1000):
-                    proof = getattr(audit, "security_proof", None)
-                    yield [
-                        timezone.localtime(audit.performed_at).isoformat(), audit.get_status_display(),
-                        audit.user.email, audit.initiated_by.email if audit.initiated_by else "",
-                        audit.document_type, audit.document_version, audit.document_hash,
-                        audit.credential_id, audit.challenge_id, audit.ip_address, audit.user_agent,
-                        audit.error_message,
-                        json.dumps(audit.context_data, ensure_ascii=False, sort_keys=True), audit.id,
-                        proof.id if proof else "", proof.archive_status if proof else "",
-                        proof.transaction_sha256 if proof else "",
-                    ]
-        else:
-            headers = [
-                _("Timestamp"), _("Status"), _("User"), _("Request ID"),
-                _("Request"), _("Action"), _("Credential"), _("Challenge"),
-                _("IP address"), _("User agent"), _("Error"), _("Context"), _("Audit ID"),
-                _("Proof ID"), _("Proof archive status"), _("Transaction SHA-256"),
+    def _metrics(self, tenant, audit_type, filters, audits):
+        """Summary counts for the filtered audits, cached briefly per tenant and filter set."""
+
+        signature = json.dumps(
+            [
+                audit_type,
+                filters["status"],
+                filters["action"],
+                filters["proof"],
+                filters["q"],
+                filters["normalized_ip"],
+                str(filters["date_from"] or ""),
+                str(filters["date_to"] or ""),
             ]
+        )
+        def compute():
+            metrics = audits.order_by().aggregate(
+                total=models.Count("id"),
+                successful=models.Count("id", filter=models.Q(status="success")),
+                attention=models.Count("id", filter=~models.Q(status="success")),
+                unique_users=models.Count("user_id", distinct=True),
+                proofs=models.Count("security_proof", distinct=True),
+            )
+            metrics["as_of"] = timezone.now()
+            return metrics
+
+        return tenant_cache.get_or_set(
+            tenant.pk,
+            self.metrics_cache_namespace,
+            hashlib.sha256(signature.encode()).hexdigest(),
+            compute,
+            getattr(settings, "SECUREAPPROVE_AUDIT_METRICS_CACHE_SECONDS", 60),
+        )
 
-            def data_rows():
-                for audit in audits.iterator(chunk_size=1000):
-                    proof = getattr(audit, "security_proof", None)
-                    yield [
-                        timezone.localtime(audit.performed_at).isoformat(), audit.get_status_display(),
-                        audit.user.email, audit.approval_request_id, audit.approval_request.title,
-                        audit.get_action_display(), audit.credential_id, audit.challenge_id,
-                        audit.ip_address, audit.user_agent, audit.error_message,
-                        json.dumps(audit.context_data, ensure_ascii=False, sort_keys=True), audit.id,
-                        proof.id if proof else "", proof.archive_status if proof else "",
-                        proof.transaction_sha256 if proof else "",
-                    ]
-
-        def stream():
-            yield "\ufeff"
-            yield writer.writerow([self._safe_csv_value(value) for value in headers])
-            for row in data_rows():
-                yield writer.writerow([self._safe_csv_value(value) for value in row])
-
-        response = StreamingHttpResponse(stream(), content_type="text/csv; charset=utf-8")
+    def _csv_response(self, request, tenant, audit_type, audits):
+        compress = request.GET.get("compress") == "gzip"
+        response = StreamingHttpResponse(
+            audit_csv_chunks(audits, audit_type, compress=compress),
+            content_type="application/gzip" if compress else "text/csv; charset=utf-8",
+        )
         date_stamp = timezone.localdate().strftime("%Y%m%d")
+        extension = "csv.gz" if compress else "csv"
         response["Content-Disposition"] = (
-            f'attachment; filename="secureapprove-{tenant.key}-{audit_type}-audit-{date_stamp}.csv"'
+            f'attachment; filename="secureapprove-{tenant.key}-{audit_type}-audit-{date_stamp}.{extension}"'
         )
         response["Cache-Control"] = "no-store"
         return response
@@ -633,7 +671,6 @@ class TenantAuditView(LoginRequiredMixin, View):
             return redirect("landing:index")
 
         audit_type = (request.GET.get("type") or "terms").strip().lower()
-        page_number = request.GET.get("page")
 
         if audit_type not in ("terms", "approvals"):
             audit_type = "terms"
@@ -642,18 +679,10 @@ class TenantAuditView(LoginRequiredMixin, View):
         audits = self._apply_filters(self._base_queryset(tenant, audit_type), audit_type, filters)
 
         if request.GET.get("format") == "csv":
-            return self._csv_response(tenant, audit_type, audits)
-
-        metrics = audits.aggregate(
-            total=models.Count("id"),
-            successful=models.Count("id", filter=models.Q(status="success")),
-            attention=models.Count("id", filter=~models.Q(status="success")),
-            unique_users=models.Count("user_id", distinct=True),
-            proofs=models.Count("security_proof", distinct=True),
-        )
+            return self._csv_response(request, tenant, audit_type, audits)
 
-        paginator = Paginator(audits, filters["page_size"])
-        page_obj = paginator.get_page(page_number)
+        metrics = self._metrics(tenant, audit_type, filters, audits)
+        page_obj = self._keyset_page(request, audits, audit_type, filters)
         for audit in page_obj.object_list:
             audit.context_json = json.dumps(audit.context_data, ensure_ascii=False, indent=2, sort_keys=True)
             audit.proof = getattr(audit, "security_proof", None)
@@ -736,26 +765,12 @@ class TenantInviteAcceptView(View):
             },
         )
 
-    def post(self, request, token):
-        invite = self._get_valid_invite(token)
-        if not invite:
-            messages.error(request, _("This invitation is no longer valid."))
-            return redirect("landing:index")
-
-        tenant = invite.tenant
-
-        used_seats = tenant.used_seats
-        available_seats = tenant.available_seats
-        if available_seats is not None and available_seats <= 0:
-            messages.error(
-                request,
-                _(
-                    "This tenant has no available seats. Please contact the administrator."
-                ),
-            )
-            return redirect("landing:index")
-
-        email = invite.email.lower()
+    def _grant_seat(self, invite, tenant, email):
+        """Attach the invited user to the tenant; returns ``(user, error_message)``."""
+        try:
+            check_seat(tenant, approver=invite.role in APPROVER_ROLES)
+        except QuotaExceeded as exc:
+            return None, exc.message
 
         # Create or update user
         user, created = User.objects.get_or_create(
@@ -772,13 +787,9 @@ class TenantInviteAcceptView(View):
         if not created:
             # User exists, validate tenant association
             if user.tenant and user.tenant != tenant:
-                messages.error(
-                    request,
-                    _(
-                        "This email is already associated with a different tenant. Please contact support."
-                    ),
+                return None, _(
+                    "This email is already associated with a different tenant. Please contact support."
                 )
-                return redirect("landing:index")
 
             # Attach to tenant if not already
             if not user.tenant:
@@ -793,6 +804,25 @@ class TenantInviteAcceptView(View):
         invite.status = "accepted"
         invite.accepted_at = timezone.now()
         invite.save(update_fields=["status", "accepted_at"])
+        return user, None
+
+    def post(self, request, token):
+        invite = self._get_valid_invite(token)
+        if not invite:
+            messages.error(request, _("This invitation is no longer valid."))
+            return redirect("landing:index")
+
+        tenant = invite.tenant
+        email = invite.email.lower()
+
+        # The seat check and the grant happen under the tenant's seat counter
+        # lock so two concurrent acceptances cannot both take the last seat.
+        with transaction.atomic():
+            tenant.lock_seat_counter()
+            user, error = self._grant_seat(invite, tenant, email)
+        if error:
+            messages.error(request, error)
+            return redirect("landing:index")
 
         # Log the user in
         user.backend = "django.contrib.auth.backends.ModelBackend"
@@ -818,10 +848,112 @@ class SuperAdminTenantView(LoginRequiredMixin, View):
              return redirect("landing:index")
         return super().dispatch(request, *args, **kwargs)
 
+    page_size = 50
+    # sort key -> (ordering column, descending)
+    sort_options = {
+        "newest": ("created_at", True),
+        "oldest": ("created_at", False),
+        "name": ("name", False),
+        "users": ("user_total", True),
+    }
+
+    @staticmethod
+    def _console_queryset():
+        """Tenants with every column the console shows, computed in one query."""
+
+        requests = ApprovalRequest.objects.filter(tenant=models.OuterRef("pk")).order_by()
+        return Tenant.objects.annotate(
+            user_total=Coalesce("seat_counter__active_users", 0),
+            approver_total=Coalesce("seat_counter__approvers", 0),
+            request_total=Coalesce(
+                models.Subquery(
+                    requests.values("tenant").annotate(total=models.Count("pk")).values("total")
+                ),
+                0,
+            ),
+            last_request_at=models.Subquery(requests.order_by("-created_at").values("created_at")[:1]),
+            subscription_status=models.F("subscription__status"),
+        )
+
+    def _parse_filters(self, request):
+        query = (request.GET.get("q") or "").strip()[:200]
+        status = (request.GET.get("status") or "").strip()
+        if status not in dict(Tenant.STATUS_CHOICES):
+            status = ""
+        plan = (request.GET.get("plan") or "").strip()
+        if plan not in dict(Tenant.PLAN_CHOICES):
+            plan = ""
+        sort = (request.GET.get("sort") or "newest").strip().lower()
+        if sort not in self.sort_options:
+            sort = "newest"
+        return {"q": query, "status": status, "plan": plan, "sort": sort}
+
+    @staticmethod
+    def _apply_filters(tenants, filters):
+        if filters["status"]:
+            tenants = tenants.filter(status=filters["status"])
+        if filters["plan"]:
+            tenants = tenants.filter(plan_id=filters["plan"])
+        query = filters["q"]
+        if query:
+            search = models.Q(name__icontains=query) | models.Q(key__icontains=query)
+            if query.isdigit():
+                search |= models.Q(pk=int(query))
+            tenants = tenants.filter(search)
+        return tenants
+
+    def _parse_cursor(self, sort):
+        field = self.sort_options[sort][0]
+
+        def parse(value, pk):
+            if not isinstance(pk, int):
+                raise TypeError("Tenant cursors carry an integer primary key.")
+            if field == "created_at":
+                return datetime.fromisoformat(value), pk
+            if not isinstance(value, (int, str)):
+                raise TypeError("Unsupported cursor value.")
+            return value, pk
+
+        return parse
+
+    def _keyset_page(self, request, tenants, sort):
+        field, newest_first = self.sort_options[sort]
+        return keyset_page(
+            tenants,
+            request.GET,
+            field=field,
+            newest_first=newest_first,
+            page_size=self.page_size,
+            scope=sort,
+            parse=self._parse_cursor(sort),
+        )
+
     def get(self, request):
-        tenants = Tenant.objects.all().order_by("-created_at")
+        filters = self._parse_filters(request)
+        tenants = self._apply_filters(Tenant.objects.all(), filters)
+        total = tenants.count()
+        page_obj = self._keyset_page(
+            request, self._apply_filters(self._console_queryset(), filters), filters["sort"]
+        )
+        subscription_statuses = dict(Subscription.STATUS_CHOICES)
+        for tenant in page_obj.object_list:
+            tenant.subscription_label = subscription_statuses.get(tenant.subscription_status, "")
+
+        params = request.GET.copy()
+        for key in ("after", "before"):
+            params.pop(key, None)
         return render(request, self.template_name, {
-            "tenants": tenants,
+            "tenants": page_obj.object_list,
+            "page_obj": page_obj,
+            "total": total,
+            "filters": filters,
+            "sort_choices": [
+                ("newest", _("Newest")),
+                ("oldest", _("Oldest")),
+                ("name", _("Name")),
+                ("users", _("Most users")),
+            ],
+            "pagination_query": params.urlencode(),
             "plans": Tenant.PLAN_CHOICES,
             "statuses": Tenant.STATUS_CHOICES,
         })
@@ -64,6 +64,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.billing.metering.ApiMeteringMiddleware',
     'allauth.account.middleware.AccountMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -190,6 +191,7 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_THROTTLE_RATES': {
         'proof_verify': '60/minute',
+        'proof_verify_batch': '10/minute',
         'proof_evidence': '30/minute',
     },
 }
@@ -308,6 +310,34 @@ WEBAUTHN_RP_NAME = config('WEBAUTHN_RP_NAME', default='SecureApprove')
 WEBAUTHN_RP_ID = config('WEBAUTHN_RP_ID', default='localhost')
 WEBAUTHN_ORIGIN = config('WEBAUTHN_ORIGIN', default='http://localhost:8005')
 
+# Tenant audit page summary counts are recomputed at most this often per filter set.
+SECUREAPPROVE_AUDIT_METRICS_CACHE_SECONDS = config(
+    'SECUREAPPROVE_AUDIT_METRICS_CACHE_SECONDS', default=60, cast=int
+)
+
+# Trial expiry beat task: run interval and subscriptions suspended per transaction.
+SECUREAPPROVE_TRIAL_EXPIRY_INTERVAL_SECONDS = config(
+    'SECUREAPPROVE_TRIAL_EXPIRY_INTERVAL_SECONDS', default=900, cast=int
+)
+SECUREAPPROVE_TRIAL_EXPIRY_BATCH_SIZE = config('SECUREAPPROVE_TRIAL_EXPIRY_BATCH_SIZE', default=500, cast=int)
+
+# Process-local metrics are flushed to Redis on this interval (0 disables the
+# background flusher) and served at /metrics to holders of the bearer token.
+SECUREAPPROVE_METRICS_FLUSH_SECONDS = config('SECUREAPPROVE_METRICS_FLUSH_SECONDS', default=10, cast=float)
+SECUREAPPROVE_METRICS_TOKEN = config('SECUREAPPROVE_METRICS_TOKEN', default='')
+
+# API calls are counted in-process, flushed to Redis on this interval (0
+# disables the background flusher) and folded into UsageMetrics by beat.
+SECUREAPPROVE_API_METERING_FLUSH_SECONDS = config(
+    'SECUREAPPROVE_API_METERING_FLUSH_SECONDS', default=5, cast=float
+)
+
+# Redis request-quota counters are re-synced with the usage rollup on this interval.
+SECUREAPPROVE_QUOTA_RECONCILE_INTERVAL_SECONDS = config(
+    'SECUREAPPROVE_QUOTA_RECONCILE_INTERVAL_SECONDS', default=300, cast=int
+)
+ENABLE_METRICS_ENDPOINT = config('ENABLE_METRICS_ENDPOINT', default=True, cast=bool)
+
 # SecureApprove Proof. Production supports AWS KMS or self-hosted Vault Transit;
 # the deterministic local backend exists only for development and automated tests.
 SECUREAPPROVE_PROOF_ENABLED = config('SECUREAPPROVE_PROOF_ENABLED', default=False, cast=bool)
@@ -323,12 +353,56 @@ SECUREAPPROVE_PROOF_ENCRYPTION_BACKEND = config(
 SECUREAPPROVE_PROOF_SIGNING_KEY_ARN = config('SECUREAPPROVE_PROOF_SIGNING_KEY_ARN', default='')
 SECUREAPPROVE_PROOF_SIGNING_KID = config('SECUREAPPROVE_PROOF_SIGNING_KID', default='')
 SECUREAPPROVE_PROOF_ENCRYPTION_KEY_ARN = config('SECUREAPPROVE_PROOF_ENCRYPTION_KEY_ARN', default='')
+# Process-local reuse of the active signing key and its KMS/Vault metadata.
+SECUREAPPROVE_PROOF_KEY_CACHE_SECONDS = config(
+    'SECUREAPPROVE_PROOF_KEY_CACHE_SECONDS', default=60, cast=int
+)
+# Shared-cache lifetime of public verify-by-id results; key status changes invalidate them.
+SECUREAPPROVE_PROOF_VERIFICATION_CACHE_SECONDS = config(
+    'SECUREAPPROVE_PROOF_VERIFICATION_CACHE_SECONDS', default=300, cast=int
+)
+# Batch JWS verification. 0 workers uses one process per CPU.
+SECUREAPPROVE_PROOF_VERIFY_WORKERS = config('SECUREAPPROVE_PROOF_VERIFY_WORKERS', default=0, cast=int)
+SECUREAPPROVE_PROOF_VERIFY_PARALLEL_MIN = config(
+    'SECUREAPPROVE_PROOF_VERIFY_PARALLEL_MIN', default=200, cast=int
+)
+SECUREAPPROVE_PROOF_VERIFY_BATCH_LIMIT = config(
+    'SECUREAPPROVE_PROOF_VERIFY_BATCH_LIMIT', default=10000, cast=int
+)
+SECUREAPPROVE_PROOF_VERIFY_BATCH_MAX_BYTES = config(
+    'SECUREAPPROVE_PROOF_VERIFY_BATCH_MAX_BYTES', default=16 * 1024 * 1024, cast=int
+)
+# Proofs verified per signed checkpoint by verify_proof_ledger.
+SECUREAPPROVE_PROOF_LEDGER_VERIFY_CHUNK_SIZE = config(
+    'SECUREAPPROVE_PROOF_LEDGER_VERIFY_CHUNK_SIZE', default=2000, cast=int
+)
+# Optional reuse of one evidence data key per tenant; 0 requests a new key per proof.
+SECUREAPPROVE_PROOF_DATA_KEY_CACHE_SECONDS = config(
+    'SECUREAPPROVE_PROOF_DATA_KEY_CACHE_SECONDS', default=0, cast=int
+)
+SECUREAPPROVE_PROOF_DATA_KEY_CACHE_MAX_MESSAGES = config(
+    'SECUREAPPROVE_PROOF_DATA_KEY_CACHE_MAX_MESSAGES', default=1000, cast=int
+)
+SECUREAPPROVE_PROOF_DATA_KEY_CACHE_MAX_ENTRIES = config(
+    'SECUREAPPROVE_PROOF_DATA_KEY_CACHE_MAX_ENTRIES', default=256, cast=int
+)
 SECUREAPPROVE_VAULT_ADDR = config('SECUREAPPROVE_VAULT_ADDR', default='')
 SECUREAPPROVE_VAULT_CA_BUNDLE = config('SECUREAPPROVE_VAULT_CA_BUNDLE', default='')
 SECUREAPPROVE_VAULT_TOKEN_FILE = config('SECUREAPPROVE_VAULT_TOKEN_FILE', default='')
 SECUREAPPROVE_VAULT_TIMEOUT_SECONDS = config(
     'SECUREAPPROVE_VAULT_TIMEOUT_SECONDS', default=5, cast=int
 )
+SECUREAPPROVE_VAULT_POOL_SIZE = config('SECUREAPPROVE_VAULT_POOL_SIZE', default=10, cast=int)
+SECUREAPPROVE_VAULT_MAX_RETRIES = config('SECUREAPPROVE_VAULT_MAX_RETRIES', default=2, cast=int)
+SECUREAPPROVE_VAULT_RETRY_BACKOFF_SECONDS = config(
+    'SECUREAPPROVE_VAULT_RETRY_BACKOFF_SECONDS', default=0.2, cast=float
+)
+SECUREAPPROVE_VAULT_CIRCUIT_BREAKER_THRESHOLD = config(
+    'SECUREAPPROVE_VAULT_CIRCUIT_BREAKER_THRESHOLD', default=5, cast=int
+)
+SECUREAPPROVE_VAULT_CIRCUIT_BREAKER_RESET_SECONDS = config(
+    'SECUREAPPROVE_VAULT_CIRCUIT_BREAKER_RESET_SECONDS', default=30, cast=int
+)
 SECUREAPPROVE_VAULT_TRANSIT_MOUNT = config(
     'SECUREAPPROVE_VAULT_TRANSIT_MOUNT', default='transit'
 )
@@ -353,11 +427,51 @@ SECUREAPPROVE_PROOF_ARCHIVE_ADDRESSING_STYLE = config(
 SECUREAPPROVE_PROOF_ARCHIVE_CA_BUNDLE = config(
     'SECUREAPPROVE_PROOF_ARCHIVE_CA_BUNDLE', default=''
 )
+# Evidence purge and archive monitor work in short SKIP LOCKED batches.
+SECUREAPPROVE_PROOF_MAINTENANCE_BATCH_SIZE = config(
+    'SECUREAPPROVE_PROOF_MAINTENANCE_BATCH_SIZE', default=1000, cast=int
+)
+SECUREAPPROVE_PROOF_MAINTENANCE_PAUSE_SECONDS = config(
+    'SECUREAPPROVE_PROOF_MAINTENANCE_PAUSE_SECONDS', default=0.05, cast=float
+)
+SECUREAPPROVE_PROOF_MAINTENANCE_MAX_SECONDS = config(
+    'SECUREAPPROVE_PROOF_MAINTENANCE_MAX_SECONDS', default=300, cast=int
+)
+# "single" writes one Object Lock object per proof; "bundle" writes one
+# compressed, manifest-indexed object per tenant every bundle interval.
+SECUREAPPROVE_PROOF_ARCHIVE_MODE = config('SECUREAPPROVE_PROOF_ARCHIVE_MODE', default='single')
+SECUREAPPROVE_PROOF_ARCHIVE_BUNDLE_INTERVAL_SECONDS = config(
+    'SECUREAPPROVE_PROOF_ARCHIVE_BUNDLE_INTERVAL_SECONDS', default=300, cast=int
+)
+SECUREAPPROVE_PROOF_ARCHIVE_BUNDLE_MAX_PROOFS = config(
+    'SECUREAPPROVE_PROOF_ARCHIVE_BUNDLE_MAX_PROOFS', default=5000, cast=int
+)
 AWS_REGION = config('AWS_REGION', default='')
 
 # Billing
 MERCADOPAGO_ACCESS_TOKEN = config('MERCADOPAGO_ACCESS_TOKEN', default='')
 MERCADOPAGO_WEBHOOK_URL = config('MERCADOPAGO_WEBHOOK_URL', default='')
+# Point at a local fake server in development and tests.
+MERCADOPAGO_API_BASE_URL = config('MERCADOPAGO_API_BASE_URL', default='https://api.mercadopago.com')
+# Shared MercadoPago client: pooled connections, (connect, read) timeouts,
+# retries for GETs only, and a circuit breaker that fails fast while open.
+SECUREAPPROVE_MERCADOPAGO_CONNECT_TIMEOUT_SECONDS = config(
+    'SECUREAPPROVE_MERCADOPAGO_CONNECT_TIMEOUT_SECONDS', default=3, cast=float
+)
+SECUREAPPROVE_MERCADOPAGO_READ_TIMEOUT_SECONDS = config(
+    'SECUREAPPROVE_MERCADOPAGO_READ_TIMEOUT_SECONDS', default=10, cast=float
+)
+SECUREAPPROVE_MERCADOPAGO_POOL_SIZE = config('SECUREAPPROVE_MERCADOPAGO_POOL_SIZE', default=10, cast=int)
+SECUREAPPROVE_MERCADOPAGO_MAX_RETRIES = config('SECUREAPPROVE_MERCADOPAGO_MAX_RETRIES', default=2, cast=int)
+SECUREAPPROVE_MERCADOPAGO_RETRY_BACKOFF_SECONDS = config(
+    'SECUREAPPROVE_MERCADOPAGO_RETRY_BACKOFF_SECONDS', default=0.2, cast=float
+)
+SECUREAPPROVE_MERCADOPAGO_CIRCUIT_BREAKER_THRESHOLD = config(
+    'SECUREAPPROVE_MERCADOPAGO_CIRCUIT_BREAKER_THRESHOLD', default=5, cast=int
+)
+SECUREAPPROVE_MERCADOPAGO_CIRCUIT_BREAKER_RESET_SECONDS = config(
+    'SECUREAPPROVE_MERCADOPAGO_CIRCUIT_BREAKER_RESET_SECONDS', default=30, cast=int
+)
 
 # Email
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -398,6 +512,38 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.authentication.tasks.monitor_delayed_proof_archives',
         'schedule': 60.0,
     },
+    'archive-security-proof-bundles': {
+        'task': 'apps.authentication.tasks.archive_security_proof_bundles',
+        'schedule': float(SECUREAPPROVE_PROOF_ARCHIVE_BUNDLE_INTERVAL_SECONDS),
+    },
+    'verify-proof-ledgers-nightly': {
+        'task': 'apps.authentication.tasks.verify_proof_ledgers',
+        'schedule': 86400.0,
+    },
+    'reconcile-tenant-seat-counters-hourly': {
+        'task': 'apps.tenants.tasks.reconcile_tenant_seat_counters',
+        'schedule': 3600.0,
+    },
+    'expire-trials': {
+        'task': 'apps.tenants.tasks.expire_trials',
+        'schedule': float(SECUREAPPROVE_TRIAL_EXPIRY_INTERVAL_SECONDS),
+    },
+    'flush-api-usage': {
+        'task': 'apps.billing.tasks.flush_api_usage',
+        'schedule': 60.0,
+    },
+    'reconcile-request-quotas': {
+        'task': 'apps.billing.tasks.reconcile_request_quotas',
+        'schedule': float(SECUREAPPROVE_QUOTA_RECONCILE_INTERVAL_SECONDS),
+    },
+    'dispatch-pending-webhook-events': {
+        'task': 'apps.billing.tasks.dispatch_pending_webhook_events',
+        'schedule': 60.0,
+    },
+    'rebuild-recent-usage-metrics-nightly': {
+        'task': 'apps.billing.tasks.rebuild_recent_usage_metrics',
+        'schedule': 86400.0,
+    },
 }
 
 # Override webpush migrations location to allow generating missing migrations locally
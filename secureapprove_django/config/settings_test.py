@@ -15,6 +15,9 @@ CACHES = {
     }
 }
 
+SECUREAPPROVE_METRICS_FLUSH_SECONDS = 0
+SECUREAPPROVE_API_METERING_FLUSH_SECONDS = 0
+
 PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 
@@ -16,7 +16,9 @@ from django.urls import translate_url
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
+from apps.authentication.metrics_views import prometheus_metrics
 from apps.authentication.proof_views import proof_jwks
+from apps.billing.webhooks import mercadopago_webhook
 
 from django.views.generic import TemplateView
 import os
@@ -159,6 +161,9 @@ urlpatterns = [
     # Health check (no i18n)
     path('health/', health_check, name='health'),
     path('.well-known/secureapprove-proof-jwks.json', proof_jwks, name='secureapprove-proof-jwks'),
+    path('metrics', prometheus_metrics, name='prometheus-metrics'),
+    # Provider callbacks must not be redirected to a language prefix.
+    path('billing/webhooks/mercadopago/', mercadopago_webhook, name='mercadopago-webhook'),
     
     # Service Worker
     path('service-worker.js', service_worker, name='service-worker'),
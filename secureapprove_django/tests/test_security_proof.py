@@ -1,23 +1,35 @@
 import base64
+import gzip
 import json
 import math
+import os
 import sys
+import tempfile
+import threading
 import uuid
-from datetime import datetime, timezone as datetime_timezone
+from datetime import date, datetime, timedelta, timezone as datetime_timezone
 from decimal import Decimal
+from enum import IntEnum
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from unittest import skipUnless
 from unittest.mock import patch
 
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
-from django.db import transaction
-from django.test import Client, TestCase, override_settings
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APIClient
 
 from apps.authentication.models import (
     ApprovalAudit,
+    ProofLedgerCheckpoint,
     ProofLedgerHead,
     ProofSigningKey,
     SecurityProof,
@@ -25,25 +37,40 @@ from apps.authentication.models import (
 )
 from apps.authentication.proof_service import (
     CHALLENGE_PREFIX,
+    VAULT_RESPONSE_LIMIT,
     InvalidProof,
     ProofUnavailable,
+    archived_proof_jws,
     assertion_private_evidence,
     assertion_sha256,
     build_bound_challenge,
+    bump_signing_key_status_version,
     canonical_json_bytes,
     canonical_json_value,
     decrypt_evidence,
+    invalidate_signing_key_cache,
     issue_security_proof,
+    proof_archive_bundle_manifest,
     sha256_hex,
     sync_active_signing_key,
     transaction_sha256,
     verification_result_for_jws,
     verification_result_for_proof,
+    verification_results_for_jws_batch,
     verify_private_evidence_integrity,
     verify_compact_jws,
+    verify_proof_ledger,
+    _data_key_cache,
+    _ec_public_key,
+    _vault_request,
 )
+from apps.authentication import metrics
 from apps.authentication.checks import secureapprove_proof_configuration_check
-from apps.authentication.tasks import purge_expired_proof_evidence
+from apps.authentication.tasks import (
+    archive_security_proof_bundles,
+    monitor_delayed_proof_archives,
+    purge_expired_proof_evidence,
+)
 from apps.authentication.webauthn_service import webauthn_service
 from apps.requests.models import ApprovalRequest
 from apps.tenants.models import Tenant
@@ -62,6 +89,9 @@ PROOF_SETTINGS = override_settings(
 @PROOF_SETTINGS
 class ProofTestBase(TestCase):
     def setUp(self):
+        invalidate_signing_key_cache()
+        self.addCleanup(invalidate_signing_key_cache)
+        self.addCleanup(_data_key_cache.clear)
         self.tenant = Tenant.objects.create(key=f'tenant-{uuid.uuid4().hex[:8]}', name='Proof Tenant')
         self.admin = User.objects.create_user(
             username=f'admin-{uuid.uuid4().hex[:8]}', email=f'admin-{uuid.uuid4().hex[:8]}@example.test',
@@ -137,11 +167,118 @@ class ProofTestBase(TestCase):
         return proof
 
 
+def _reference_normalize(value):
+    """Pre-encoder normalization, kept verbatim as the conformance oracle."""
+    if value is None or isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError('Non-finite numbers cannot be canonicalized.')
+        return format(Decimal(str(value)), 'f')
+    if isinstance(value, Decimal):
+        return format(value, 'f')
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime_timezone.utc)
+        return value.astimezone(datetime_timezone.utc).isoformat(timespec='microseconds').replace('+00:00', 'Z')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.urlsafe_b64encode(value).rstrip(b'=').decode('ascii')
+    if isinstance(value, dict):
+        normalized = {}
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise ValueError('Canonical JSON object keys must be strings.')
+            normalized[key] = _reference_normalize(item)
+        return normalized
+    if isinstance(value, (list, tuple)):
+        return [_reference_normalize(item) for item in value]
+    raise ValueError(f'Unsupported canonical JSON type: {type(value).__name__}')
+
+
+def _reference_canonical_json_bytes(value):
+    return json.dumps(
+        _reference_normalize(value),
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(',', ':'),
+        allow_nan=False,
+    ).encode('utf-8')
+
+
+class _Priority(IntEnum):
+    HIGH = 3
+
+
+class _Label(str):
+    pass
+
+
+CANONICAL_JSON_CORPUS = [
+    None, True, False, 0, -1, 2 ** 70, -(2 ** 64), _Priority.HIGH,
+    '', 'plain', 'quote " backslash \\ slash /', 'control \x00\x1f\x7f \b\f\n\r\t',
+    'unicode ñ ü 中文 \u2028\u2029 😀', _Label('subclass'),
+    0.0, -0.0, 0.1, 1e-7, 1e21, 123456789.125, 3.141592653589793,
+    Decimal('0'), Decimal('-0.00'), Decimal('6500000.00'), Decimal('1E+3'), Decimal('1.5E-8'),
+    uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime_timezone.utc),
+    datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime_timezone(timedelta(hours=-3))),
+    date(2026, 2, 28),
+    b'', b'\x00\xff binary', bytes(range(256)),
+    [], (), {}, [[], {}, [{}]], (1, 'two', None),
+    {'b': 1, 'a': 2, 'A': 3, '_': 4, 'é': 5, '10': 6, '9': 7, '': 8},
+    {'nested': {'z': [1, {'y': Decimal('2.50'), 'x': [b'x', None]}], 'a': {'deep': {'deeper': []}}}},
+    {'\ud7ff': 1, '\ue000': 2, 'a\u0000': 3},
+]
+
+
 @PROOF_SETTINGS
 class ProofCanonicalizationTests(ProofTestBase):
     def test_canonical_object_order_is_deterministic(self):
         self.assertEqual(canonical_json_bytes({'b': 2, 'a': 1}), canonical_json_bytes({'a': 1, 'b': 2}))
 
+    def test_encoder_matches_reference_byte_for_byte(self):
+        corpus = CANONICAL_JSON_CORPUS + [
+            self.snapshot(),
+            self.evidence('corpus'),
+            {'corpus': CANONICAL_JSON_CORPUS, 'snapshot': self.snapshot('ñ')},
+        ]
+        for value in corpus:
+            with self.subTest(value=value):
+                self.assertEqual(canonical_json_bytes(value), _reference_canonical_json_bytes(value))
+                self.assertEqual(canonical_json_value(value), json.loads(_reference_canonical_json_bytes(value)))
+
+    def test_encoder_rejects_what_the_reference_rejects(self):
+        for value in ({1: 'x'}, {'a': {(1, 2): 'x'}}, [math.inf], {'a': -math.nan}, {'set': {1}}, object()):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    _reference_canonical_json_bytes(value)
+                with self.assertRaises(ValueError):
+                    canonical_json_bytes(value)
+
+    def test_canonical_snapshot_bytes_are_pinned(self):
+        value = {
+            'amount': Decimal('6500000.00'),
+            'created_at': datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime_timezone.utc),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'title': 'Pago — ñ',
+            'flags': [True, False, None, 7],
+        }
+        self.assertEqual(
+            canonical_json_bytes(value),
+            '{"amount":"6500000.00","created_at":"2026-01-02T03:04:05.000000Z","flags":[true,false,null,7],'
+            '"id":"12345678-1234-5678-1234-567812345678","title":"Pago — ñ"}'.encode('utf-8'),
+        )
+
+    def test_benchmark_command_reports_cost_per_snapshot(self):
+        stdout = StringIO()
+        call_command('benchmark_canonical_json', iterations=5, repeat=1, stdout=stdout)
+        self.assertIn('canonical_json_bytes:', stdout.getvalue())
+        self.assertIn('µs/snapshot', stdout.getvalue())
+
     def test_decimal_is_normalized_without_float_rounding(self):
         self.assertEqual(canonical_json_bytes({'amount': Decimal('6500000.00')}), b'{"amount":"6500000.00"}')
 
@@ -256,6 +393,42 @@ class ProofCryptographyTests(ProofTestBase):
         self.assertFalse(proof.has_private_evidence)
         self.assertTrue(verification_result_for_proof(proof)['signature_valid'])
 
+    @override_settings(
+        SECUREAPPROVE_PROOF_MAINTENANCE_BATCH_SIZE=2,
+        SECUREAPPROVE_PROOF_MAINTENANCE_PAUSE_SECONDS=0,
+    )
+    def test_purge_runs_in_bounded_batches(self):
+        proofs = [self.issue(f'purge-batch-{index}') for index in range(5)]
+        SecurityProof.objects.filter(pk__in=[proof.pk for proof in proofs[:4]]).update(
+            evidence_expires_at=timezone.now()
+        )
+        with patch('apps.authentication.tasks.time.sleep') as sleep:
+            self.assertEqual(purge_expired_proof_evidence.run(), 4)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(SecurityProof.objects.filter(evidence_purged_at__isnull=True).count(), 1)
+
+    @override_settings(
+        SECUREAPPROVE_PROOF_MAINTENANCE_BATCH_SIZE=2,
+        SECUREAPPROVE_PROOF_MAINTENANCE_MAX_SECONDS=0,
+    )
+    def test_purge_resumes_after_time_budget(self):
+        proofs = [self.issue(f'purge-budget-{index}') for index in range(3)]
+        SecurityProof.objects.filter(pk__in=[proof.pk for proof in proofs]).update(evidence_expires_at=timezone.now())
+        self.assertEqual(purge_expired_proof_evidence.run(), 2)
+        self.assertEqual(purge_expired_proof_evidence.run(), 1)
+        self.assertEqual(purge_expired_proof_evidence.run(), 0)
+
+    @override_settings(SECUREAPPROVE_PROOF_MAINTENANCE_BATCH_SIZE=1, SECUREAPPROVE_PROOF_MAINTENANCE_PAUSE_SECONDS=0)
+    def test_archive_monitor_marks_stale_proofs_delayed(self):
+        stale = self.issue('monitor-stale')
+        fresh = self.issue('monitor-fresh')
+        SecurityProof.objects.filter(pk__in=[stale.pk, fresh.pk]).update(archive_status='pending')
+        SecurityProof.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(minutes=10))
+        with self.assertLogs('apps.authentication.tasks', 'CRITICAL'):
+            self.assertEqual(monitor_delayed_proof_archives.run(), 1)
+        self.assertEqual(SecurityProof.objects.get(pk=stale.pk).archive_status, 'delayed')
+        self.assertEqual(SecurityProof.objects.get(pk=fresh.pk).archive_status, 'pending')
+
     def test_retired_key_still_verifies_old_proof(self):
         proof = self.issue('old-key')
         proof.signing_key.status = 'retired'
@@ -279,6 +452,82 @@ class ProofCryptographyTests(ProofTestBase):
         key.refresh_from_db()
         self.assertEqual(key.status, 'compromised')
 
+    def test_committed_active_key_is_reused_without_a_key_query(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.issue('warm')
+        with CaptureQueriesContext(connection) as queries:
+            proof = self.issue('cached')
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if 'FROM "authentication_proofsigningkey"' in query['sql']
+        ])
+        self.assertTrue(verify_compact_jws(proof.jws)['payload'])
+
+    def test_uncommitted_key_is_not_cached(self):
+        with transaction.atomic():
+            sid = transaction.savepoint()
+            sync_active_signing_key()
+            transaction.savepoint_rollback(sid)
+        self.assertFalse(ProofSigningKey.objects.exists())
+        self.assertTrue(verify_compact_jws(self.issue('after-rollback').jws)['payload'])
+
+    def test_compromise_invalidates_cached_key(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            proof = self.issue('cached-compromise')
+            verify_compact_jws(proof.jws)
+        key = ProofSigningKey.objects.get(pk=proof.signing_key_id)
+        key.status = 'compromised'
+        key.save(update_fields=['status'])
+        self.assertEqual(verification_result_for_proof(proof)['status'], 'key_compromised')
+        with self.assertRaises(ProofUnavailable):
+            self.issue('after-compromise')
+
+    def test_status_change_in_another_process_invalidates_cached_key(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            proof = self.issue('remote-compromise')
+        # Another worker saves the compromise: this process's cache is not
+        # cleared, only the shared status version moves.
+        ProofSigningKey.objects.filter(pk=proof.signing_key_id).update(status='compromised')
+        self.assertEqual(verify_compact_jws(proof.jws)['key'].status, 'active')
+        bump_signing_key_status_version()
+        self.assertEqual(verify_compact_jws(proof.jws)['key'].status, 'compromised')
+
+    def test_ledger_verifier_resumes_from_signed_checkpoint(self):
+        for suffix in ('ledger-1', 'ledger-2', 'ledger-3'):
+            self.issue(suffix)
+        result = verify_proof_ledger(self.tenant.pk, chunk_size=2)
+        self.assertEqual((result['status'], result['verified_entries'], result['entry_count']), ('ok', 3, 3))
+        checkpoint = ProofLedgerCheckpoint.objects.get(tenant=self.tenant)
+        self.assertEqual(checkpoint.last_entry_sha256, ProofLedgerHead.objects.get(tenant=self.tenant).last_entry_sha256)
+
+        latest = self.issue('ledger-4')
+        result = verify_proof_ledger(self.tenant.pk)
+        self.assertEqual((result['status'], result['resumed_from'], result['verified_entries']), ('ok', 3, 1))
+        self.assertEqual(result['last_entry_sha256'], latest.ledger_entry_sha256)
+
+    def test_ledger_verifier_reports_first_broken_link(self):
+        first = self.issue('break-1')
+        second = self.issue('break-2')
+        self.issue('break-3')
+        SecurityProof.objects.filter(pk=second.pk).update(transaction_sha256='0' * 64)
+        result = verify_proof_ledger(self.tenant.pk)
+        self.assertEqual(result['status'], 'broken')
+        self.assertEqual(result['first_break']['entry_number'], 2)
+        self.assertEqual(result['first_break']['proof_id'], str(second.pk))
+        checkpoint = ProofLedgerCheckpoint.objects.get(tenant=self.tenant)
+        self.assertEqual((checkpoint.entry_count, checkpoint.last_proof_id), (1, first.pk))
+        with self.assertRaisesMessage(CommandError, '1 proof ledger(s) failed verification.'):
+            call_command('verify_proof_ledger', stdout=StringIO(), stderr=StringIO())
+
+    def test_ledger_verifier_rejects_forged_checkpoint(self):
+        self.issue('forged-1')
+        self.issue('forged-2')
+        verify_proof_ledger(self.tenant.pk)
+        ProofLedgerCheckpoint.objects.filter(tenant=self.tenant).update(entry_count=5)
+        with self.assertLogs('apps.authentication.proof_service', 'CRITICAL'):
+            result = verify_proof_ledger(self.tenant.pk)
+        self.assertEqual((result['status'], result['resumed_from'], result['verified_entries']), ('ok', 0, 2))
+
     def test_proof_survives_functional_audit_deletion(self):
         proof = self.issue('retained')
         proof.approval_audit.delete()
@@ -299,6 +548,28 @@ class ProofPublicApiIntegrationTests(ProofTestBase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json()['keys'][0]['kty'], 'EC')
 
+    def test_jwks_is_served_from_cache_with_strong_etag(self):
+        first = self.client.get('/.well-known/secureapprove-proof-jwks.json')
+        etag = first['ETag']
+        self.assertRegex(etag, r'^"[0-9a-f]{64}"$')
+        invalidate_signing_key_cache()
+        with self.assertNumQueries(0):
+            cached = self.client.get('/.well-known/secureapprove-proof-jwks.json')
+            not_modified = self.client.get('/.well-known/secureapprove-proof-jwks.json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+        self.assertEqual(not_modified.content, b'')
+
+    def test_jwks_changes_when_a_key_is_compromised(self):
+        etag = self.client.get('/.well-known/secureapprove-proof-jwks.json')['ETag']
+        self.proof.signing_key.status = 'compromised'
+        self.proof.signing_key.save(update_fields=['status'])
+        response = self.client.get('/.well-known/secureapprove-proof-jwks.json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['keys'][0]['secureapprove_status'], 'compromised')
+
     def test_verify_by_id_returns_valid_minimal_result(self):
         response = self.client.get(f'/api/proofs/{self.proof.id}/verify/')
         self.assertEqual(response.status_code, 200)
@@ -311,6 +582,38 @@ class ProofPublicApiIntegrationTests(ProofTestBase):
         self.assertNotIn(self.tenant.name, body)
         self.assertNotIn('1250.50', body)
 
+    def test_verify_by_id_reads_key_status_from_the_database(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            verify_compact_jws(self.proof.jws)
+        # Compromised by another worker whose version bump this process's
+        # key cache has not seen.
+        ProofSigningKey.objects.filter(pk=self.proof.signing_key_id).update(status='compromised')
+        self.assertEqual(verify_compact_jws(self.proof.jws)['key'].status, 'active')
+        result = self.client.get(f'/api/proofs/{self.proof.id}/verify/').json()
+        self.assertEqual((result['valid'], result['status']), (False, 'key_compromised'))
+
+    def test_verify_by_id_reuses_cached_result_until_key_status_changes(self):
+        first = self.client.get(f'/api/proofs/{self.proof.id}/verify/').json()
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(f'/api/proofs/{self.proof.id}/verify/').json()
+        self.assertEqual(first, second)
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if 'FROM "authentication_securityproof"' in query['sql']
+        ])
+        key = ProofSigningKey.objects.get(pk=self.proof.signing_key_id)
+        key.status = 'compromised'
+        key.save(update_fields=['status'])
+        result = self.client.get(f'/api/proofs/{self.proof.id}/verify/').json()
+        self.assertFalse(result['valid'])
+        self.assertEqual(result['status'], 'key_compromised')
+
+    def test_public_key_is_constructed_once_per_kid(self):
+        verify_compact_jws(self.proof.jws)
+        hits = _ec_public_key.cache_info().hits
+        verify_compact_jws(self.proof.jws)
+        self.assertEqual(_ec_public_key.cache_info().hits, hits + 1)
+
     def test_unknown_id_is_not_enumerable(self):
         response = self.client.get(f'/api/proofs/{uuid.uuid4()}/verify/')
         self.assertEqual(response.status_code, 404)
@@ -331,6 +634,60 @@ class ProofPublicApiIntegrationTests(ProofTestBase):
         response = self.client.post('/api/proofs/verify/', {'jws': 'a' * 17000}, content_type='application/json')
         self.assertIn(response.status_code, {413, 400})
 
+    def forged_signature(self, jws):
+        header, payload, signature = jws.split('.')
+        raw = bytearray(base64.urlsafe_b64decode(signature + '=' * ((4 - len(signature) % 4) % 4)))
+        raw[-1] ^= 0x01
+        return f"{header}.{payload}.{base64.urlsafe_b64encode(bytes(raw)).rstrip(b'=').decode('ascii')}"
+
+    def test_batch_verify_requires_authentication(self):
+        response = self.client.post('/api/proofs/verify/batch/', [self.proof.jws], content_type='application/json')
+        self.assertIn(response.status_code, {401, 403})
+
+    def test_batch_verify_streams_results_in_input_order(self):
+        second = self.issue('batch')
+        values = [self.proof.jws, self.forged_signature(self.proof.jws), 'not-a-jws', second.jws]
+        self.client.force_login(self.admin)
+        response = self.client.post('/api/proofs/verify/batch/', values, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        results = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([result['status'] for result in results], ['valid', 'altered', 'altered', 'valid'])
+        self.assertEqual(results, [verification_result_for_jws(value) for value in values])
+
+    def test_batch_verify_accepts_ndjson(self):
+        body = '\n'.join([json.dumps({'jws': self.proof.jws}), json.dumps(self.proof.jws), self.proof.jws])
+        self.client.force_login(self.admin)
+        response = self.client.post('/api/proofs/verify/batch/', body, content_type='application/x-ndjson')
+        results = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([result['valid'] for result in results], [True, True, True])
+
+    @override_settings(SECUREAPPROVE_PROOF_VERIFY_BATCH_LIMIT=2)
+    def test_batch_verify_rejects_oversized_batches(self):
+        self.client.force_login(self.admin)
+        response = self.client.post('/api/proofs/verify/batch/', [self.proof.jws] * 3, content_type='application/json')
+        self.assertEqual(response.status_code, 413)
+
+    @override_settings(SECUREAPPROVE_PROOF_VERIFY_PARALLEL_MIN=2)
+    def test_batch_signatures_are_checked_in_a_process_pool(self):
+        values = [self.proof.jws, self.forged_signature(self.proof.jws)] * 3
+        # Spawned workers re-import `apps` from sys.path; drop app directories
+        # pytest prepends for rootless test packages so it stays a namespace.
+        apps_dir = str(settings.BASE_DIR / 'apps')
+        with patch.object(sys, 'path', [entry for entry in sys.path if not entry.startswith(apps_dir)]):
+            results = list(verification_results_for_jws_batch(values, workers=2))
+        self.assertEqual([result['signature_valid'] for result in results], [True, False] * 3)
+
+    def test_verify_command_reads_ndjson_and_reports_summary(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as handle:
+            handle.write(self.proof.jws + '\n' + self.forged_signature(self.proof.jws) + '\n')
+        self.addCleanup(os.unlink, handle.name)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('verify_proof_jws', handle.name, stdout=stdout, stderr=stderr)
+        results = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([result['status'] for result in results], ['valid', 'altered'])
+        self.assertIn('altered=1, valid=1', stderr.getvalue())
+
     def test_evidence_requires_authentication(self):
         response = self.client.get(f'/api/proofs/{self.proof.id}/evidence/')
         self.assertIn(response.status_code, {401, 403})
@@ -539,6 +896,213 @@ class ProofFlowIntegrationTests(ProofTestBase):
         self.assertEqual(SecurityProof.objects.count(), 0)
 
 
+@PROOF_SETTINGS
+class ProofMetricsTests(ProofTestBase):
+    def setUp(self):
+        super().setUp()
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+
+    def test_issuance_is_counted_and_timed_across_flushes(self):
+        self.issue('metrics')
+        metrics.registry.flush()
+        self.issue('metrics-again')
+        text = metrics.render_prometheus()
+        self.assertIn('# TYPE secureapprove_proof_events_total counter', text)
+        self.assertIn('secureapprove_proof_events_total{event="issued"} 2\n', text)
+        self.assertIn('# TYPE secureapprove_proof_issue_seconds histogram', text)
+        self.assertIn('secureapprove_proof_issue_seconds_count{signer="local"} 2\n', text)
+
+    def test_histogram_buckets_are_cumulative_and_ordered(self):
+        metrics.observe('test_latency_seconds', 0.3, buckets=(0.1, 1.0, 10.0))
+        metrics.observe('test_latency_seconds', 5, buckets=(0.1, 1.0, 10.0))
+        lines = [line for line in metrics.render_prometheus().splitlines() if line.startswith('test_latency')]
+        self.assertEqual(lines, [
+            'test_latency_seconds_bucket{le="0.1"} 0',
+            'test_latency_seconds_bucket{le="1.0"} 1',
+            'test_latency_seconds_bucket{le="10.0"} 2',
+            'test_latency_seconds_bucket{le="+Inf"} 2',
+            'test_latency_seconds_count 2',
+            'test_latency_seconds_sum 5.3',
+        ])
+
+    @override_settings(SECUREAPPROVE_METRICS_TOKEN='scrape-token')
+    def test_endpoint_requires_scrape_token_or_superuser(self):
+        metrics.inc('test_scrapes_total')
+        client = Client()
+        self.assertEqual(client.get('/metrics').status_code, 401)
+        self.assertEqual(client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        response = client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(b'test_scrapes_total 1\n', response.content)
+        with override_settings(ENABLE_METRICS_ENDPOINT=False):
+            self.assertEqual(client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-token').status_code, 404)
+
+
+@PROOF_SETTINGS
+class ProofIssuanceBenchmarkTests(TransactionTestCase):
+    def run_benchmark(self, **options):
+        stdout = StringIO()
+        call_command('benchmark_proof_issuance', json=True, keep_data=True, stdout=stdout, **options)
+        report = json.loads(stdout.getvalue())
+        tenant = Tenant.objects.get(key=report['tenant'])
+        return report, tenant
+
+    def test_issuance_reports_percentiles_and_keeps_the_chain(self):
+        report, tenant = self.run_benchmark(approvers=1, rounds=3, signer_latency_ms=1)
+        self.assertEqual((report['proofs'], report['errors'], report['ledger']), (3, [], 'ok'))
+        self.assertGreaterEqual(report['latency_ms']['p99'], report['latency_ms']['p50'])
+        self.assertGreaterEqual(report['latency_ms']['p50'], 1)
+        self.assertEqual(set(report['lock_wait_ms']), {'p50', 'p95', 'p99', 'max'})
+        self.assertEqual(ProofLedgerHead.objects.get(tenant=tenant).entry_count, 3)
+        self.assertEqual(ApprovalRequest.objects.filter(tenant=tenant, status='approved').count(), 3)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Concurrent issuance needs row locks.')
+    def test_concurrent_approvers_serialize_on_the_ledger_head(self):
+        report, tenant = self.run_benchmark(approvers=8, rounds=3)
+        self.assertEqual((report['proofs'], report['errors'], report['ledger']), (24, [], 'ok'))
+        self.assertEqual(ProofLedgerHead.objects.get(tenant=tenant).entry_count, 24)
+
+    def test_regression_thresholds_fail_and_clean_up(self):
+        with self.assertRaisesMessage(CommandError, 'exceeds 0 ms'):
+            call_command('benchmark_proof_issuance', approvers=1, rounds=1, max_p95_ms=0, stdout=StringIO())
+        self.assertFalse(Tenant.objects.filter(key__startswith='loadtest-').exists())
+        self.assertFalse(SecurityProof.objects.exists())
+
+
+class _ObjectLockStore:
+    """In-memory stand-in for the versioned Object Lock bucket."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.objects = {}
+        self.ranges = []
+        self.on_put = None
+
+    def put_object(self, **kwargs):
+        if self.on_put:
+            self.on_put()
+        if self.fail:
+            raise ConnectionError('archive unavailable')
+        assert kwargs['ObjectLockMode'] == 'COMPLIANCE'
+        version_id = uuid.uuid4().hex
+        self.objects[(kwargs['Key'], version_id)] = kwargs
+        return {'VersionId': version_id}
+
+    def _object(self, kwargs):
+        return self.objects[(kwargs['Key'], kwargs['VersionId'])]
+
+    def head_object(self, **kwargs):
+        return {'Metadata': self._object(kwargs)['Metadata']}
+
+    def get_object(self, **kwargs):
+        body = self._object(kwargs)['Body']
+        if 'Range' in kwargs:
+            self.ranges.append(kwargs['Range'])
+            start, end = map(int, kwargs['Range'].removeprefix('bytes=').split('-'))
+            body = body[start:end + 1]
+        return {'Body': BytesIO(body)}
+
+
+@override_settings(
+    SECUREAPPROVE_PROOF_ARCHIVE_ENABLED=True,
+    SECUREAPPROVE_PROOF_ARCHIVE_MODE='bundle',
+    SECUREAPPROVE_PROOF_ARCHIVE_BUCKET='secureapprove-proofs',
+)
+@PROOF_SETTINGS
+class ProofArchiveBundleTests(ProofTestBase):
+    def setUp(self):
+        super().setUp()
+        self.store = _ObjectLockStore()
+        s3_patch = patch('apps.authentication.proof_service._s3_client', side_effect=lambda: self.store)
+        s3_patch.start()
+        self.addCleanup(s3_patch.stop)
+
+    def issue_pending(self, count):
+        with patch('apps.authentication.tasks.archive_security_proof.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                proofs = [self.issue(f'bundle-{index}') for index in range(count)]
+        delay.assert_not_called()
+        return proofs
+
+    def test_pending_proofs_are_archived_as_one_bundle_with_range_reads(self):
+        proofs = self.issue_pending(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(archive_security_proof_bundles(), 3)
+        self.assertEqual(len(self.store.objects), 1)
+        (object_key, version_id), stored = next(iter(self.store.objects.items()))
+        self.assertTrue(object_key.startswith(f'proofs/bundles/{self.tenant.pk}/'))
+        # Concatenated members still read as one gzip stream: every JWS, then the manifest.
+        self.assertTrue(gzip.decompress(stored['Body']).startswith(''.join(proof.jws for proof in proofs).encode()))
+
+        for proof in proofs:
+            proof.refresh_from_db()
+            self.assertEqual(
+                (proof.archive_status, proof.archive_object_key, proof.archive_version_id),
+                ('archived', object_key, version_id),
+            )
+            self.assertEqual(archived_proof_jws(proof), proof.jws)
+        self.assertEqual(len(self.store.ranges), 3)
+        manifest = proof_archive_bundle_manifest(object_key, version_id)
+        self.assertEqual([entry['proof_id'] for entry in manifest['proofs']], [str(proof.pk) for proof in proofs])
+        self.assertEqual(manifest['proofs'][1]['offset'], proofs[1].archive_bundle_offset)
+
+    @override_settings(SECUREAPPROVE_PROOF_ARCHIVE_BUNDLE_MAX_PROOFS=2)
+    def test_large_backlogs_are_split_into_bounded_bundles(self):
+        self.issue_pending(3)
+        self.assertEqual(archive_security_proof_bundles(), 3)
+        self.assertEqual(len(self.store.objects), 2)
+        self.assertFalse(SecurityProof.objects.exclude(archive_status='archived').exists())
+
+    def test_failed_bundle_upload_leaves_proofs_for_the_next_interval(self):
+        proofs = self.issue_pending(2)
+        self.store.fail = True
+        with self.assertLogs('apps.authentication.tasks', 'ERROR'):
+            self.assertEqual(archive_security_proof_bundles(), 0)
+        self.assertEqual(
+            set(SecurityProof.objects.filter(pk__in=[proof.pk for proof in proofs]).values_list('archive_status', flat=True)),
+            {'failed'},
+        )
+        self.store.fail = False
+        self.assertEqual(archive_security_proof_bundles(), 2)
+
+    def test_upload_runs_outside_the_claiming_transaction(self):
+        proofs = self.issue_pending(2)
+        depth = len(connection.atomic_blocks)
+        seen = []
+        self.store.on_put = lambda: seen.append((
+            len(connection.atomic_blocks) - depth,
+            set(SecurityProof.objects.filter(pk__in=[proof.pk for proof in proofs]).values_list('archive_status', flat=True)),
+        ))
+        self.assertEqual(archive_security_proof_bundles(), 2)
+        self.assertEqual(seen, [(0, {'archiving'})])
+
+    def test_released_claim_is_not_overwritten_by_a_late_upload(self):
+        proofs = self.issue_pending(2)
+        # The claim is released and re-queued while the upload is still running.
+        self.store.on_put = lambda: SecurityProof.objects.filter(pk=proofs[0].pk).update(archive_status='delayed')
+        archive_security_proof_bundles.run()
+        self.assertEqual(
+            dict(SecurityProof.objects.filter(pk__in=[proof.pk for proof in proofs]).values_list('pk', 'archive_status')),
+            {proofs[0].pk: 'delayed', proofs[1].pk: 'archived'},
+        )
+
+    @override_settings(SECUREAPPROVE_PROOF_MAINTENANCE_PAUSE_SECONDS=0)
+    def test_stale_claims_are_released_for_the_next_run(self):
+        proofs = self.issue_pending(2)
+        SecurityProof.objects.filter(pk=proofs[0].pk).update(
+            archive_status='archiving', archive_claimed_at=timezone.now() - timedelta(hours=1)
+        )
+        SecurityProof.objects.filter(pk=proofs[1].pk).update(
+            archive_status='archiving', archive_claimed_at=timezone.now()
+        )
+        with self.assertLogs('apps.authentication.tasks', 'CRITICAL'):
+            self.assertEqual(monitor_delayed_proof_archives.run(), 1)
+        self.assertEqual(SecurityProof.objects.get(pk=proofs[0].pk).archive_status, 'delayed')
+        self.assertEqual(SecurityProof.objects.get(pk=proofs[1].pk).archive_status, 'archiving')
+
+
 VAULT_PROOF_SETTINGS = override_settings(
     DEBUG=False,
     SECUREAPPROVE_PROOF_ENABLED=True,
@@ -638,6 +1202,69 @@ class VaultTransitProofTests(ProofTestBase):
         self.assertEqual(proof.signing_key.kid, 'secureapprove-proof-vault-v2')
         self.assertTrue(verify_compact_jws(proof.jws)['payload'])
 
+    @override_settings(SECUREAPPROVE_PROOF_ARCHIVE_ENABLED=False)
+    @patch('apps.authentication.proof_service._vault_request')
+    def test_vault_key_metadata_is_cached_until_the_next_sync(self, vault_request):
+        vault_request.side_effect = self.vault_response
+
+        def metadata_requests():
+            return sum(
+                1 for call in vault_request.call_args_list
+                if call.args[1] == 'transit/keys/secureapprove-proof-signing'
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.issue('vault-warm')
+        warmed = metadata_requests()
+        self.issue('vault-cached')
+        self.assertEqual(metadata_requests(), warmed)
+        with self.captureOnCommitCallbacks(execute=True):
+            sync_active_signing_key()
+        self.assertEqual(metadata_requests(), warmed + 1)
+        self.issue('vault-after-sync')
+        self.assertEqual(metadata_requests(), warmed + 1)
+
+    @override_settings(
+        SECUREAPPROVE_PROOF_ARCHIVE_ENABLED=False,
+        SECUREAPPROVE_PROOF_DATA_KEY_CACHE_SECONDS=300,
+        SECUREAPPROVE_PROOF_DATA_KEY_CACHE_MAX_MESSAGES=2,
+    )
+    @patch('apps.authentication.proof_service._vault_request')
+    def test_cached_data_key_wraps_a_bounded_number_of_proofs(self, vault_request):
+        vault_request.side_effect = self.vault_response
+        proofs = [self.issue(f'cached-key-{index}') for index in range(3)]
+        paths = [call.args[1] for call in vault_request.call_args_list]
+        self.assertEqual(paths.count('transit/datakey/plaintext/secureapprove-proof-evidence'), 2)
+        self.assertEqual(bytes(proofs[0].encrypted_data_key), bytes(proofs[1].encrypted_data_key))
+        self.assertNotEqual(bytes(proofs[0].evidence_nonce), bytes(proofs[1].evidence_nonce))
+        for index, proof in enumerate(proofs):
+            self.assertEqual(
+                decrypt_evidence(proof)['transaction'],
+                canonical_json_value(self.snapshot(f'cached-key-{index}')),
+            )
+        self.assertNotIn('transit/decrypt/secureapprove-proof-evidence', paths)
+
+    @override_settings(
+        SECUREAPPROVE_PROOF_ARCHIVE_ENABLED=False,
+        SECUREAPPROVE_PROOF_DATA_KEY_CACHE_SECONDS=300,
+    )
+    @patch('apps.authentication.proof_service._vault_request')
+    def test_shared_data_key_keeps_per_proof_aad_binding(self, vault_request):
+        vault_request.side_effect = self.vault_response
+        first = self.issue('aad-first')
+        second = self.issue('aad-second')
+        _data_key_cache.clear()
+        self.assertEqual(decrypt_evidence(second)['transaction'], canonical_json_value(self.snapshot('aad-second')))
+        decrypt_call = vault_request.call_args_list[-1]
+        self.assertEqual(
+            json.loads(base64.b64decode(decrypt_call.args[2]['context'])),
+            {'schema': 'sap-proof-v1', 'scope': 'tenant', 'tenant_id': str(self.tenant.pk)},
+        )
+        first.evidence_ciphertext = second.evidence_ciphertext
+        first.evidence_nonce = second.evidence_nonce
+        with self.assertRaises(Exception):
+            decrypt_evidence(first)
+
     def test_production_configuration_accepts_vault_and_worm(self):
         with patch.object(sys, 'argv', ['manage.py', 'check', '--deploy']):
             proof_messages = [
@@ -651,3 +1278,101 @@ class VaultTransitProofTests(ProofTestBase):
         with patch.object(sys, 'argv', ['manage.py', 'check', '--deploy']):
             messages = secureapprove_proof_configuration_check(None)
         self.assertIn('secureapprove.E002', {message.id for message in messages})
+
+
+class _VaultStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.server.tokens.append(self.headers.get('X-Vault-Token'))
+        self.server.client_ports.add(self.client_address[1])
+        if self.server.responses:
+            status, body = self.server.responses.pop(0)
+        else:
+            status, body = 200, b'{"data":{"ok":true}}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class VaultClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _VaultStubHandler)
+        self.server.responses = []
+        self.server.tokens = []
+        self.server.client_ports = set()
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True
+        ).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        token_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(token_dir.cleanup)
+        self.token_file = os.path.join(token_dir.name, 'token')
+        self.write_token('first-token')
+
+        settings_override = override_settings(
+            SECUREAPPROVE_VAULT_ADDR=f'http://127.0.0.1:{self.server.server_address[1]}',
+            SECUREAPPROVE_VAULT_TOKEN_FILE=self.token_file,
+            SECUREAPPROVE_VAULT_MAX_RETRIES=1,
+            SECUREAPPROVE_VAULT_RETRY_BACKOFF_SECONDS=0,
+            SECUREAPPROVE_VAULT_CIRCUIT_BREAKER_THRESHOLD=2,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def write_token(self, token):
+        with open(self.token_file, 'w', encoding='utf-8') as handle:
+            handle.write(token)
+        stat = os.stat(self.token_file)
+        bumped = stat.st_mtime_ns + len(self.server.tokens) * 1_000_000_000
+        os.utime(self.token_file, ns=(bumped, bumped))
+
+    def test_requests_reuse_one_keep_alive_connection(self):
+        for _ in range(3):
+            self.assertEqual(_vault_request('POST', 'transit/sign/key', {'input': 'x'}), {'ok': True})
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_token_is_reloaded_only_when_the_file_changes(self):
+        _vault_request('POST', 'transit/sign/key', {})
+        _vault_request('POST', 'transit/sign/key', {})
+        self.write_token('second-token')
+        _vault_request('POST', 'transit/sign/key', {})
+        self.assertEqual(self.server.tokens, ['first-token', 'first-token', 'second-token'])
+
+    def test_transient_vault_errors_are_retried(self):
+        self.server.responses = [(503, b'{"errors":["sealed"]}')]
+        self.assertEqual(_vault_request('POST', 'transit/sign/key', {}), {'ok': True})
+        self.assertEqual(len(self.server.tokens), 2)
+
+    def test_client_errors_are_not_retried(self):
+        self.server.responses = [(403, b'{"errors":["permission denied"]}')]
+        with self.assertRaises(ProofUnavailable):
+            _vault_request('POST', 'transit/sign/key', {})
+        self.assertEqual(len(self.server.tokens), 1)
+
+    def test_circuit_breaker_fails_fast_after_repeated_outages(self):
+        self.server.responses = [(503, b'{}')] * 4
+        for _ in range(2):
+            with self.assertRaises(ProofUnavailable):
+                _vault_request('POST', 'transit/sign/key', {})
+        self.assertEqual(len(self.server.tokens), 4)
+        with self.assertRaises(ProofUnavailable):
+            _vault_request('POST', 'transit/sign/key', {})
+        self.assertEqual(len(self.server.tokens), 4)
+
+    def test_oversized_and_incomplete_responses_are_rejected(self):
+        oversized = b'{"data":{"pad":"' + b'a' * VAULT_RESPONSE_LIMIT + b'"}}'
+        self.server.responses = [(200, oversized), (200, b'{"errors":[]}')]
+        with self.assertRaisesMessage(ProofUnavailable, 'oversized'):
+            _vault_request('POST', 'transit/sign/key', {})
+        with self.assertRaisesMessage(ProofUnavailable, 'incomplete'):
+            _vault_request('POST', 'transit/sign/key', {})
+        self.assertEqual(_vault_request('POST', 'transit/sign/key', {}), {'ok': True})